@@ -0,0 +1,36 @@
+"""add task_queue trace headers
+
+Revision ID: 2f6b81d0c4a9
+Revises: 7d3a90c1e5f2
+Create Date: 2026-10-19 19:21:05.437120
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "2f6b81d0c4a9"
+down_revision: Union[str, Sequence[str], None] = "7d3a90c1e5f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "task_queue",
+        sa.Column(
+            "trace_headers",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("task_queue", "trace_headers")
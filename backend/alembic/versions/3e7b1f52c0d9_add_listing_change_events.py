@@ -0,0 +1,68 @@
+"""add listing change events
+
+Revision ID: 3e7b1f52c0d9
+Revises: 6188655b16a7
+Create Date: 2026-10-19 15:12:08.530417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3e7b1f52c0d9"
+down_revision: Union[str, Sequence[str], None] = "6188655b16a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("listings", sa.Column("remarks", sa.Text(), nullable=True))
+    op.add_column("listings", sa.Column("content_hash", sa.String(), nullable=True))
+    op.create_table(
+        "listing_change_events",
+        sa.Column("listing_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "kind",
+            sa.Enum("PRICE", "STATUS", "CONTENT", name="listing_change_kind"),
+            nullable=False,
+        ),
+        sa.Column("old_value", sa.Text(), nullable=True),
+        sa.Column("new_value", sa.Text(), nullable=True),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["listing_id"],
+            ["listings.id"],
+            name=op.f("fk_listing_change_events_listing_id_listings"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_listing_change_events")),
+    )
+    op.create_index(
+        op.f("ix_listing_change_events_listing_id"),
+        "listing_change_events",
+        ["listing_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_listing_change_events_listing_id"),
+        table_name="listing_change_events",
+    )
+    op.drop_table("listing_change_events")
+    sa.Enum(name="listing_change_kind").drop(op.get_bind(), checkfirst=True)
+    op.drop_column("listings", "content_hash")
+    op.drop_column("listings", "remarks")
@@ -0,0 +1,125 @@
+"""add address_key to properties
+
+Revision ID: 4bc3c417e4f4
+Revises: d85fc52e8a07
+Create Date: 2026-10-19 09:12:40.518204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4bc3c417e4f4"
+down_revision: Union[str, Sequence[str], None] = "d85fc52e8a07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_BATCH = 1000
+
+
+def _backfill_keys() -> None:
+    # Computed in Python with the same address_key() the app looks rows up
+    # by (state names -> USPS abbreviations etc.), so legacy rows match.
+    from app.utils.format_verified_address import address_key
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(
+            "SELECT id, address_line1, address_line2, city, state, zip "
+            "FROM properties"
+        )
+    ).all()
+    keys = [
+        (r.id, address_key(r.address_line1, r.address_line2, r.city, r.state, r.zip))
+        for r in rows
+    ]
+    properties = sa.table(
+        "properties", sa.column("id", sa.UUID()), sa.column("address_key", sa.String())
+    )
+    for i in range(0, len(keys), _BATCH):
+        batch = sa.values(
+            sa.column("id", sa.UUID()), sa.column("key", sa.String()), name="batch"
+        ).data(keys[i : i + _BATCH])
+        conn.execute(
+            sa.update(properties)
+            .where(properties.c.id == batch.c.id)
+            .values(address_key=batch.c.key)
+        )
+
+
+def _merge_duplicates() -> None:
+    # Rows the old indexes kept apart ("12 Main St." vs "12 MAIN ST") now share
+    # a key. Keep one per key -- the one with an analysis, else the oldest --
+    # and move listings and analysis references over to it.
+    op.execute(
+        "CREATE TEMPORARY TABLE property_merge AS "
+        "SELECT id, first_value(id) OVER ("
+        " PARTITION BY address_key ORDER BY"
+        " EXISTS (SELECT 1 FROM property_analysis a WHERE a.property_id = p.id) DESC,"
+        " created_at, id) AS keep_id "
+        "FROM properties p"
+    )
+    op.execute("DELETE FROM property_merge WHERE id = keep_id")
+    op.execute(
+        "UPDATE listings l SET property_id = m.keep_id "
+        "FROM property_merge m WHERE l.property_id = m.id"
+    )
+    # the survivor has an analysis whenever any duplicate does
+    op.execute(
+        "UPDATE search_listing_analysis s SET property_analysis_id = keep.id "
+        "FROM property_analysis dup "
+        "JOIN property_merge m ON dup.property_id = m.id "
+        "JOIN property_analysis keep ON keep.property_id = m.keep_id "
+        "WHERE s.property_analysis_id = dup.id"
+    )
+    op.execute(
+        "DELETE FROM property_analysis a USING property_merge m "
+        "WHERE a.property_id = m.id"
+    )
+    op.execute("DELETE FROM properties p USING property_merge m WHERE p.id = m.id")
+    op.execute("DROP TABLE property_merge")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("properties", sa.Column("address_key", sa.String(), nullable=True))
+    _backfill_keys()
+    _merge_duplicates()
+    op.alter_column("properties", "address_key", nullable=False)
+    op.create_index(
+        "unique_property_address_key", "properties", ["address_key"], unique=True
+    )
+    op.drop_index(
+        "unique_property_without_address2",
+        table_name="properties",
+        postgresql_where="address_line2 IS NULL",
+    )
+    op.drop_index(
+        "unique_property_with_address2",
+        table_name="properties",
+        postgresql_where="address_line2 IS NOT NULL",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "unique_property_with_address2",
+        "properties",
+        ["address_line1", "address_line2", "city", "state", "zip"],
+        unique=True,
+        postgresql_where="address_line2 IS NOT NULL",
+    )
+    op.create_index(
+        "unique_property_without_address2",
+        "properties",
+        ["address_line1", "city", "state", "zip"],
+        unique=True,
+        postgresql_where="address_line2 IS NULL",
+    )
+    op.drop_index("unique_property_address_key", table_name="properties")
+    op.drop_column("properties", "address_key")
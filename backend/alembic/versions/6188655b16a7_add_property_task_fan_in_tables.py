@@ -0,0 +1,95 @@
+"""add property task fan-in tables
+
+Revision ID: 6188655b16a7
+Revises: a9033ab3d8c6
+Create Date: 2026-10-19 13:40:52.113870
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "6188655b16a7"
+down_revision: Union[str, Sequence[str], None] = "a9033ab3d8c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "pending_property_tasks",
+        sa.Column("property_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "enqueued_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["property_id"],
+            ["properties.id"],
+            name=op.f("fk_pending_property_tasks_property_id_properties"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_pending_property_tasks")),
+        sa.UniqueConstraint(
+            "property_id", name=op.f("uq_pending_property_tasks_property_id")
+        ),
+    )
+    op.create_table(
+        "property_task_waiters",
+        sa.Column("property_id", sa.UUID(), nullable=False),
+        sa.Column("listing_id", sa.UUID(), nullable=False),
+        sa.Column("saved_search_id", sa.UUID(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["listing_id"],
+            ["listings.id"],
+            name=op.f("fk_property_task_waiters_listing_id_listings"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["property_id"],
+            ["properties.id"],
+            name=op.f("fk_property_task_waiters_property_id_properties"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["saved_search_id"],
+            ["saved_searches.id"],
+            name=op.f("fk_property_task_waiters_saved_search_id_saved_searches"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_property_task_waiters")),
+        sa.UniqueConstraint(
+            "property_id",
+            "listing_id",
+            "saved_search_id",
+            name=op.f("uq_property_task_waiters_property_id"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("property_task_waiters")
+    op.drop_table("pending_property_tasks")
@@ -0,0 +1,47 @@
+"""add saved search schedule
+
+Revision ID: 7d3a90c1e5f2
+Revises: e8c41a7d2b30
+Create Date: 2026-10-19 18:02:37.118409
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7d3a90c1e5f2"
+down_revision: Union[str, Sequence[str], None] = "e8c41a7d2b30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "saved_searches",
+        sa.Column(
+            "next_run_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "saved_searches", sa.Column("interval_s", sa.Integer(), nullable=True)
+    )
+    op.create_index(
+        op.f("ix_saved_searches_next_run_at"),
+        "saved_searches",
+        ["next_run_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_saved_searches_next_run_at"), table_name="saved_searches")
+    op.drop_column("saved_searches", "interval_s")
+    op.drop_column("saved_searches", "next_run_at")
@@ -0,0 +1,59 @@
+"""add analysis_jobs table
+
+Revision ID: a9033ab3d8c6
+Revises: 4bc3c417e4f4
+Create Date: 2026-10-19 11:02:17.904118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a9033ab3d8c6"
+down_revision: Union[str, Sequence[str], None] = "4bc3c417e4f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("address_in", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "QUEUED", "RUNNING", "SUCCEEDED", "FAILED", name="analysis_job_status"
+            ),
+            nullable=False,
+        ),
+        sa.Column("stage", sa.String(), nullable=True),
+        sa.Column("progress", sa.Float(), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("property_analysis_id", sa.UUID(), nullable=True),
+        sa.Column("finished_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["property_analysis_id"],
+            ["property_analysis.id"],
+            name=op.f("fk_analysis_jobs_property_analysis_id_property_analysis"),
+            ondelete="SET NULL",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_analysis_jobs")),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("analysis_jobs")
+    sa.Enum(name="analysis_job_status").drop(op.get_bind(), checkfirst=True)
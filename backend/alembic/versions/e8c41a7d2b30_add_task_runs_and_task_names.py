@@ -0,0 +1,58 @@
+"""add task_runs and task names
+
+Revision ID: e8c41a7d2b30
+Revises: b52d04e9a1f6
+Create Date: 2026-10-19 16:48:12.664301
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e8c41a7d2b30"
+down_revision: Union[str, Sequence[str], None] = "b52d04e9a1f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_runs",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("stage", sa.String(), nullable=False),
+        sa.Column("result", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_task_runs")),
+        sa.UniqueConstraint("name", name=op.f("uq_task_runs_name")),
+    )
+    op.add_column("task_queue", sa.Column("name", sa.String(), nullable=True))
+    op.create_index(
+        "unique_task_queue_name",
+        "task_queue",
+        ["name"],
+        unique=True,
+        postgresql_where=sa.text("name IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "unique_task_queue_name",
+        table_name="task_queue",
+        postgresql_where=sa.text("name IS NOT NULL"),
+    )
+    op.drop_column("task_queue", "name")
+    op.drop_table("task_runs")
@@ -1,10 +1,12 @@
 from fastapi import APIRouter
 from .messenger_webhook import router as messenger_webhook_router
 from .analyze import router as analyze_router
+from .analysis_jobs import router as analysis_jobs_router
 from .clients import router as clients_router
 from .analyzed_properties import router as analyzed_properties_router
 from .saved_searches import router as saved_searches_router
 from .debug import router as debug_router
+from .metrics import router as metrics_router
 from .tasks import router as tasks_router
 from .auth import router as auth_router
 
@@ -13,9 +15,11 @@ router = APIRouter(prefix="/api")
 
 router.include_router(messenger_webhook_router)
 router.include_router(analyze_router)
+router.include_router(analysis_jobs_router)
 router.include_router(clients_router)
 router.include_router(analyzed_properties_router)
 router.include_router(saved_searches_router)
 router.include_router(debug_router)
+router.include_router(metrics_router)
 router.include_router(tasks_router)
 router.include_router(auth_router)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_async_session
+from app.schemas.analysis_job import AnalysisJobOut
+from app.services.property_analysis.analysis_jobs import get_job, job_events
+
+router = APIRouter(prefix="/analysis-jobs", tags=["analysis-jobs"])
+
+
+@router.get("/{job_id}", response_model=AnalysisJobOut)
+async def get_analysis_job(
+    job_id: UUID,
+    session: AsyncSession = Depends(get_async_session),
+):
+    job = await get_job(session, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return job
+
+
+@router.get("/{job_id}/events")
+async def stream_analysis_job(
+    job_id: UUID,
+    session: AsyncSession = Depends(get_async_session),
+):
+    if await get_job(session, job_id) is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return StreamingResponse(
+        job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
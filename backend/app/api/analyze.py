@@ -1,10 +1,18 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
+from app.core.config import settings
 from app.core.db import get_async_session
+from app.schemas.analysis_job import AnalysisJobAccepted
 from app.schemas.property_analysis import PropertyAnalysisOut
+from app.services.property_analysis.analysis_jobs import create_job, start_job
 from app.services.property_analysis.property_analysis_service import (
+    analyze_properties_from_addresses,
     analyze_property_from_address,
 )
 
@@ -17,11 +25,90 @@ class AnalyzeIn(BaseModel):
     address_in: str
 
 
-@router.post("", response_model=PropertyAnalysisOut)
+@router.post(
+    "",
+    response_model=PropertyAnalysisOut,
+    responses={202: {"model": AnalysisJobAccepted}},
+)
 async def analyze_from_address(
     body: AnalyzeIn,
+    run_async: bool = Query(False, alias="async"),
     session: AsyncSession = Depends(get_async_session),
 ):
+    if run_async:
+        job = await create_job(session, body.address_in)
+        start_job(job)
+        accepted = AnalysisJobAccepted(
+            job_id=job.id,
+            status=job.status,
+            status_url=f"/api/analysis-jobs/{job.id}",
+            events_url=f"/api/analysis-jobs/{job.id}/events",
+        )
+        return JSONResponse(
+            status_code=202,
+            content=accepted.model_dump(mode="json"),
+            headers={"Location": accepted.status_url},
+        )
+
     return await analyze_property_from_address(
         session=session, address_in=body.address_in
     )
+
+
+_ADDRESS_COLUMNS = ("address_in", "address", "full_address")
+
+
+def _addresses_from_csv(text: str) -> list[str]:
+    rows = [r for r in csv.reader(io.StringIO(text)) if any(c.strip() for c in r)]
+    if not rows:
+        return []
+    header = [c.strip().lower() for c in rows[0]]
+    for name in _ADDRESS_COLUMNS:
+        if name in header:
+            col = header.index(name)
+            return [r[col] for r in rows[1:] if len(r) > col]
+    # no header: one address per line, commas and all
+    return [", ".join(c.strip() for c in r if c.strip()) for r in rows]
+
+
+async def _read_addresses(request: Request) -> list[str]:
+    raw = await request.body()
+    content_type = request.headers.get("content-type", "")
+    if "json" in content_type:
+        try:
+            data = json.loads(raw or b"null")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if isinstance(data, dict):
+            data = data.get("addresses")
+        if not isinstance(data, list) or not all(isinstance(a, str) for a in data):
+            raise HTTPException(
+                status_code=422,
+                detail='Expected a JSON list of addresses or {"addresses": [...]}',
+            )
+        return data
+    return _addresses_from_csv(raw.decode("utf-8-sig", errors="replace"))
+
+
+@router.post("/batch")
+async def analyze_from_addresses(request: Request):
+    """
+    Body: a JSON list of addresses (or {"addresses": [...]}), or CSV/plain
+    text with one address per row (an "address" header column is honored).
+    Streams NDJSON, one line per distinct address as it completes:
+    {"address_in", "rows", "ok", "analysis" | "error"}.
+    """
+    addresses = await _read_addresses(request)
+    if not addresses:
+        raise HTTPException(status_code=422, detail="No addresses in request body")
+    if len(addresses) > settings.ANALYZE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.ANALYZE_BATCH_MAX_ITEMS} addresses per batch",
+        )
+
+    async def ndjson():
+        async for result in analyze_properties_from_addresses(addresses):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
@@ -17,6 +17,8 @@ from sqlalchemy.orm import selectinload
 from fastapi_pagination import Page, Params
 from fastapi_pagination.ext.sqlalchemy import paginate
 from typing import Optional
+from app.services.tasks.discovery_planner import search_criteria
+from app.services.tasks.search_index import search_index
 
 
 router = APIRouter(prefix="/clients", tags=["clients"])
@@ -109,6 +111,8 @@ async def onboard_new_client(
         client_out = new_client.scalar_one()
         if client_out is None:
             raise HTTPException(status_code=404, detail="Client not found after create")
+        for saved_search in client_out.saved_searches:
+            search_index.upsert(search_criteria(saved_search))
 
         return ClientOut.model_validate(client_out, from_attributes=True)
 
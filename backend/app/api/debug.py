@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from app.services.sb9 import get_property_geoms
 from app.services.sb9_2 import find_house_containment_split_feet
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_async_session
+from app.core.compute import compute
+from app.core.llm import llm
+from app.core.outbound import governor
+from app.core.scheduler import llm_scheduler
 from app.schemas.property import PropertyOut
 from app.models import Property
 
@@ -32,3 +36,37 @@ async def debug_get_property(
 ):
     prop = await session.get(Property, property_id)
     return prop
+
+
+@router.get("/outbound")
+async def debug_outbound():
+    """Per-host breaker state, concurrency window and call counters."""
+    return governor.snapshot()
+
+
+@router.get("/compute")
+async def debug_compute():
+    """Compute pool backend, queue depth and rejection count."""
+    return compute.snapshot()
+
+
+@router.get("/scheduler")
+async def debug_scheduler():
+    """Per-lane queue depth, running count and wait time for compute and LLM."""
+    return {
+        "compute": compute.scheduler.snapshot(),
+        "llm": llm_scheduler.snapshot(),
+    }
+
+
+@router.get("/llm")
+async def debug_llm():
+    """OpenAI gateway: rate-limit budget left and rate-limited pauses."""
+    return llm.snapshot()
+
+
+@router.get("/task-queue")
+async def debug_task_queue(request: Request):
+    """Postgres task queue workers per queue (TASKS_BACKEND=postgres only)."""
+    workers = request.app.state.task_workers
+    return workers.snapshot() if workers is not None else {"backend": "cloud"}
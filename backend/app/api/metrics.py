@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from app.core.compute import compute
+from app.core.llm import llm
+from app.core.metrics import metrics, snapshot_samples
+from app.core.outbound import governor
+from app.core.scheduler import llm_scheduler
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(request: Request):
+    """Prometheus text exposition: histograms plus component snapshots."""
+    extra = [
+        *snapshot_samples("sb9_outbound", governor.snapshot(), by="host"),
+        *snapshot_samples(
+            "sb9_compute",
+            {k: v for k, v in compute.snapshot().items() if k != "scheduler"},
+        ),
+        *snapshot_samples(
+            "sb9_scheduler",
+            {"compute": compute.scheduler.snapshot(), "llm": llm_scheduler.snapshot()},
+            by="scheduler",
+            dims={"lanes": "lane"},
+        ),
+        *snapshot_samples("sb9_llm", llm.snapshot()),
+    ]
+    workers = request.app.state.task_workers
+    if workers is not None:
+        extra += snapshot_samples(
+            "sb9_task_queue", workers.snapshot(), dims={"queues": "queue"}
+        )
+    return PlainTextResponse(
+        metrics.render(extra), media_type="text/plain; version=0.0.4"
+    )
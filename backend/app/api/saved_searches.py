@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from app.core import get_local_session
 from app.models import SavedSearch
 from app.schemas.saved_search import SavedSearchIn, SavedSearchOut
+from app.services.tasks.discovery_planner import search_criteria
+from app.services.tasks.search_index import search_index
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/saved-searches", tags=["saved-searches"])
@@ -16,6 +18,8 @@ def create_saved_search(
     db.add(s)
     db.commit()
     db.refresh(s)
+    if s.client and s.client.is_active:
+        search_index.upsert(search_criteria(s))
     return SavedSearchOut(**{**payload.model_dump(), "id": s.id})
 
 
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.core.scheduler import batch_lane
 
 from .entry import router as cron_entry_router
 from .dispatcher import router as dispatcher_router
@@ -7,7 +9,8 @@ from .saved_search import router as saved_search_router
 from .process_property import router as process_property_router
 from .process_listing import router as process_listing_router
 
-router = APIRouter()
+# Pipeline work yields to interactive requests for compute and LLM slots.
+router = APIRouter(dependencies=[Depends(batch_lane)])
 router.include_router(cron_entry_router)  # e.g., prefix="/cron" inside entry.py
 router.include_router(dispatcher_router)  # e.g., prefix="/tasks"
 router.include_router(saved_search_router)  # e.g., prefix="/tasks"
@@ -4,11 +4,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_async_session
 from app.core.config import settings
-from app.core.cloud_tasks import CloudTasksEnqueuer
+from app.core.cloud_tasks import TaskEnqueuer, get_enqueuer
 from app.services.tasks.dispatcher_service import dispatch_saved_searches
+from app.services.tasks.task_runs import run_once
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
-_enq = CloudTasksEnqueuer()
 
 
 def _assert_tasks_auth(secret: str | None) -> None:
@@ -19,8 +19,15 @@ def _assert_tasks_auth(secret: str | None) -> None:
 @router.post("/dispatch-saved-searches")
 async def task_dispatch_saved_searches(
     session: AsyncSession = Depends(get_async_session),
+    enqueuer: TaskEnqueuer = Depends(get_enqueuer),
     x_tasks_secret: str | None = Header(default=None),
+    x_cloudtasks_taskname: str | None = Header(default=None),
 ):
     _assert_tasks_auth(x_tasks_secret)
-    count = await dispatch_saved_searches(session=session, enqueuer=_enq)
-    return {"ok": True, "enqueued_saved_search_tasks": count}
+    outcome = await run_once(
+        stage="dispatch",
+        entity="all",
+        task_name=x_cloudtasks_taskname,
+        fn=lambda: dispatch_saved_searches(session=session, enqueuer=enqueuer),
+    )
+    return outcome.response("enqueued_discovery_tasks")
@@ -1,25 +1,25 @@
 from __future__ import annotations
 from typing import Annotated
 
-from fastapi import APIRouter, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from google.cloud import tasks_v2
 
 from app.core.config import settings
-from app.core.cloud_tasks import CloudTasksEnqueuer
+from app.core.cloud_tasks import TaskEnqueuer, get_enqueuer, task_name
 
 router = APIRouter(prefix="/cron", tags=["cron"])
-_enq = CloudTasksEnqueuer()
 
 
 @router.post("/enqueue-dispatcher")
 async def enqueue_dispatcher(
+    enqueuer: Annotated[TaskEnqueuer, Depends(get_enqueuer)],
     x_cron_secret: Annotated[str | None, Header(alias="x-cron-secret")] = None,
 ):
     # Only enforce when CRON_SECRET is set
     if settings.CRON_SECRET and x_cron_secret != settings.CRON_SECRET:
         raise HTTPException(status_code=401, detail="invalid secret")
 
-    _enq.enqueue_http_task(
+    await enqueuer.enqueue_http_task(
         queue=settings.CLOUD_TASKS_QUEUE_DISPATCHER,
         url=f"{settings.BASE_URL}/tasks/dispatch-saved-searches",
         method=tasks_v2.HttpMethod.POST,  # or just omit
@@ -30,5 +30,7 @@ async def enqueue_dispatcher(
         ),
         body={},
         oidc_audience=settings.BASE_URL,
+        # one dispatcher run per cycle, however often cron fires
+        name=task_name("dispatch", "all"),
     )
     return {"ok": True, "enqueued": 1}
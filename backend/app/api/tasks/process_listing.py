@@ -6,6 +6,7 @@ from app.core.db import get_async_session
 from app.core.config import settings
 from app.schemas.tasks import ListingTaskPayload
 from app.services.tasks.process_listing_service import process_listing
+from app.services.tasks.task_runs import run_once
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -20,7 +21,13 @@ async def task_process_listing(
     payload: ListingTaskPayload,
     session: AsyncSession = Depends(get_async_session),
     x_tasks_secret: str | None = Header(default=None),
+    x_cloudtasks_taskname: str | None = Header(default=None),
 ):
     _assert_tasks_auth(x_tasks_secret)
-    result = await process_listing(payload=payload, session=session)
-    return {"ok": True, **result}
+    outcome = await run_once(
+        stage="listing",
+        entity=f"{payload.listing_id}-{payload.saved_search_id}",
+        task_name=x_cloudtasks_taskname,
+        fn=lambda: process_listing(payload=payload, session=session),
+    )
+    return outcome.response("result")
@@ -1,15 +1,15 @@
 from __future__ import annotations
 from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.cloud_tasks import CloudTasksEnqueuer
+from app.core.cloud_tasks import TaskEnqueuer, get_enqueuer
 from app.services.tasks.process_property_service import process_property
+from app.services.tasks.task_runs import run_once
 from app.schemas.tasks import PropertyTaskPayload
 
 from app.core.db import get_async_session
 from app.core.config import settings
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
-_enq = CloudTasksEnqueuer()
 
 
 def _assert_tasks_auth(secret: str | None) -> None:
@@ -21,10 +21,17 @@ def _assert_tasks_auth(secret: str | None) -> None:
 async def task_process_property(
     payload: PropertyTaskPayload,
     session: AsyncSession = Depends(get_async_session),
+    enqueuer: TaskEnqueuer = Depends(get_enqueuer),
     x_tasks_secret: str | None = Header(default=None),
+    x_cloudtasks_taskname: str | None = Header(default=None),
 ):
     _assert_tasks_auth(x_tasks_secret)
-    await process_property(
-        payload=payload, session=session, enqueuer=_enq
-    )  # function below
-    return {"ok": True}
+    outcome = await run_once(
+        stage="property",
+        entity=str(payload.property_id),
+        task_name=x_cloudtasks_taskname,
+        fn=lambda: process_property(
+            payload=payload, session=session, enqueuer=enqueuer
+        ),
+    )
+    return outcome.response("enqueued_listing_tasks")
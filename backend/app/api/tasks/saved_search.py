@@ -5,11 +5,16 @@ from uuid import UUID
 
 from app.core.db import get_async_session
 from app.core.config import settings
-from app.core.cloud_tasks import CloudTasksEnqueuer
-from app.services.tasks.saved_search_service import process_saved_search
+from app.core.cloud_tasks import TaskEnqueuer, batch_entity, get_enqueuer
+from app.schemas.tasks import DiscoveryClusterPayload, SavedSearchBatchPayload
+from app.services.tasks.saved_search_service import (
+    process_discovery_cluster,
+    process_saved_search,
+    process_saved_searches,
+)
+from app.services.tasks.task_runs import run_once
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
-_enq = CloudTasksEnqueuer()
 
 
 def _assert_tasks_auth(secret: str | None) -> None:
@@ -21,10 +26,61 @@ def _assert_tasks_auth(secret: str | None) -> None:
 async def task_process_saved_search(
     saved_search_id: UUID,
     session: AsyncSession = Depends(get_async_session),
+    enqueuer: TaskEnqueuer = Depends(get_enqueuer),
     x_tasks_secret: str | None = Header(default=None),
+    x_cloudtasks_taskname: str | None = Header(default=None),
 ):
     _assert_tasks_auth(x_tasks_secret)
-    count = await process_saved_search(
-        saved_search_id=saved_search_id, session=session, enqueuer=_enq
+    outcome = await run_once(
+        stage="saved-search",
+        entity=str(saved_search_id),
+        task_name=x_cloudtasks_taskname,
+        fn=lambda: process_saved_search(
+            saved_search_id=saved_search_id, session=session, enqueuer=enqueuer
+        ),
     )
-    return {"ok": True, "enqueued_listing_tasks": count}
+    return outcome.response("result")
+
+
+@router.post("/process-saved-searches")
+async def task_process_saved_searches(
+    payload: SavedSearchBatchPayload,
+    session: AsyncSession = Depends(get_async_session),
+    enqueuer: TaskEnqueuer = Depends(get_enqueuer),
+    x_tasks_secret: str | None = Header(default=None),
+    x_cloudtasks_taskname: str | None = Header(default=None),
+):
+    _assert_tasks_auth(x_tasks_secret)
+    outcome = await run_once(
+        stage="saved-searches",
+        entity=batch_entity(payload.saved_search_ids),
+        task_name=x_cloudtasks_taskname,
+        fn=lambda: process_saved_searches(
+            saved_search_ids=payload.saved_search_ids,
+            session=session,
+            enqueuer=enqueuer,
+        ),
+    )
+    return outcome.response("result")
+
+
+@router.post("/process-discovery-cluster")
+async def task_process_discovery_cluster(
+    payload: DiscoveryClusterPayload,
+    session: AsyncSession = Depends(get_async_session),
+    enqueuer: TaskEnqueuer = Depends(get_enqueuer),
+    x_tasks_secret: str | None = Header(default=None),
+    x_cloudtasks_taskname: str | None = Header(default=None),
+):
+    _assert_tasks_auth(x_tasks_secret)
+    outcome = await run_once(
+        stage="discovery-cluster",
+        entity=batch_entity(payload.saved_search_ids),
+        task_name=x_cloudtasks_taskname,
+        fn=lambda: process_discovery_cluster(
+            saved_search_ids=payload.saved_search_ids,
+            session=session,
+            enqueuer=enqueuer,
+        ),
+    )
+    return outcome.response("result")
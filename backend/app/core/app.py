@@ -1,8 +1,17 @@
 # app/core/app.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from app.api import router as api_router
+from app.core.cloud_tasks import CloudTasksEnqueuer
+from app.core.compute import ComputeSaturated, compute
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.core.db import async_engine, engine
+from app.core.task_queue import PgTaskEnqueuer, TaskWorkerPool
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.services.tasks.task_runs import TaskBusy
 import logging
 
 log = logging.getLogger("sb9")
@@ -10,13 +19,46 @@ log = logging.getLogger("sb9")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    workers = None
+    if settings.TASKS_BACKEND == "postgres":
+        import app.services.tasks.handlers  # noqa: F401  (registers handlers)
+
+        app.state.enqueuer = PgTaskEnqueuer()
+        workers = TaskWorkerPool(app.state.enqueuer)
+    else:
+        app.state.enqueuer = CloudTasksEnqueuer()
+    app.state.task_workers = workers
     try:
+        compute.start()
+        if workers is not None:
+            workers.start()
         yield
     except Exception as e:
         log.exception("[SB9] Startup error: %s: %s", type(e).__name__, e)
         yield
     finally:
-        pass
+        if workers is not None:
+            await workers.stop()
+        compute.shutdown()
+        await app.state.enqueuer.aclose()
+        shutdown_tracing()
+
+
+async def _compute_saturated(request: Request, exc: ComputeSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after_s))},
+    )
+
+
+async def _task_busy(request: Request, exc: TaskBusy):
+    # non-2xx: Cloud Tasks retries the task instead of dropping it
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after_s)},
+    )
 
 
 def create_app() -> FastAPI:
@@ -41,6 +83,11 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.add_middleware(MetricsMiddleware)
+    setup_tracing(app, [engine, async_engine.sync_engine])
+    app.add_exception_handler(ComputeSaturated, _compute_saturated)
+    app.add_exception_handler(TaskBusy, _task_busy)
+
     # Include API routes
     app.include_router(api_router)
     return app
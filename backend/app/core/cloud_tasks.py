@@ -1,8 +1,19 @@
 # app/core/cloud_tasks.py (only showing the changed parts)
 from __future__ import annotations
+import asyncio
+import hashlib
 import json
-from typing import Mapping, Protocol
+import logging
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Iterable, Mapping, Protocol
+from fastapi import Request
 from app.core.config import settings
+from app.core.metrics import ENQUEUED_AT_HEADER
+from app.core.tracing import inject_headers
+
+log = logging.getLogger("sb9.tasks")
 
 
 def _normalize_method(method: object | None) -> str:
@@ -30,8 +41,41 @@ def _normalize_method(method: object | None) -> str:
     return "POST"
 
 
+@dataclass
+class HttpTask:
+    queue: str
+    url: str
+    method: str | None = None
+    headers: Mapping[str, str] | None = None
+    body: dict | None = None
+    oidc_audience: str | None = None
+    name: str | None = None
+
+
+def task_cycle() -> str:
+    """The current dispatch cycle: a TASK_CYCLE_S-wide time bucket."""
+    return str(int(time.time() // max(1, settings.TASK_CYCLE_S)))
+
+
+def task_name(stage: str, entity: str, cycle: str | None = None) -> str:
+    """
+    Deterministic task name for (stage, entity, cycle), so the same work
+    enqueued twice in a cycle (task retries, overlapping cron runs) is
+    deduplicated by the queue. A short hash leads the name because Cloud
+    Tasks shards poorly on shared prefixes.
+    """
+    base = re.sub(r"[^A-Za-z0-9_-]", "-", f"{stage}-{entity}-{cycle or task_cycle()}")
+    return f"{hashlib.sha1(base.encode()).hexdigest()[:8]}-{base}"[:500]
+
+
+def batch_entity(ids: Iterable[object]) -> str:
+    """Stable entity key for a set of ids (batch and cluster tasks)."""
+    joined = ",".join(sorted(str(i) for i in ids))
+    return hashlib.sha1(joined.encode()).hexdigest()[:16]
+
+
 class TaskEnqueuer(Protocol):
-    def enqueue_http_task(
+    async def enqueue_http_task(
         self,
         *,
         queue: str,
@@ -40,19 +84,64 @@ class TaskEnqueuer(Protocol):
         headers: Mapping[str, str] | None = None,
         body: dict | None = None,
         oidc_audience: str | None = None,
+        name: str | None = None,
     ) -> None: ...
 
+    async def enqueue_many(self, tasks: Iterable[HttpTask]) -> int: ...
+
+
+class _Enqueuer:
+    """Shared batching for both backends; subclasses implement enqueue_http_task."""
+
+    async def enqueue_many(self, tasks: Iterable[HttpTask]) -> int:
+        """
+        Enqueue concurrently, at most TASKS_ENQUEUE_CONCURRENCY at a time.
+        Every task is attempted; if any failed the first error is raised
+        after the rest finish. Returns the number enqueued.
+        """
+        sem = asyncio.Semaphore(max(1, settings.TASKS_ENQUEUE_CONCURRENCY))
+
+        async def one(task: HttpTask) -> None:
+            async with sem:
+                await self.enqueue_http_task(**asdict(task))
+
+        results = await asyncio.gather(*(one(t) for t in tasks), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        for e in errors:
+            log.warning("[tasks] enqueue failed: %s: %s", type(e).__name__, e)
+        if errors:
+            raise errors[0]
+        return len(results)
+
 
 USE_LOCAL = getattr(settings, "ENV", "").lower() == "dev"
 
 if USE_LOCAL:
     import httpx
 
-    class CloudTasksEnqueuer:
+    class CloudTasksEnqueuer(_Enqueuer):
         def __init__(self):
             self.base = settings.BASE_URL.rstrip("/")
+            self._client: httpx.AsyncClient | None = None
 
-        def enqueue_http_task(
+        @property
+        def client(self) -> httpx.AsyncClient:
+            # created lazily so it binds to the running event loop
+            if self._client is None:
+                self._client = httpx.AsyncClient(
+                    timeout=10.0,
+                    limits=httpx.Limits(
+                        max_connections=settings.TASKS_ENQUEUE_CONCURRENCY
+                    ),
+                )
+            return self._client
+
+        async def aclose(self) -> None:
+            if self._client is not None:
+                await self._client.aclose()
+                self._client = None
+
+        async def enqueue_http_task(
             self,
             *,
             queue: str,
@@ -61,6 +150,7 @@ if USE_LOCAL:
             headers: Mapping[str, str] | None = None,
             body: dict | None = None,
             oidc_audience: str | None = None,
+            name: str | None = None,
         ) -> None:
             target = url
             if not (target.startswith("http://") or target.startswith("https://")):
@@ -68,26 +158,44 @@ if USE_LOCAL:
                     target = "/" + target
                 target = f"{self.base}{target}"
 
-            req_headers = {"Content-Type": "application/json", **(headers or {})}
+            req_headers = {
+                "Content-Type": "application/json",
+                ENQUEUED_AT_HEADER: f"{time.time():.3f}",
+                **inject_headers(headers),
+            }
+            if name:
+                req_headers["X-CloudTasks-TaskName"] = name  # as Cloud Tasks sends
             m = _normalize_method(method)
 
-            with httpx.Client(timeout=10.0) as client:
-                resp = client.request(m, target, headers=req_headers, json=body)
-                resp.raise_for_status()
+            resp = await self.client.request(m, target, headers=req_headers, json=body)
+            resp.raise_for_status()
 
 else:
+    from google.api_core.exceptions import AlreadyExists
     from google.cloud import tasks_v2
 
-    class CloudTasksEnqueuer:
+    class CloudTasksEnqueuer(_Enqueuer):
         def __init__(self):
-            self.client = tasks_v2.CloudTasksClient()
+            self._client: tasks_v2.CloudTasksAsyncClient | None = None
+
+        @property
+        def client(self) -> tasks_v2.CloudTasksAsyncClient:
+            # grpc.aio channels bind to the running loop, so create lazily
+            if self._client is None:
+                self._client = tasks_v2.CloudTasksAsyncClient()
+            return self._client
+
+        async def aclose(self) -> None:
+            if self._client is not None:
+                await self._client.transport.close()
+                self._client = None
 
         def _queue_path(self, name: str) -> str:
-            return self.client.queue_path(
+            return tasks_v2.CloudTasksAsyncClient.queue_path(
                 settings.GCP_PROJECT, settings.GCP_REGION, name
             )
 
-        def enqueue_http_task(
+        async def enqueue_http_task(
             self,
             *,
             queue: str,
@@ -96,6 +204,7 @@ else:
             headers: Mapping[str, str] | None = None,
             body: dict | None = None,
             oidc_audience: str | None = None,
+            name: str | None = None,
         ) -> None:
             http_method = getattr(
                 tasks_v2.HttpMethod, _normalize_method(method), tasks_v2.HttpMethod.POST
@@ -103,7 +212,11 @@ else:
             http_request: dict = {
                 "http_method": http_method,
                 "url": url,
-                "headers": {"Content-Type": "application/json", **(headers or {})},
+                "headers": {
+                    "Content-Type": "application/json",
+                    ENQUEUED_AT_HEADER: f"{time.time():.3f}",
+                    **inject_headers(headers),
+                },
             }
             if body is not None:
                 http_request["body"] = json.dumps(body).encode("utf-8")
@@ -112,6 +225,16 @@ else:
                     "service_account_email": settings.TASKS_SERVICE_ACCOUNT_EMAIL,
                     "audience": oidc_audience,
                 }
-            self.client.create_task(
-                parent=self._queue_path(queue), task={"http_request": http_request}
-            )
+            parent = self._queue_path(queue)
+            task: dict = {"http_request": http_request}
+            if name:
+                task["name"] = f"{parent}/tasks/{name}"
+            try:
+                await self.client.create_task(parent=parent, task=task)
+            except AlreadyExists:
+                log.info("[tasks] %s already enqueued", name)
+
+
+def get_enqueuer(request: Request) -> TaskEnqueuer:
+    """Dependency: the app-wide enqueuer created in the lifespan."""
+    return request.app.state.enqueuer
@@ -0,0 +1,145 @@
+# app/core/compute.py
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+from .config import settings
+from .metrics import forwarded, metrics
+from .scheduler import LaneFull, make_scheduler
+
+log = logging.getLogger("sb9.compute")
+
+T = TypeVar("T")
+
+
+class ComputeSaturated(Exception):
+    """All compute workers are busy and the wait queue is full."""
+
+    def __init__(self, retry_after_s: float):
+        super().__init__("compute pool saturated, retry later")
+        self.retry_after_s = retry_after_s
+
+
+def _call_forwarding(call: Callable[[], T]) -> tuple[T, list]:
+    # runs in a pool process: hand its timings (e.g. R2 uploads) back
+    with forwarded() as observations:
+        result = call()
+    return result, observations
+
+
+class ComputeExecutor:
+    """
+    Runs CPU-bound geometry work off the event loop. Uses a process pool
+    (so the sweep doesn't hold the GIL the request handlers need) and falls
+    back to threads where processes aren't available. At most ``workers``
+    jobs run; slots are handed out by a fair scheduler so interactive
+    analyses aren't starved by batch pipeline work, and each lane may queue
+    ``queue_size`` more. Beyond that, ComputeSaturated so callers shed load
+    instead of piling up. Functions and arguments must be picklable in
+    process mode.
+    """
+
+    def __init__(self) -> None:
+        self._pool: Executor | None = None
+        self._pool_lock = threading.Lock()
+        self.backend: str | None = None
+        self.pending = 0
+        self.rejected = 0
+        self.completed = 0
+        self.scheduler = make_scheduler(
+            "compute",
+            capacity=self.workers,
+            batch_max_concurrency=settings.COMPUTE_BATCH_MAX_CONCURRENCY
+            or max(1, self.workers - 1),
+            max_queue=settings.COMPUTE_QUEUE_SIZE,
+        )
+
+    @property
+    def workers(self) -> int:
+        return max(1, settings.COMPUTE_WORKERS)
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if settings.COMPUTE_BACKEND == "process":
+            try:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self.backend = "process"
+            except (OSError, NotImplementedError, ImportError) as e:
+                log.warning("[compute] process pool unavailable (%s); using threads", e)
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="sb9-compute"
+            )
+            self.backend = "thread"
+        log.info("[compute] %s pool with %d workers", self.backend, self.workers)
+
+    def _replace(self, broken: Executor) -> None:
+        # Every job on the broken pool fails at once; only the first caller
+        # rebuilds it, the others retry on the replacement.
+        with self._pool_lock:
+            if self._pool is not broken:
+                return
+            log.exception("[compute] process pool broke; restarting")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self.start()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        try:
+            lane = await self.scheduler.acquire()
+        except LaneFull:
+            self.rejected += 1
+            raise ComputeSaturated(settings.COMPUTE_RETRY_AFTER_S)
+        self.start()
+        call = functools.partial(fn, *args, **kwargs)
+        forwarding = self.backend == "process"
+        if forwarding:
+            call = functools.partial(_call_forwarding, call)
+        self.pending += 1
+        try:
+            pool = self._pool
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(pool, call)
+            except BrokenProcessPool:
+                # a worker died (OOM, segfault in GEOS); replace the pool once
+                self._replace(pool)
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._pool, call
+                )
+            self.completed += 1
+            if forwarding:
+                result, observations = result
+                metrics.replay(observations)
+            return result
+        finally:
+            self.pending -= 1
+            self.scheduler.release(lane)
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "pending": self.pending,
+            "completed_total": self.completed,
+            "rejected_total": self.rejected,
+            "scheduler": self.scheduler.snapshot(),
+        }
+
+
+compute = ComputeExecutor()
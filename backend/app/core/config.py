@@ -30,10 +30,90 @@ class Settings(BaseModel):
     RESO_BEARER_TOKEN: str = os.getenv("RESO_BEARER_TOKEN")
 
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
+    OPENAI_BASE_URL: str | None = os.getenv("OPENAI_BASE_URL")
+
+    OCGIS_BASE_URL: str = os.getenv(
+        "OCGIS_BASE_URL", "https://www.ocgis.com/arcpub/rest/services"
+    )
+
+    # Outbound call governor (per host): rate limit, AIMD concurrency, retries
+    # and circuit breaker. See app/core/outbound.py.
+    OUTBOUND_RATE_PER_SEC: float = float(os.getenv("OUTBOUND_RATE_PER_SEC", "5"))
+    OUTBOUND_BURST: float = float(os.getenv("OUTBOUND_BURST", "10"))
+    OUTBOUND_MIN_CONCURRENCY: int = int(os.getenv("OUTBOUND_MIN_CONCURRENCY", "1"))
+    OUTBOUND_MAX_CONCURRENCY: int = int(os.getenv("OUTBOUND_MAX_CONCURRENCY", "16"))
+    OUTBOUND_LATENCY_TARGET_S: float = float(
+        os.getenv("OUTBOUND_LATENCY_TARGET_S", "5")
+    )
+    OUTBOUND_TIMEOUT_S: float = float(os.getenv("OUTBOUND_TIMEOUT_S", "30"))
+    OUTBOUND_MAX_RETRIES: int = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
+    OUTBOUND_BACKOFF_CAP_S: float = float(os.getenv("OUTBOUND_BACKOFF_CAP_S", "8"))
+    OUTBOUND_BREAKER_FAILURES: int = int(os.getenv("OUTBOUND_BREAKER_FAILURES", "5"))
+    OUTBOUND_BREAKER_RESET_S: float = float(
+        os.getenv("OUTBOUND_BREAKER_RESET_S", "30")
+    )
+
+    # OC GIS response shaping: "full" (geojson, all fields), "compact" (geojson,
+    # geometry only, generalized) or "pbf" (compact + ArcGIS protobuf)
+    OCGIS_RESPONSE_PROFILE: str = os.getenv("OCGIS_RESPONSE_PROFILE", "full")
+    OCGIS_GEOMETRY_PRECISION: int = int(os.getenv("OCGIS_GEOMETRY_PRECISION", "2"))
+    OCGIS_MAX_ALLOWABLE_OFFSET_FT: float = float(
+        os.getenv("OCGIS_MAX_ALLOWABLE_OFFSET_FT", "0.25")
+    )
+
+    # Parsed-address LRU in app/utils/format_verified_address.py
+    ADDRESS_PARSE_CACHE_SIZE: int = int(os.getenv("ADDRESS_PARSE_CACHE_SIZE", "4096"))
+
+    # CPU-bound split search pool, see app/core/compute.py.
+    # COMPUTE_BACKEND: "process" (default) or "thread".
+    COMPUTE_BACKEND: str = os.getenv("COMPUTE_BACKEND", "process")
+    COMPUTE_WORKERS: int = int(os.getenv("COMPUTE_WORKERS", "2"))
+    COMPUTE_QUEUE_SIZE: int = int(os.getenv("COMPUTE_QUEUE_SIZE", "8"))
+    COMPUTE_RETRY_AFTER_S: float = float(os.getenv("COMPUTE_RETRY_AFTER_S", "10"))
+    # 0 = all workers but one, so an interactive analysis always has a slot.
+    COMPUTE_BATCH_MAX_CONCURRENCY: int = int(
+        os.getenv("COMPUTE_BATCH_MAX_CONCURRENCY", "0")
+    )
+
+    # Priority lanes (app/core/scheduler.py): interactive = admin/API requests,
+    # batch = Cloud Tasks pipeline. Slots are shared by weight.
+    SCHED_INTERACTIVE_WEIGHT: float = float(
+        os.getenv("SCHED_INTERACTIVE_WEIGHT", "4")
+    )
+    SCHED_BATCH_WEIGHT: float = float(os.getenv("SCHED_BATCH_WEIGHT", "1"))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_BATCH_MAX_CONCURRENCY: int = int(os.getenv("LLM_BATCH_MAX_CONCURRENCY", "6"))
+    LLM_MAX_QUEUE: int = int(os.getenv("LLM_MAX_QUEUE", "200"))
+    # OpenAI gateway (app/core/llm.py): account limits per minute, retries.
+    LLM_RPM: float = float(os.getenv("LLM_RPM", "500"))
+    LLM_TPM: float = float(os.getenv("LLM_TPM", "200000"))
+    LLM_EST_OUTPUT_TOKENS: int = int(os.getenv("LLM_EST_OUTPUT_TOKENS", "1500"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    LLM_BACKOFF_CAP_S: float = float(os.getenv("LLM_BACKOFF_CAP_S", "60"))
+
+    # POST /analyze-property-from-address?async=true
+    ANALYSIS_JOB_POLL_S: float = float(os.getenv("ANALYSIS_JOB_POLL_S", "0.5"))
+    ANALYSIS_JOB_STALE_S: float = float(os.getenv("ANALYSIS_JOB_STALE_S", "600"))
+
+    # POST /analyze-property-from-address/batch
+    ANALYZE_BATCH_MAX_ITEMS: int = int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", "1000"))
+    ANALYZE_BATCH_MAX_IN_FLIGHT: int = int(
+        os.getenv("ANALYZE_BATCH_MAX_IN_FLIGHT", "8")
+    )
+    ANALYZE_BATCH_GEOCODE_CONCURRENCY: int = int(
+        os.getenv("ANALYZE_BATCH_GEOCODE_CONCURRENCY", "8")
+    )
+    ANALYZE_BATCH_GEOMETRY_CONCURRENCY: int = int(
+        os.getenv("ANALYZE_BATCH_GEOMETRY_CONCURRENCY", "4")
+    )
+    ANALYZE_BATCH_SPLIT_CONCURRENCY: int = int(
+        os.getenv("ANALYZE_BATCH_SPLIT_CONCURRENCY", "2")
+    )
 
     TWILIO_SID: str = os.getenv("TWILIO_SID")
     TWILIO_TOKEN: str = os.getenv("TWILIO_TOKEN")
     TWILIO_FROM: str = os.getenv("TWILIO_FROM")
+    TWILIO_BASE_URL: str | None = os.getenv("TWILIO_BASE_URL")
 
     PAGE_TOKEN: str = os.getenv("PAGE_TOKEN")
     APP_SECRET: str | None = os.getenv("APP_SECRET")
@@ -44,6 +124,9 @@ class Settings(BaseModel):
     EMAIL_FROM_NAME: str = os.getenv("EMAIL_FROM_NAME")
     GMAIL_USER: str = os.getenv("GMAIL_USER")
     GMAIL_PASS: str = os.getenv("GMAIL_PASS")
+    SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
+    SMTP_START_TLS: bool = os.getenv("SMTP_START_TLS", "true").lower() == "true"
 
     CRON_SECRET: str | None = os.getenv("CRON_SECRET")
     GCP_PROJECT: str = os.getenv("GCP_PROJECT", "")
@@ -60,9 +143,88 @@ class Settings(BaseModel):
     CLOUD_TASKS_QUEUE_LISTING: str = os.getenv(
         "CLOUD_TASKS_QUEUE_LISTING", "listing-jobs"
     )
+    # Discovery planner (services/tasks/discovery_planner.py): saved searches
+    # with the same subtype and max prices within PRICE_SPREAD x of each other
+    # share one LLM discovery call per cycle.
+    DISCOVERY_CLUSTERING: bool = (
+        os.getenv("DISCOVERY_CLUSTERING", "true").lower() == "true"
+    )
+    DISCOVERY_MAX_CLUSTER_SIZE: int = int(os.getenv("DISCOVERY_MAX_CLUSTER_SIZE", "20"))
+    DISCOVERY_PRICE_SPREAD: float = float(os.getenv("DISCOVERY_PRICE_SPREAD", "1.5"))
+    # Unclustered searches go out as process-saved-searches tasks of this many
+    # ids; the batch handler runs up to BATCH_CONCURRENCY discoveries at once.
+    DISPATCH_CHUNK_SIZE: int = int(os.getenv("DISPATCH_CHUNK_SIZE", "50"))
+    SAVED_SEARCH_BATCH_CONCURRENCY: int = int(
+        os.getenv("SAVED_SEARCH_BATCH_CONCURRENCY", "4")
+    )
+    # Per-search discovery schedule (services/tasks/search_schedule.py). The
+    # dispatcher only enqueues searches whose next_run_at is due and pushes it
+    # out by LEASE_S so a lost task is retried. After a run the interval is
+    # multiplied by SPEEDUP if the search got new matches, else by BACKOFF,
+    # and kept within [MIN_S, MAX_S].
+    SEARCH_INTERVAL_DEFAULT_S: int = int(
+        os.getenv("SEARCH_INTERVAL_DEFAULT_S", "3600")
+    )
+    SEARCH_INTERVAL_MIN_S: int = int(os.getenv("SEARCH_INTERVAL_MIN_S", "1800"))
+    SEARCH_INTERVAL_MAX_S: int = int(os.getenv("SEARCH_INTERVAL_MAX_S", "259200"))
+    SEARCH_INTERVAL_SPEEDUP: float = float(
+        os.getenv("SEARCH_INTERVAL_SPEEDUP", "0.5")
+    )
+    SEARCH_INTERVAL_BACKOFF: float = float(
+        os.getenv("SEARCH_INTERVAL_BACKOFF", "1.5")
+    )
+    SEARCH_DISPATCH_LEASE_S: int = int(os.getenv("SEARCH_DISPATCH_LEASE_S", "3600"))
+    # In-memory saved-search matcher (services/tasks/search_index.py). Updated
+    # when searches are created through the API; fully reloaded after this.
+    SEARCH_INDEX_TTL_S: int = int(os.getenv("SEARCH_INDEX_TTL_S", "300"))
+    # A pending process-property claim older than this is assumed lost and
+    # the next matching listing re-enqueues it (services/tasks/property_fanin.py).
+    PROPERTY_TASK_PENDING_TTL_S: int = int(
+        os.getenv("PROPERTY_TASK_PENDING_TTL_S", "3600")
+    )
+    # Stage fusion (services/tasks/process_property_service.py): a finished
+    # process-property task analyzes up to FUSION_MAX_LISTINGS of its waiting
+    # listings in the same request while it is inside FUSION_BUDGET_S and the
+    # batch LLM lane has free slots; the rest are enqueued as usual.
+    TASKS_FUSION: bool = os.getenv("TASKS_FUSION", "false").lower() == "true"
+    TASKS_FUSION_BUDGET_S: float = float(os.getenv("TASKS_FUSION_BUDGET_S", "120"))
+    TASKS_FUSION_MAX_LISTINGS: int = int(os.getenv("TASKS_FUSION_MAX_LISTINGS", "8"))
+    TASKS_FUSION_CONCURRENCY: int = int(os.getenv("TASKS_FUSION_CONCURRENCY", "2"))
+    # An already-analyzed (listing, saved search) pair is re-analyzed when the
+    # price moves by at least this fraction (services/tasks/listing_changes.py).
+    LISTING_REANALYZE_PRICE_PCT: float = float(
+        os.getenv("LISTING_REANALYZE_PRICE_PCT", "0.03")
+    )
+    # "cloud": Cloud Tasks (or local self-POSTs when ENV=dev). "postgres": the
+    # task_queue table with in-process workers (core/task_queue.py).
+    TASKS_BACKEND: str = os.getenv("TASKS_BACKEND", "cloud").lower()
+    TASK_QUEUE_DEFAULT_CONCURRENCY: int = int(
+        os.getenv("TASK_QUEUE_DEFAULT_CONCURRENCY", "4")
+    )
+    TASK_QUEUE_CONCURRENCY: str | None = os.getenv("TASK_QUEUE_CONCURRENCY")
+    TASK_QUEUE_VISIBILITY_TIMEOUT_S: int = int(
+        os.getenv("TASK_QUEUE_VISIBILITY_TIMEOUT_S", "900")
+    )
+    TASK_QUEUE_MAX_ATTEMPTS: int = int(os.getenv("TASK_QUEUE_MAX_ATTEMPTS", "5"))
+    TASK_QUEUE_BACKOFF_S: float = float(os.getenv("TASK_QUEUE_BACKOFF_S", "5"))
+    TASK_QUEUE_BACKOFF_MAX_S: float = float(os.getenv("TASK_QUEUE_BACKOFF_MAX_S", "600"))
+    TASK_QUEUE_POLL_S: float = float(os.getenv("TASK_QUEUE_POLL_S", "1.0"))
+    # Width of a dispatch cycle for deterministic task names: the same stage and
+    # entity enqueued twice within one cycle is deduplicated. Keep it at or
+    # below PROPERTY_TASK_PENDING_TTL_S so a lost property task can be re-sent.
+    TASK_CYCLE_S: int = int(os.getenv("TASK_CYCLE_S", "3600"))
+    # Concurrent create_task calls (or local self-POSTs) per enqueue_many batch.
+    TASKS_ENQUEUE_CONCURRENCY: int = int(os.getenv("TASKS_ENQUEUE_CONCURRENCY", "64"))
     TASKS_SERVICE_ACCOUNT_EMAIL: str | None = os.getenv("TASKS_SERVICE_ACCOUNT_EMAIL")
     TASKS_SHARED_SECRET: str | None = os.getenv("TASKS_SHARED_SECRET")
 
+    # OpenTelemetry (app/core/tracing.py). TRACING_EXPORTER: "otlp" (endpoint
+    # from OTEL_EXPORTER_OTLP_ENDPOINT) or "file" (JSON lines to TRACING_FILE).
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "otlp").lower()
+    TRACING_FILE: str = os.getenv("TRACING_FILE", "traces.jsonl")
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "sb9-analyzer")
+
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ADMIN_USERNAME: str = os.getenv("ADMIN_USERNAME")
     ADMIN_PASSWORD_HASH: str = os.getenv("ADMIN_PASSWORD_HASH")
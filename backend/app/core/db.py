@@ -8,6 +8,7 @@ from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from .config import settings
+from .metrics import instrument_engine
 
 
 class Base(DeclarativeBase):
@@ -41,6 +42,8 @@ engine = create_engine(
     pool_pre_ping=True,
 )
 
+instrument_engine(engine)
+
 SessionLocal = sessionmaker(
     bind=engine,
     autocommit=False,
@@ -74,6 +77,8 @@ async_engine = create_async_engine(
     pool_pre_ping=True,
 )
 
+instrument_engine(async_engine.sync_engine)
+
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
     class_=AsyncSession,
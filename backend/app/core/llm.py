@@ -0,0 +1,228 @@
+# app/core/llm.py
+"""
+Shared gateway for OpenAI calls.
+
+Every LLM call in the process goes through ``llm.responses(caller=...)``:
+
+- one AsyncOpenAI client (its own retries off; the gateway retries);
+- priority and concurrency cap from llm_scheduler (interactive lane ahead of
+  the batch pipeline, LLM_MAX_CONCURRENCY in flight);
+- token buckets for requests and tokens per minute (LLM_RPM / LLM_TPM). A
+  call reserves its estimated tokens up front and is settled against the
+  reported usage afterwards;
+- 429/5xx/timeouts are retried up to LLM_MAX_RETRIES with jittered backoff,
+  waiting at least the server's retry-after. A 429 also holds back every
+  other caller for that long instead of letting them hit the limit too.
+  When retries run out LLMUnavailable is raised, so the task fails and is
+  retried by the queue rather than recording a made-up result.
+
+Latency, retries and token usage are recorded per caller (core/metrics.py).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any
+
+import openai
+from openai import AsyncOpenAI
+
+from .config import settings
+from .metrics import external_call, metrics
+from .scheduler import llm_scheduler
+
+log = logging.getLogger("sb9.llm")
+
+LLM_SECONDS = metrics.histogram(
+    "sb9_llm_request_seconds",
+    "OpenAI call duration per caller, including rate-limit waits and retries.",
+    ("caller", "outcome"),
+)
+LLM_TOKENS = metrics.counter(
+    "sb9_llm_tokens_total", "OpenAI tokens used per caller.", ("caller", "kind")
+)
+LLM_RETRIES = metrics.counter(
+    "sb9_llm_retries_total", "OpenAI call retries per caller.", ("caller", "reason")
+)
+
+_RETRYABLE = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class LLMUnavailable(Exception):
+    """Rate limited or failing after LLM_MAX_RETRIES retries."""
+
+
+class RateBucket:
+    """
+    Per-minute token bucket. A reservation larger than what is left waits for
+    the refill but is never refused; settling can push the balance negative,
+    which delays later calls instead of the one that overran its estimate.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def wait_s(self, n: float) -> float:
+        self._refill()
+        need = min(n, self.capacity)
+        return 0.0 if self.tokens >= need else (need - self.tokens) / self.rate
+
+    def take(self, n: float) -> None:
+        self._refill()
+        self.tokens -= n
+
+
+def _retry_after_s(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def _estimate_tokens(kwargs: dict) -> int:
+    # ~4 chars per token for the prompt plus the expected completion
+    prompt = kwargs.get("input") or ""
+    chars = len(prompt) if isinstance(prompt, str) else len(str(prompt))
+    return chars // 4 + settings.LLM_EST_OUTPUT_TOKENS
+
+
+class LLMGateway:
+    def __init__(self) -> None:
+        self._client: AsyncOpenAI | None = None
+        self.rpm = RateBucket(settings.LLM_RPM)
+        self.tpm = RateBucket(settings.LLM_TPM)
+        self._paused_until = 0.0
+        self.rate_limited = 0
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                max_retries=0,
+            )
+        return self._client
+
+    def has_capacity(self) -> bool:
+        """Whether a call from the current lane would start without waiting."""
+        return (
+            llm_scheduler.has_capacity()
+            and time.monotonic() >= self._paused_until
+            and self.rpm.wait_s(1) == 0.0
+        )
+
+    async def _reserve(self, tokens: int) -> None:
+        while True:
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.rpm.wait_s(1),
+                self.tpm.wait_s(tokens),
+            )
+            if wait <= 0:
+                self.rpm.take(1)
+                self.tpm.take(tokens)
+                return
+            await asyncio.sleep(wait)
+
+    async def responses(self, *, caller: str, **kwargs: Any):
+        """``client.responses.create(**kwargs)`` through the gateway."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            resp = await self._call(caller, kwargs)
+            outcome = "ok"
+            return resp
+        finally:
+            LLM_SECONDS.observe(
+                time.perf_counter() - started, caller=caller, outcome=outcome
+            )
+
+    async def _call(self, caller: str, kwargs: dict):
+        estimate = _estimate_tokens(kwargs)
+        attempts = settings.LLM_MAX_RETRIES + 1
+        for attempt in range(attempts):
+            async with llm_scheduler.slot():
+                await self._reserve(estimate)
+                try:
+                    with external_call("openai"):
+                        resp = await self.client.responses.create(**kwargs)
+                except _RETRYABLE as e:
+                    self.tpm.take(-estimate)  # nothing was consumed
+                    error = e
+                else:
+                    self._settle(caller, resp, estimate)
+                    return resp
+
+            if getattr(error, "code", None) == "insufficient_quota":
+                raise LLMUnavailable(f"{caller}: {error}") from error
+            hinted = _retry_after_s(error)
+            if isinstance(error, openai.RateLimitError):
+                self.rate_limited += 1
+                pause = hinted if hinted is not None else 1.0
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            if attempt == attempts - 1:
+                raise LLMUnavailable(
+                    f"{caller}: {type(error).__name__} after {attempts} attempts"
+                ) from error
+            LLM_RETRIES.inc(caller=caller, reason=type(error).__name__)
+            backoff = random.uniform(
+                0, min(settings.LLM_BACKOFF_CAP_S, 1.0 * (2**attempt))
+            )
+            delay = max(backoff, hinted or 0.0)
+            log.warning(
+                "[llm] %s %s, retry %d in %.1fs",
+                caller,
+                type(error).__name__,
+                attempt + 1,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+    def _settle(self, caller: str, resp, estimate: int) -> None:
+        usage = getattr(resp, "usage", None)
+        if usage is None:
+            return
+        used = usage.total_tokens or 0
+        self.tpm.take(used - estimate)
+        LLM_TOKENS.inc(usage.input_tokens or 0, caller=caller, kind="input")
+        LLM_TOKENS.inc(usage.output_tokens or 0, caller=caller, kind="output")
+
+    def snapshot(self) -> dict:
+        self.rpm._refill()
+        self.tpm._refill()
+        return {
+            "requests_available": round(self.rpm.tokens, 1),
+            "tokens_available": round(self.tpm.tokens, 1),
+            "paused_s": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "rate_limited_total": self.rate_limited,
+        }
+
+
+llm = LLMGateway()
@@ -0,0 +1,451 @@
+# app/core/metrics.py
+"""
+In-process metrics, exposed in the Prometheus text format at GET /api/metrics.
+
+Histograms cover pipeline stages (services/tasks/task_runs.run_once), external
+calls (OC GIS, OpenAI, R2, SMTP, Twilio), HTTP requests with the DB time each
+one spent, task queue wait (from the X-Enqueued-At header or the task_queue
+row) and listing-to-notification latency. Gauges for the outbound governor,
+schedulers, compute pool and task queue are read from their snapshot()s at
+scrape time. Everything is per process; scrape each instance.
+
+Stage timings are also logged as one JSON line each on ``sb9.timing``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+timing_log = logging.getLogger("sb9.timing")
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+ENQUEUED_AT_HEADER = "X-Enqueued-At"
+
+
+def _fmt(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], **extra: str) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(
+            k, str(v).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+        )
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type}",
+            *self._samples(),
+        ]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        forward = _forwarded.get()
+        if forward is not None:
+            forward.append((self.name, value, labels))
+            return
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            s[i] += 1
+            s[-1] += value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(s)) for k, s in self._series.items()]
+        out: list[str] = []
+        for key, s in items:
+            cumulative = 0.0
+            for le, n in zip(self.buckets + (math.inf,), s[:-1]):
+                cumulative += n
+                lbl = _labels(self.labelnames, key, le=_fmt(le))
+                out.append(f"{self.name}_bucket{lbl} {_fmt(cumulative)}")
+            lbl = _labels(self.labelnames, key)
+            out.append(f"{self.name}_count{lbl} {_fmt(cumulative)}")
+            out.append(f"{self.name}_sum{lbl} {_fmt(s[-1])}")
+        return out
+
+
+# (name, type, help, [(labels, value)]), built from snapshot()s at scrape time
+Sample = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+# (histogram name, value, labels) observed in a compute-pool process
+Observation = tuple[str, float, dict[str, str]]
+_forwarded: contextvars.ContextVar[list[Observation] | None] = contextvars.ContextVar(
+    "sb9_forwarded", default=None
+)
+
+
+@contextmanager
+def forwarded() -> Iterator[list[Observation]]:
+    """
+    Collect the block's histogram observations instead of recording them.
+    A compute-pool process has its own registry that is never scraped; it
+    returns these with its result and the parent ``replay``s them.
+    """
+    out: list[Observation] = []
+    token = _forwarded.set(out)
+    try:
+        yield out
+    finally:
+        _forwarded.reset(token)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        m = Counter(name, help, labelnames)
+        self._metrics.append(m)
+        return m
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        m = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(m)
+        return m
+
+    def replay(self, observations: Iterable[Observation]) -> None:
+        """Record observations collected with ``forwarded`` in another process."""
+        by_name = {m.name: m for m in self._metrics if isinstance(m, Histogram)}
+        for name, value, labels in observations:
+            hist = by_name.get(name)
+            if hist is not None:
+                hist.observe(value, **labels)
+
+    def render(self, extra: Iterable[Sample] = ()) -> str:
+        """Text exposition of every registered metric plus ``extra`` samples."""
+        lines: list[str] = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        for name, kind, help, values in extra:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                names = tuple(labels)
+                lbl = _labels(names, tuple(labels[n] for n in names))
+                lines.append(f"{name}{lbl} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "sb9_stage_seconds",
+    "Pipeline stage handler duration.",
+    ("stage", "outcome"),
+)
+STAGE_SKIPPED = metrics.counter(
+    "sb9_stage_skipped_total",
+    "Stage runs skipped as duplicates (running elsewhere or already done).",
+    ("stage", "reason"),
+)
+EXTERNAL_SECONDS = metrics.histogram(
+    "sb9_external_call_seconds",
+    "Outbound call duration by service.",
+    ("service", "outcome"),
+)
+HTTP_SECONDS = metrics.histogram(
+    "sb9_http_request_seconds",
+    "HTTP request duration by route.",
+    ("method", "route", "status"),
+)
+DB_SECONDS = metrics.histogram(
+    "sb9_db_seconds_per_request",
+    "Time spent in DB statements per HTTP request or queued task.",
+    ("route",),
+)
+QUEUE_WAIT_SECONDS = metrics.histogram(
+    "sb9_task_queue_wait_seconds",
+    "Time from enqueue to the start of the task's handler.",
+    ("task",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+LISTING_TO_NOTIFY_SECONDS = metrics.histogram(
+    "sb9_listing_to_notification_seconds",
+    "Time from a listing being ingested to its client notification.",
+    buckets=(60, 300, 900, 1800, 3600, 7200, 14400, 43200, 86400, 172800),
+)
+
+
+@contextmanager
+def timed(hist: Histogram, **labels: str) -> Iterator[None]:
+    """Observe the block's duration; ``outcome`` is "ok" or "error"."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        if "outcome" in hist.labelnames:
+            labels["outcome"] = outcome
+        hist.observe(time.perf_counter() - started, **labels)
+
+
+def external_call(service: str):
+    """``with external_call("openai"): ...`` -- times one outbound call."""
+    return timed(EXTERNAL_SECONDS, service=service)
+
+
+@contextmanager
+def stage_timer(stage: str, **fields: object) -> Iterator[None]:
+    """Time a pipeline stage into STAGE_SECONDS and log it on sb9.timing."""
+    started = time.perf_counter()
+    db = _db_seconds.get()
+    db_before = db[0] if db else 0.0
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(seconds, stage=stage, outcome=outcome)
+        record = {
+            "stage": stage,
+            "outcome": outcome,
+            "seconds": round(seconds, 4),
+            **({"db_seconds": round(db[0] - db_before, 4)} if db else {}),
+            **fields,
+        }
+        timing_log.info(json.dumps(record, default=str))
+
+
+def observe_queue_wait(
+    task: str, enqueued_at: float | str | None, *, now: float | None = None
+) -> None:
+    """``enqueued_at``: epoch seconds, as sent in the X-Enqueued-At header."""
+    try:
+        wait = (now or time.time()) - float(enqueued_at)
+    except (TypeError, ValueError):
+        return
+    QUEUE_WAIT_SECONDS.observe(max(0.0, wait), task=task)
+
+
+def snapshot_samples(
+    prefix: str,
+    snapshot: dict,
+    *,
+    by: str | None = None,
+    dims: dict[str, str] | None = None,
+) -> list[Sample]:
+    """
+    Turn a component's snapshot() dict into samples: numbers become gauges
+    (counters when the key ends in _total), strings become ``{key="value"} 1``
+    info gauges, nested dicts extend the prefix, and keys listed in ``dims``
+    (e.g. {"lanes": "lane"}) fan out into a label per entry. With ``by`` the
+    top-level keys are entries too (e.g. one per host).
+    """
+    dims = dims or {}
+    out: dict[str, Sample] = {}
+
+    def add(name: str, lbls: dict[str, str], value: float) -> None:
+        kind = "counter" if name.endswith("_total") else "gauge"
+        help = name.removeprefix("sb9_").replace("_", " ") + " (snapshot)"
+        out.setdefault(name, (name, kind, help, []))[3].append((lbls, value))
+
+    def walk(pfx: str, snap: dict, lbls: dict[str, str]) -> None:
+        for key, value in snap.items():
+            if key in dims and isinstance(value, dict):
+                for entry, sub in value.items():
+                    walk(pfx, sub, {**lbls, dims[key]: str(entry)})
+            elif isinstance(value, dict):
+                walk(f"{pfx}_{key}", value, lbls)
+            elif isinstance(value, bool):
+                add(f"{pfx}_{key}", lbls, float(value))
+            elif isinstance(value, (int, float)):
+                add(f"{pfx}_{key}", lbls, float(value))
+            elif isinstance(value, str):
+                add(f"{pfx}_{key}", {**lbls, key: value}, 1.0)
+
+    if by is None:
+        walk(prefix, snapshot, {})
+    else:
+        for entry, sub in snapshot.items():
+            walk(prefix, sub, {by: str(entry)})
+    return list(out.values())
+
+
+# ---- DB time per request ----
+# A one-element list so time added in worker threads/greenlets (copied
+# contexts) lands in the same accumulator.
+_db_seconds: contextvars.ContextVar[list[float] | None] = contextvars.ContextVar(
+    "sb9_db_seconds", default=None
+)
+
+
+@contextmanager
+def track_db_time(route: str) -> Iterator[None]:
+    """Accumulate DB statement time for the block into DB_SECONDS{route}."""
+    acc = [0.0]
+    token = _db_seconds.set(acc)
+    try:
+        yield
+    finally:
+        _db_seconds.reset(token)
+        DB_SECONDS.observe(acc[0], route=route)
+
+
+def instrument_engine(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sb9_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["sb9_started"].pop()
+        acc = _db_seconds.get()
+        if acc is not None:
+            acc[0] += time.perf_counter() - started
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # a failed statement never reaches after_cursor_execute
+        conn = context.connection
+        if conn is not None and conn.info.get("sb9_started"):
+            conn.info["sb9_started"].pop()
+
+
+# ---- HTTP ----
+class MetricsMiddleware:
+    """
+    ASGI middleware: request duration by route template, DB time per request
+    and, for task requests, queue wait from the X-Enqueued-At header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        header = ENQUEUED_AT_HEADER.lower().encode()
+        enqueued_at = next(
+            (v.decode() for k, v in scope.get("headers", ()) if k == header), None
+        )
+        wait_until = time.time()
+        acc = [0.0]
+        token = _db_seconds.set(acc)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _db_seconds.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route,
+                status=str(status["code"]),
+            )
+            DB_SECONDS.observe(acc[0], route=route)
+            if enqueued_at is not None:
+                # label as the task_queue backend does: /tasks/... template
+                observe_queue_wait(
+                    route.removeprefix("/api"), enqueued_at, now=wait_until
+                )
@@ -0,0 +1,302 @@
+# app/core/outbound.py
+from __future__ import annotations
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import requests
+
+from .config import settings
+
+log = logging.getLogger("sb9.outbound")
+
+# Statuses worth retrying; 429/503 also shrink the concurrency window.
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_OVERLOAD_STATUSES = {429, 503}
+
+
+class OutboundUnavailable(requests.RequestException):
+    """Raised instead of calling out when the host's breaker is open or saturated."""
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens/sec, up to ``burst`` stored."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return True
+                wait = (1.0 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def refund(self) -> None:
+        """Return a token taken by a call that never went out."""
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + 1.0)
+
+
+class AIMDLimiter:
+    """
+    Concurrency window with additive increase / multiplicative decrease.
+    Fast successes grow the window by ~1 per window's worth of calls; 429/503,
+    timeouts and slow responses cut it by ``backoff``.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: float,
+        minimum: float,
+        maximum: float,
+        latency_target_s: float,
+        backoff: float = 0.5,
+    ):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target_s = latency_target_s
+        self.backoff = backoff
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: float) -> bool:
+        with self._cond:
+            ok = self._cond.wait_for(
+                lambda: self.in_flight < max(1, int(self.limit)), timeout
+            )
+            if ok:
+                self.in_flight += 1
+            return ok
+
+    def release(self, *, latency_s: float | None, overloaded: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded or (
+                latency_s is not None and latency_s > self.latency_target_s
+            ):
+                self.limit = max(self.minimum, self.limit * self.backoff)
+            elif latency_s is not None:
+                self.limit = min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0))
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half_open probe after reset."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, *, name: str, failure_threshold: int, reset_after_s: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after_s = reset_after_s
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.opened_count = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - (self.opened_at or 0) < self.reset_after_s:
+                    return False
+                self._set(self.HALF_OPEN)
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            if self.state != self.CLOSED:
+                self._set(self.CLOSED)
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe that was never sent (no verdict)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.opened_at = time.monotonic()
+                self.opened_count += 1
+                self._set(self.OPEN)
+
+    def _set(self, state: str) -> None:
+        log.warning("[outbound] breaker %s: %s -> %s", self.name, self.state, state)
+        self.state = state
+
+
+class HostGovernor:
+    def __init__(self, host: str):
+        self.host = host
+        self.bucket = TokenBucket(
+            settings.OUTBOUND_RATE_PER_SEC, settings.OUTBOUND_BURST
+        )
+        self.limiter = AIMDLimiter(
+            initial=settings.OUTBOUND_MAX_CONCURRENCY / 2,
+            minimum=settings.OUTBOUND_MIN_CONCURRENCY,
+            maximum=settings.OUTBOUND_MAX_CONCURRENCY,
+            latency_target_s=settings.OUTBOUND_LATENCY_TARGET_S,
+        )
+        self.breaker = CircuitBreaker(
+            name=host,
+            failure_threshold=settings.OUTBOUND_BREAKER_FAILURES,
+            reset_after_s=settings.OUTBOUND_BREAKER_RESET_S,
+        )
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "breaker_state": self.breaker.state,
+            "breaker_opened_total": self.breaker.opened_count,
+            "consecutive_failures": self.breaker.failures,
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "tokens": round(self.bucket.tokens, 2),
+            "calls_total": self.calls,
+            "retries_total": self.retries,
+            "failures_total": self.failures,
+            "rejected_total": self.rejected,
+        }
+
+
+def _retry_after_s(resp: requests.Response) -> float | None:
+    value = resp.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class OutboundGovernor:
+    """
+    Shared gate for outbound HTTP calls, keyed by host: token-bucket rate
+    limit, AIMD concurrency window, jittered retries and a circuit breaker
+    that fails fast with OutboundUnavailable while the host is down.
+    Blocking (requests-based); call it from a worker thread in async code.
+    """
+
+    def __init__(self):
+        self._hosts: dict[str, HostGovernor] = {}
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+
+    def host(self, host: str) -> HostGovernor:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostGovernor(host)
+            return self._hosts[host]
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {name: h.snapshot() for name, h in hosts.items()}
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        hg = self.host(urlsplit(url).netloc)
+        timeout = kwargs.setdefault("timeout", settings.OUTBOUND_TIMEOUT_S)
+        wait_budget = timeout[0] if isinstance(timeout, tuple) else timeout
+        attempts = settings.OUTBOUND_MAX_RETRIES + 1
+
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            if not hg.breaker.allow():
+                hg.rejected += 1
+                raise OutboundUnavailable(f"circuit open for {hg.host}")
+            admitted = hg.bucket.acquire(wait_budget)
+            if admitted and not hg.limiter.acquire(wait_budget):
+                hg.bucket.refund()
+                admitted = False
+            if not admitted:
+                # local queueing says nothing about the host's health
+                hg.rejected += 1
+                hg.breaker.release_probe()
+                raise OutboundUnavailable(f"{hg.host} saturated")
+
+            hg.calls += 1
+            started = time.monotonic()
+            resp = None
+            latency, overloaded = None, False
+            try:
+                resp = self._session.request(method, url, **kwargs)
+            except requests.RequestException:
+                # transport errors, broken/undecodable bodies, redirect loops
+                overloaded = True
+                hg.breaker.record_failure()
+                hg.failures += 1
+                if last:
+                    raise
+            except BaseException:
+                # not the host's doing (e.g. a response hook); free the probe
+                hg.breaker.release_probe()
+                raise
+            else:
+                latency = time.monotonic() - started
+                overloaded = resp.status_code in _OVERLOAD_STATUSES
+                if resp.status_code >= 500:
+                    hg.breaker.record_failure()
+                    hg.failures += 1
+                else:
+                    hg.breaker.record_success()
+                if resp.status_code not in _RETRY_STATUSES or last:
+                    return resp
+            finally:
+                hg.limiter.release(latency_s=latency, overloaded=overloaded)
+
+            hg.retries += 1
+            backoff = random.uniform(
+                0, min(settings.OUTBOUND_BACKOFF_CAP_S, 0.5 * (2**attempt))
+            )
+            hinted = _retry_after_s(resp) if resp is not None else None
+            time.sleep(max(backoff, hinted or 0.0))
+
+        raise OutboundUnavailable(f"retries exhausted for {hg.host}")  # unreachable
+
+
+governor = OutboundGovernor()
@@ -0,0 +1,192 @@
+# app/core/scheduler.py
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+from .config import settings
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Which lane work started from this request/task belongs to. API requests
+# default to interactive; the Cloud Tasks routers switch to batch.
+current_lane: ContextVar[str] = ContextVar("sb9_lane", default=INTERACTIVE)
+
+
+def set_lane(lane: str) -> None:
+    current_lane.set(lane)
+
+
+async def batch_lane() -> None:
+    """Router dependency: run this request's geometry/LLM work in the batch lane."""
+    set_lane(BATCH)
+
+
+class LaneFull(Exception):
+    def __init__(self, scheduler: str, lane: str):
+        super().__init__(f"{scheduler}/{lane} queue is full")
+        self.scheduler = scheduler
+        self.lane = lane
+
+
+class _Lane:
+    def __init__(
+        self, name: str, *, weight: float, max_concurrency: int, max_queue: int
+    ):
+        self.name = name
+        self.weight = max(weight, 0.001)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.waiters: deque[asyncio.Future] = deque()
+        self.running = 0
+        self.vtime = 0.0
+        self.granted = 0
+        self.rejected = 0
+        self.wait_s_total = 0.0
+        self.wait_s_max = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "weight": self.weight,
+            "max_concurrency": self.max_concurrency,
+            "queued": len(self.waiters),
+            "running": self.running,
+            "granted_total": self.granted,
+            "rejected_total": self.rejected,
+            "wait_seconds_total": round(self.wait_s_total, 3),
+            "wait_seconds_max": round(self.wait_s_max, 3),
+        }
+
+
+class FairScheduler:
+    """
+    Shares ``capacity`` slots between lanes by weight (start-time fair
+    queueing: each grant advances the lane's virtual time by 1/weight and the
+    lane furthest behind goes next). Each lane also has its own concurrency
+    cap and queue limit; a full queue raises LaneFull instead of waiting.
+    Event-loop local: use from async code only.
+    """
+
+    def __init__(self, name: str, capacity: int, lanes: dict[str, dict]):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.running = 0
+        self._vclock = 0.0
+        self._lanes = {k: _Lane(k, **v) for k, v in lanes.items()}
+
+    def _lane(self, lane: str | None) -> _Lane:
+        name = lane or current_lane.get()
+        return self._lanes.get(name) or self._lanes[INTERACTIVE]
+
+    def _dispatch(self) -> None:
+        while self.running < self.capacity:
+            eligible = [
+                ln
+                for ln in self._lanes.values()
+                if ln.waiters and ln.running < ln.max_concurrency
+            ]
+            if not eligible:
+                return
+            ln = min(eligible, key=lambda x: x.vtime)
+            fut = ln.waiters.popleft()
+            if fut.done():  # waiter was cancelled
+                continue
+            self._vclock = ln.vtime
+            ln.vtime += 1.0 / ln.weight
+            ln.running += 1
+            self.running += 1
+            fut.set_result(None)
+
+    async def acquire(self, lane: str | None = None) -> str:
+        ln = self._lane(lane)
+        if not ln.waiters and ln.running == 0:
+            # idle lanes don't bank credit while away
+            ln.vtime = max(ln.vtime, self._vclock)
+        fut = asyncio.get_running_loop().create_future()
+        ln.waiters.append(fut)
+        self._dispatch()
+        if not fut.done() and len(ln.waiters) > ln.max_queue:
+            ln.waiters.remove(fut)
+            fut.cancel()
+            ln.rejected += 1
+            raise LaneFull(self.name, ln.name)
+
+        started = time.monotonic()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release(ln.name)  # granted as we were cancelled
+            elif fut in ln.waiters:
+                ln.waiters.remove(fut)
+            raise
+        waited = time.monotonic() - started
+        ln.granted += 1
+        ln.wait_s_total += waited
+        ln.wait_s_max = max(ln.wait_s_max, waited)
+        return ln.name
+
+    def release(self, lane: str) -> None:
+        ln = self._lanes[lane]
+        ln.running -= 1
+        self.running -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, lane: str | None = None) -> AsyncIterator[str]:
+        name = await self.acquire(lane)
+        try:
+            yield name
+        finally:
+            self.release(name)
+
+    def has_capacity(self, lane: str | None = None) -> bool:
+        """Whether ``lane`` would get a slot right now without queueing."""
+        ln = self._lane(lane)
+        return (
+            not ln.waiters
+            and ln.running < ln.max_concurrency
+            and self.running < self.capacity
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "running": self.running,
+            "lanes": {k: ln.snapshot() for k, ln in self._lanes.items()},
+        }
+
+
+def make_scheduler(
+    name: str, *, capacity: int, batch_max_concurrency: int, max_queue: int
+) -> FairScheduler:
+    return FairScheduler(
+        name,
+        capacity,
+        {
+            INTERACTIVE: {
+                "weight": settings.SCHED_INTERACTIVE_WEIGHT,
+                "max_concurrency": capacity,
+                "max_queue": max_queue,
+            },
+            BATCH: {
+                "weight": settings.SCHED_BATCH_WEIGHT,
+                "max_concurrency": batch_max_concurrency,
+                "max_queue": max_queue,
+            },
+        },
+    )
+
+
+# OpenAI calls (listing discovery + per-listing analysis).
+llm_scheduler = make_scheduler(
+    "llm",
+    capacity=settings.LLM_MAX_CONCURRENCY,
+    batch_max_concurrency=settings.LLM_BATCH_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+)
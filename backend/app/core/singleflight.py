@@ -0,0 +1,103 @@
+# app/core/singleflight.py
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+from sqlalchemy import Text, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import async_engine
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key inside one process: the first
+    caller runs ``fn``; everyone arriving while it runs awaits the same result
+    (or exception). If the leader is cancelled, a waiting caller takes over.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            fut = self._inflight.get(key)
+            if fut is None:
+                break
+            try:
+                return await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not fut.cancelled() or (task and task.cancelling()):
+                    raise
+                # leader went away; loop and run it ourselves
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved; followers re-raise their own copy
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+
+async def advisory_xact_lock(session: AsyncSession, key: str) -> None:
+    """
+    Block until this transaction holds the Postgres advisory lock for ``key``
+    (released automatically on commit/rollback). Serializes the same work
+    across workers/instances.
+    """
+    await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(key))))
+
+
+async def advisory_xact_locks(session: AsyncSession, keys: Iterable[str]) -> None:
+    """
+    ``advisory_xact_lock`` for several keys in one statement. The locks are
+    taken in hash order, so two transactions locking overlapping sets can't
+    deadlock.
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    k = (
+        func.unnest(bindparam("keys", keys, type_=ARRAY(Text)))
+        .table_valued("k")
+        .render_derived()
+    )
+    hashes = select(func.hashtext(k.c.k).label("h")).distinct().order_by("h").subquery()
+    await session.execute(select(func.pg_advisory_xact_lock(hashes.c.h)))
+
+
+@asynccontextmanager
+async def advisory_lock(key: str) -> AsyncIterator[bool]:
+    """
+    Try to take the session-level advisory lock for ``key`` on a dedicated
+    connection and hold it for the block, across any commits the block makes
+    on its own sessions. Yields False (without waiting) if someone else holds it.
+    """
+    async with async_engine.connect() as conn:
+        got = await conn.scalar(select(func.pg_try_advisory_lock(func.hashtext(key))))
+        await conn.commit()
+        try:
+            yield bool(got)
+        finally:
+            if got:
+                await conn.execute(select(func.pg_advisory_unlock(func.hashtext(key))))
+                await conn.commit()
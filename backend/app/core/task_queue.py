@@ -0,0 +1,299 @@
+# app/core/task_queue.py
+"""
+Postgres task queue backend (TASKS_BACKEND=postgres).
+
+For single-node and on-prem deployments without Cloud Tasks. Tasks are rows
+in task_queue, claimed with SELECT ... FOR UPDATE SKIP LOCKED and run
+in-process by an asyncio worker pool: the URL a task would have been POSTed
+to is resolved to a handler in ``registry`` instead of going over HTTP.
+
+A claim holds the task for TASK_QUEUE_VISIBILITY_TIMEOUT_S; if the worker
+dies the lock expires and another worker retries it. Failures are retried
+with exponential backoff up to TASK_QUEUE_MAX_ATTEMPTS, then kept with
+failed_at set.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import re
+import uuid
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Iterable
+from urllib.parse import urlparse
+
+from sqlalchemy import delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models import QueuedTask
+from .cloud_tasks import HttpTask, _Enqueuer
+from .config import settings
+from .db import AsyncSessionLocal
+from .metrics import observe_queue_wait, track_db_time
+from .tracing import continue_trace, inject_headers, span
+from .scheduler import BATCH, set_lane
+
+log = logging.getLogger("sb9.task_queue")
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class TaskRegistry:
+    """Route paths (with {param} segments) -> in-process task handlers."""
+
+    def __init__(self) -> None:
+        self._routes: list[tuple[re.Pattern[str], str, Handler]] = []
+
+    def register(self, path: str) -> Callable[[Handler], Handler]:
+        pattern = re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", path) + "$")
+
+        def deco(fn: Handler) -> Handler:
+            self._routes.append((pattern, path, fn))
+            return fn
+
+        return deco
+
+    def resolve(self, path: str) -> tuple[Handler, dict[str, str], str]:
+        """Handler, path params and the registered path template."""
+        for pattern, template, fn in self._routes:
+            m = pattern.match(path)
+            if m:
+                return fn, m.groupdict(), template
+        raise LookupError(f"no task handler for {path}")
+
+
+registry = TaskRegistry()
+
+
+def _queue_limits() -> dict[str, int]:
+    """Per-queue worker counts: the pipeline queues at the default, then
+    TASK_QUEUE_CONCURRENCY overrides ("listing-jobs=8,property-jobs=2")."""
+    limits = dict.fromkeys(
+        (
+            settings.CLOUD_TASKS_QUEUE_DISPATCHER,
+            settings.CLOUD_TASKS_QUEUE_SEARCH,
+            settings.CLOUD_TASKS_QUEUE_PROPERTY,
+            settings.CLOUD_TASKS_QUEUE_LISTING,
+        ),
+        settings.TASK_QUEUE_DEFAULT_CONCURRENCY,
+    )
+    for part in (settings.TASK_QUEUE_CONCURRENCY or "").split(","):
+        name, _, n = part.partition("=")
+        if name.strip() and n.strip():
+            limits[name.strip()] = int(n)
+    return {q: max(1, n) for q, n in limits.items()}
+
+
+class PgTaskEnqueuer(_Enqueuer):
+    """TaskEnqueuer that writes to task_queue (one INSERT per batch)."""
+
+    def __init__(self) -> None:
+        self._wake: dict[str, asyncio.Event] = {}
+
+    def wake_event(self, queue: str) -> asyncio.Event:
+        return self._wake.setdefault(queue, asyncio.Event())
+
+    async def aclose(self) -> None:
+        pass
+
+    async def enqueue_http_task(
+        self,
+        *,
+        queue: str,
+        url: str,
+        method: str | None = None,
+        headers: dict[str, str] | None = None,
+        body: dict | None = None,
+        oidc_audience: str | None = None,
+        name: str | None = None,
+    ) -> None:
+        await self.enqueue_many([HttpTask(queue=queue, url=url, body=body, name=name)])
+
+    async def enqueue_many(self, tasks: Iterable[HttpTask]) -> int:
+        """Insert the batch; named tasks already queued are skipped. Returns
+        the number actually added."""
+        trace = inject_headers()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "queue": t.queue,
+                "name": t.name,
+                "path": urlparse(t.url).path,
+                "body": t.body or {},
+                "trace_headers": trace or None,
+            }
+            for t in tasks
+        ]
+        if not rows:
+            return 0
+        stmt = (
+            pg_insert(QueuedTask)
+            .values(rows)
+            .on_conflict_do_nothing(
+                index_elements=[QueuedTask.name],
+                index_where=text("name IS NOT NULL"),
+            )
+            .returning(QueuedTask.queue)
+        )
+        async with AsyncSessionLocal() as session:
+            added = (await session.execute(stmt)).scalars().all()
+            await session.commit()
+        for queue in set(added):
+            self.wake_event(queue).set()  # don't wait for the next poll
+        return len(added)
+
+
+class TaskWorkerPool:
+    def __init__(self, enqueuer: PgTaskEnqueuer, tasks: TaskRegistry = registry):
+        self.enqueuer = enqueuer
+        self.registry = tasks
+        self.limits = _queue_limits()
+        self._pollers: list[asyncio.Task] = []
+        self._inflight: dict[str, set[asyncio.Task]] = {q: set() for q in self.limits}
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        for queue in self.limits:
+            self._pollers.append(asyncio.create_task(self._poll(queue)))
+        log.info("[task_queue] workers started: %s", self.limits)
+
+    async def stop(self) -> None:
+        running = self._pollers + [t for s in self._inflight.values() for t in s]
+        for t in running:
+            t.cancel()
+        # cancelled tasks keep their lock and are retried once it expires
+        await asyncio.gather(*running, return_exceptions=True)
+        self._pollers.clear()
+
+    async def _claim(self, queue: str, n: int) -> list:
+        now = func.now()
+        ready = (
+            select(QueuedTask.id)
+            .where(
+                QueuedTask.queue == queue,
+                QueuedTask.failed_at.is_(None),
+                QueuedTask.run_at <= now,
+                or_(QueuedTask.locked_until.is_(None), QueuedTask.locked_until < now),
+            )
+            .order_by(QueuedTask.run_at)
+            .limit(n)
+            .with_for_update(skip_locked=True)
+        )
+        lease = timedelta(seconds=settings.TASK_QUEUE_VISIBILITY_TIMEOUT_S)
+        stmt = (
+            update(QueuedTask)
+            .where(QueuedTask.id.in_(ready.scalar_subquery()))
+            .values(locked_until=now + lease, attempts=QueuedTask.attempts + 1)
+            .returning(
+                QueuedTask.id,
+                QueuedTask.name,
+                QueuedTask.path,
+                QueuedTask.body,
+                QueuedTask.trace_headers,
+                QueuedTask.attempts,
+                QueuedTask.run_at,
+            )
+        )
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(stmt)).all()
+            await session.commit()
+        return rows
+
+    async def _poll(self, queue: str) -> None:
+        wake = self.enqueuer.wake_event(queue)
+        inflight = self._inflight[queue]
+        while True:
+            free = self.limits[queue] - len(inflight)
+            rows = []
+            if free > 0:
+                try:
+                    rows = await self._claim(queue, free)
+                except Exception:
+                    log.exception("[task_queue] claim failed on %s", queue)
+            for row in rows:
+                t = asyncio.create_task(self._run(row))
+                inflight.add(t)
+                t.add_done_callback(inflight.discard)
+                t.add_done_callback(lambda _t: wake.set())  # a slot freed up
+            if rows and len(rows) == free:
+                continue
+            wake.clear()
+            try:
+                await asyncio.wait_for(wake.wait(), settings.TASK_QUEUE_POLL_S)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, row) -> None:
+        set_lane(BATCH)
+        try:
+            handler, params, template = self.registry.resolve(row.path)
+            observe_queue_wait(template, row.run_at.timestamp())
+            with (
+                continue_trace(row.trace_headers),
+                span(f"task {template}", attempt=row.attempts),
+                track_db_time(template),
+            ):
+                async with AsyncSessionLocal() as session:
+                    await asyncio.wait_for(
+                        handler(
+                            session=session,
+                            enqueuer=self.enqueuer,
+                            body=row.body,
+                            task_name=row.name,
+                            **params,
+                        ),
+                        settings.TASK_QUEUE_VISIBILITY_TIMEOUT_S,
+                    )
+        except Exception as e:
+            await self._failed(row, e)
+            return
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(QueuedTask).where(QueuedTask.id == row.id))
+            await session.commit()
+        self.completed += 1
+
+    async def _failed(self, row, exc: Exception) -> None:
+        error = f"{type(exc).__name__}: {exc}"[:2000]
+        values: dict[str, Any] = {"locked_until": None, "last_error": error}
+        if (
+            isinstance(exc, LookupError)
+            or row.attempts >= settings.TASK_QUEUE_MAX_ATTEMPTS
+        ):
+            values["failed_at"] = func.now()
+            self.failed += 1
+            log.error("[task_queue] %s failed for good: %s", row.path, error)
+        else:
+            delay = min(
+                settings.TASK_QUEUE_BACKOFF_S * 2 ** (row.attempts - 1),
+                settings.TASK_QUEUE_BACKOFF_MAX_S,
+            )
+            delay *= random.uniform(0.8, 1.2)
+            values["run_at"] = func.now() + timedelta(seconds=delay)
+            self.retried += 1
+            log.warning(
+                "[task_queue] %s attempt %d failed, retry in %.0fs: %s",
+                row.path,
+                row.attempts,
+                delay,
+                error,
+            )
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(QueuedTask).where(QueuedTask.id == row.id).values(**values)
+            )
+            await session.commit()
+
+    def snapshot(self) -> dict:
+        return {
+            "queues": {
+                q: {"limit": n, "running": len(self._inflight[q])}
+                for q, n in self.limits.items()
+            },
+            "completed_total": self.completed,
+            "retried_total": self.retried,
+            "failed_total": self.failed,
+        }
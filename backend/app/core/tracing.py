@@ -0,0 +1,128 @@
+# app/core/tracing.py
+"""
+Optional OpenTelemetry tracing (TRACING_ENABLED=true).
+
+One listing's journey is several task requests (dispatch -> saved search ->
+property -> listing -> notify). Every enqueue injects the current W3C
+``traceparent`` into the task's headers (Cloud Tasks / local self-POST) or its
+task_queue row, and the receiving handler continues that trace, so a whole
+dispatch cycle is one trace. FastAPI, SQLAlchemy, httpx (and with it the
+OpenAI client) and requests (OC GIS) are instrumented; pipeline stages get
+their own span (``span``).
+
+Spans go to an OTLP collector (TRACING_EXPORTER=otlp, OTEL_EXPORTER_OTLP_*
+env vars) or, one JSON span per line, to TRACING_FILE (TRACING_EXPORTER=file)
+for offline flame graphs.
+
+The OpenTelemetry packages are not in requirements.txt; install
+opentelemetry-sdk, opentelemetry-exporter-otlp-proto-http and the
+opentelemetry-instrumentation-{fastapi,sqlalchemy,httpx,requests} packages
+(optionally opentelemetry-instrumentation-openai-v2) to enable it. Without
+them, or with tracing disabled, everything here is a no-op.
+"""
+
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Mapping
+
+from .config import settings
+
+log = logging.getLogger("sb9.tracing")
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import propagate, trace
+except ImportError:  # pragma: no cover - optional dependency
+    trace = None
+
+_enabled = False
+
+
+def setup_tracing(app, engines: list) -> None:
+    """Install the tracer provider and instrument the app. Call once."""
+    global _enabled
+    if not settings.TRACING_ENABLED:
+        return
+    if trace is None:
+        log.warning("[tracing] TRACING_ENABLED but opentelemetry is not installed")
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME})
+    )
+    provider.add_span_processor(BatchSpanProcessor(_exporter()))
+    trace.set_tracer_provider(provider)
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+    from opentelemetry.instrumentation.requests import RequestsInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
+    FastAPIInstrumentor.instrument_app(app, excluded_urls="/api/metrics")
+    HTTPXClientInstrumentor().instrument()
+    RequestsInstrumentor().instrument()
+    SQLAlchemyInstrumentor().instrument(engines=engines)
+    try:
+        from opentelemetry.instrumentation.openai_v2 import OpenAIInstrumentor
+
+        OpenAIInstrumentor().instrument()
+    except ImportError:
+        pass  # OpenAI calls are still traced as httpx requests
+    _enabled = True
+    log.info("[tracing] exporting to %s", settings.TRACING_EXPORTER)
+
+
+def _exporter():
+    if settings.TRACING_EXPORTER == "file":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        out = open(settings.TRACING_FILE, "a", buffering=1)
+        return ConsoleSpanExporter(
+            out=out, formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+        OTLPSpanExporter,
+    )
+
+    return OTLPSpanExporter()  # endpoint etc. from OTEL_EXPORTER_OTLP_* env
+
+
+def shutdown_tracing() -> None:
+    if _enabled:
+        trace.get_tracer_provider().shutdown()
+
+
+def inject_headers(headers: Mapping[str, str] | None = None) -> dict[str, str]:
+    """``headers`` plus traceparent/tracestate for the current span."""
+    out = dict(headers or {})
+    if _enabled:
+        propagate.inject(out)
+    return out
+
+
+@contextmanager
+def continue_trace(carrier: Mapping[str, str] | None) -> Iterator[None]:
+    """Run the block in the trace context carried by ``carrier`` headers."""
+    if not (_enabled and carrier):
+        yield
+        return
+    token = otel_context.attach(propagate.extract(carrier))
+    try:
+        yield
+    finally:
+        otel_context.detach(token)
+
+
+def span(name: str, **attributes):
+    """``with span("stage listing", entity=...)`` -- no-op when disabled."""
+    if not _enabled:
+        return nullcontext()
+    return trace.get_tracer("sb9").start_as_current_span(
+        name, attributes={k: str(v) for k, v in attributes.items()}
+    )
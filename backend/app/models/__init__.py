@@ -12,6 +12,12 @@ from .saved_search_field import SavedSearchField
 from .saved_search_match import SavedSearchMatch
 from .client_notification_preference import ClientNotificationPreference
 from .sent_notification import SentNotification
+from .analysis_job import AnalysisJob
+from .pending_property_task import PendingPropertyTask
+from .property_task_waiter import PropertyTaskWaiter
+from .listing_change_event import ListingChangeEvent
+from .queued_task import QueuedTask
+from .task_run import TaskRun
 
 __all__ = [
     "Base",
@@ -26,4 +32,10 @@ __all__ = [
     "SavedSearchMatch",
     "ClientNotificationPreference",
     "SentNotification",
+    "AnalysisJob",
+    "PendingPropertyTask",
+    "PropertyTaskWaiter",
+    "ListingChangeEvent",
+    "QueuedTask",
+    "TaskRun",
 ]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+from datetime import datetime
+from sqlalchemy import TIMESTAMP, Float, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import UUID
+from typing import Optional, TYPE_CHECKING
+import uuid
+from .base import BaseModel
+from .enums import AnalysisJobStatus, AnalysisJobStatusEnum
+
+if TYPE_CHECKING:
+    from .property_analysis import PropertyAnalysis
+
+
+class AnalysisJob(BaseModel):
+    """One ?async=true address analysis; any worker can read its progress."""
+
+    __tablename__ = "analysis_jobs"
+
+    address_in: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[AnalysisJobStatus] = mapped_column(
+        AnalysisJobStatusEnum, nullable=False, default=AnalysisJobStatus.QUEUED
+    )
+    # geocoded | parcel_fetched | sweep | rendered | done
+    stage: Mapped[Optional[str]] = mapped_column(String)
+    progress: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    error: Mapped[Optional[str]] = mapped_column(String)
+    property_analysis_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("property_analysis.id", ondelete="SET NULL"),
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True))
+
+    analysis: Mapped[Optional["PropertyAnalysis"]] = relationship("PropertyAnalysis")
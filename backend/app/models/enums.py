@@ -22,6 +22,19 @@ class NotificationStatus(PyEnum):
     FAILED = "FAILED"
 
 
+class AnalysisJobStatus(PyEnum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class ListingChangeKind(PyEnum):
+    PRICE = "PRICE"
+    STATUS = "STATUS"
+    CONTENT = "CONTENT"  # remarks/media hash
+
+
 ListingStatusEnum = sa.Enum(
     ListingStatus, name="listing_status", native_enum=True, create_type=False
 )
@@ -34,3 +47,9 @@ NotificationChannelEnum = sa.Enum(
 NotificationStatusEnum = sa.Enum(
     NotificationStatus, name="notification_status", native_enum=True, create_type=False
 )
+AnalysisJobStatusEnum = sa.Enum(
+    AnalysisJobStatus, name="analysis_job_status", native_enum=True, create_type=False
+)
+ListingChangeKindEnum = sa.Enum(
+    ListingChangeKind, name="listing_change_kind", native_enum=True, create_type=False
+)
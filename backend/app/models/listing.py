@@ -1,7 +1,17 @@
 from __future__ import annotations
 import uuid
 from typing import Optional, TYPE_CHECKING
-from sqlalchemy import ForeignKey, String, Boolean, DateTime, Numeric, Index, func, text
+from sqlalchemy import (
+    ForeignKey,
+    String,
+    Boolean,
+    DateTime,
+    Numeric,
+    Index,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
@@ -13,6 +23,7 @@ if TYPE_CHECKING:
     from .saved_search_match import SavedSearchMatch
     from .search_listing_analysis import SearchListingAnalysis
     from .sent_notification import SentNotification
+    from .listing_change_event import ListingChangeEvent
 
 
 class Listing(BaseModel):
@@ -39,6 +50,9 @@ class Listing(BaseModel):
 
     source: Mapped[str] = mapped_column(String, nullable=False)
     external_id: Mapped[Optional[str]] = mapped_column(String)
+    remarks: Mapped[Optional[str]] = mapped_column(Text)
+    # hash of remarks + media, see services/tasks/listing_changes.content_hash
+    content_hash: Mapped[Optional[str]] = mapped_column(String)
 
     property: Mapped["Property"] = relationship("Property", back_populates="listings")
     matches: Mapped[list["SavedSearchMatch"]] = relationship(
@@ -50,6 +64,9 @@ class Listing(BaseModel):
     sent_notifications: Mapped[list["SentNotification"]] = relationship(
         "SentNotification", back_populates="listing", cascade="all, delete-orphan"
     )
+    change_events: Mapped[list["ListingChangeEvent"]] = relationship(
+        "ListingChangeEvent", back_populates="listing", cascade="all, delete-orphan"
+    )
 
     __table_args__ = (
         Index(
@@ -0,0 +1,32 @@
+from __future__ import annotations
+import uuid
+from typing import Optional, TYPE_CHECKING
+from sqlalchemy import ForeignKey, Index, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import UUID
+from .base import BaseModel
+from .enums import ListingChangeKind, ListingChangeKindEnum
+
+if TYPE_CHECKING:
+    from .listing import Listing
+
+
+class ListingChangeEvent(BaseModel):
+    """A price, status or content change seen when a listing was re-discovered."""
+
+    __tablename__ = "listing_change_events"
+
+    listing_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("listings.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    kind: Mapped[ListingChangeKind] = mapped_column(
+        ListingChangeKindEnum, nullable=False
+    )
+    old_value: Mapped[Optional[str]] = mapped_column(Text)
+    new_value: Mapped[Optional[str]] = mapped_column(Text)
+
+    listing: Mapped["Listing"] = relationship("Listing", back_populates="change_events")
+
+    __table_args__ = (Index(None, "listing_id", "created_at"),)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+import uuid
+from datetime import datetime
+from sqlalchemy import TIMESTAMP, ForeignKey, text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from .base import BaseModel
+
+
+class PendingPropertyTask(BaseModel):
+    """At most one in-flight process-property task per property (fan-in)."""
+
+    __tablename__ = "pending_property_tasks"
+
+    property_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("properties.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+    )
+    enqueued_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
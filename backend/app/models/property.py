@@ -20,6 +20,8 @@ class Property(BaseModel):
     city: Mapped[str] = mapped_column(String, nullable=False)
     state: Mapped[str] = mapped_column(String, nullable=False)
     zip: Mapped[str] = mapped_column(String, nullable=False)
+    # canonical "LINE1|LINE2|CITY|ST|ZIP5", see utils.format_verified_address.address_key
+    address_key: Mapped[str] = mapped_column(String, nullable=False)
     bedrooms: Mapped[Optional[int]] = mapped_column(Integer)
     bathrooms: Mapped[Optional[float]] = mapped_column(Float)
     year_built: Mapped[Optional[int]] = mapped_column(Integer)
@@ -46,23 +48,5 @@ class Property(BaseModel):
     )
 
     __table_args__ = (
-        Index(
-            "unique_property_without_address2",
-            "address_line1",
-            "city",
-            "state",
-            "zip",
-            unique=True,
-            postgresql_where="address_line2 IS NULL",
-        ),
-        Index(
-            "unique_property_with_address2",
-            "address_line1",
-            "address_line2",
-            "city",
-            "state",
-            "zip",
-            unique=True,
-            postgresql_where="address_line2 IS NOT NULL",
-        ),
+        Index("unique_property_address_key", "address_key", unique=True),
     )
@@ -0,0 +1,30 @@
+from __future__ import annotations
+import uuid
+from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from .base import BaseModel
+
+
+class PropertyTaskWaiter(BaseModel):
+    """A (listing, saved search) pair waiting on its property's analysis."""
+
+    __tablename__ = "property_task_waiters"
+
+    property_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("properties.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    listing_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("listings.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    saved_search_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("saved_searches.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    __table_args__ = (UniqueConstraint("property_id", "listing_id", "saved_search_id"),)
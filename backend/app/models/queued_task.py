@@ -0,0 +1,44 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, Index, Integer, String, Text, text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+from .base import BaseModel
+
+
+class QueuedTask(BaseModel):
+    """A pipeline task for the Postgres queue backend (core/task_queue.py)."""
+
+    __tablename__ = "task_queue"
+
+    queue: Mapped[str] = mapped_column(String, nullable=False)
+    # deterministic task name (core/cloud_tasks.task_name); duplicates are dropped
+    name: Mapped[Optional[str]] = mapped_column(String)
+    # route path of the equivalent Cloud Tasks target, e.g. /tasks/process-listing
+    path: Mapped[str] = mapped_column(String, nullable=False)
+    body: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, server_default=text("'{}'::jsonb")
+    )
+    # traceparent/tracestate of the enqueuing span (core/tracing.py)
+    trace_headers: Mapped[Optional[dict]] = mapped_column(JSONB)
+    run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=text("now()")
+    )
+    # set while a worker holds the task; expired = worker lost, task is retried
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("0")
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    failed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index(None, "queue", "run_at", postgresql_where=text("failed_at IS NULL")),
+        Index(
+            "unique_task_queue_name",
+            "name",
+            unique=True,
+            postgresql_where=text("name IS NOT NULL"),
+        ),
+    )
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 import uuid
+from datetime import datetime
 
-from sqlalchemy import String, Integer, ForeignKey, Boolean, text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -33,6 +34,13 @@ class SavedSearch(BaseModel):
     is_active: Mapped[bool] = mapped_column(
         Boolean, nullable=False, server_default=text("true")
     )
+    # Discovery schedule (services/tasks/search_schedule.py): the dispatcher
+    # only picks searches that are due; interval_s adapts to the search's yield
+    # (NULL = SEARCH_INTERVAL_DEFAULT_S).
+    next_run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=text("now()")
+    )
+    interval_s: Mapped[int | None] = mapped_column(Integer)
     client: Mapped[Client] = relationship("Client", back_populates="saved_searches")
     fields: Mapped[list[SavedSearchField]] = relationship(
         "SavedSearchField", back_populates="saved_search", cascade="all, delete-orphan"
@@ -48,3 +56,5 @@ class SavedSearch(BaseModel):
     sent_notifications: Mapped[list[SentNotification]] = relationship(
         "SentNotification", back_populates="saved_search", cascade="all, delete-orphan"
     )
+
+    __table_args__ = (Index(None, "next_run_at"),)
@@ -0,0 +1,18 @@
+from __future__ import annotations
+from typing import Optional
+from sqlalchemy import String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+from .base import BaseModel
+
+
+class TaskRun(BaseModel):
+    """A completed pipeline task, keyed by its deterministic task name."""
+
+    __tablename__ = "task_runs"
+
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    stage: Mapped[str] = mapped_column(String, nullable=False)
+    result: Mapped[Optional[dict]] = mapped_column(JSONB)
+
+    __table_args__ = (UniqueConstraint("name"),)
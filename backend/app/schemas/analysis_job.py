@@ -0,0 +1,28 @@
+from __future__ import annotations
+from datetime import datetime
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict
+from app.models.enums import AnalysisJobStatus
+from .property_analysis import PropertyAnalysisOut
+
+
+class AnalysisJobOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: UUID
+    address_in: str
+    status: AnalysisJobStatus
+    stage: str | None = None
+    progress: float
+    error: str | None = None
+    property_analysis_id: UUID | None = None
+    analysis: PropertyAnalysisOut | None = None
+    created_at: datetime
+    updated_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class AnalysisJobAccepted(BaseModel):
+    job_id: UUID
+    status: AnalysisJobStatus
+    status_url: str
+    events_url: str
@@ -17,9 +17,15 @@ class FoundListing(BaseModel):
     status: str | None = (
         None  # "ACTIVE" | "PENDING" | "COMING_SOON" | "CANCELED" | "SOLD"
     )
+    property_sub_type: str | None = None  # e.g. "Single Family Residence"
     bedrooms: int | None = None
     bathrooms: float | None = None
     year_built: int | None = None
+    living_area: int | None = None  # sqft
+    lot_size: int | None = None  # sqft
+    garage_spaces: int | None = None
+    remarks: str | None = None
+    media: list[str] = Field(default_factory=list)  # photo/video URLs
 
 
 class FindListingsResult(BaseModel):
@@ -4,6 +4,7 @@ from geoalchemy2.elements import WKBElement
 from geoalchemy2.shape import to_shape
 from shapely.geometry import mapping
 from uuid import UUID
+from datetime import datetime
 
 
 class ListingTaskPayload(BaseModel):
@@ -13,8 +14,21 @@ class ListingTaskPayload(BaseModel):
 
 class PropertyTaskPayload(BaseModel):
     property_id: UUID
-    listing_id: UUID
-    saved_search_id: UUID
+    # Set only by tasks enqueued before fan-in; waiters now live in
+    # property_task_waiters.
+    listing_id: UUID | None = None
+    saved_search_id: UUID | None = None
+    # The pending claim this task was enqueued for; versions its task name
+    # and the names of the listing tasks it fans out.
+    claimed_at: datetime | None = None
+
+
+class DiscoveryClusterPayload(BaseModel):
+    saved_search_ids: list[UUID]
+
+
+class SavedSearchBatchPayload(BaseModel):
+    saved_search_ids: list[UUID]
 
 
 class PropertyGeoms(BaseModel):
@@ -0,0 +1,139 @@
+"""
+Compare OC GIS response profiles (full geojson vs compact geojson vs pbf):
+payload bytes, parse time and geometry drift for the parcel + building queries.
+
+    python -m app.scripts.bench_ocgis_profiles "123 Main St, Irvine, CA 92618" ...
+
+Needs network access to ocgis.com.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import dataclass
+
+import shapely
+
+from app.core.config import settings
+from app.services.property_analysis.geometry_ops import ewkb_or_shapely_to_esri
+from app.services.property_analysis.ocgis import (
+    OC_BUILDINGS_LAYER,
+    OC_PARCELS_LAYER,
+    call_ocgis,
+    feature_query_params,
+    first_feature_polygon,
+    get_location_from_ocgis,
+)
+
+PROFILES = ("full", "compact", "pbf")
+
+
+@dataclass
+class ProfileResult:
+    profile: str
+    payload_bytes: int = 0
+    parse_ms: float = 0.0
+    vertices: int = 0
+    area_delta_pct: float = 0.0
+
+
+def _parcel_params(lat: float, lon: float) -> dict:
+    return {
+        "geometry": json.dumps(
+            {"x": lon, "y": lat, "spatialReference": {"wkid": 2230}}
+        ),
+        "geometryType": "esriGeometryPoint",
+        "spatialRel": "esriSpatialRelIntersects",
+        "distance": 1.0,
+        "units": "esriSRUnit_Foot",
+        "returnGeometry": "true",
+        "outSR": 2230,
+        **feature_query_params(),
+    }
+
+
+def _building_params(parcel) -> dict:
+    return {
+        "geometry": json.dumps(ewkb_or_shapely_to_esri(parcel)),
+        "geometryType": "esriGeometryPolygon",
+        "spatialRel": "esriSpatialRelContains",
+        "units": "esriSRUnit_Foot",
+        "returnGeometry": "true",
+        "outSR": 2230,
+        **feature_query_params(),
+    }
+
+
+def _timed_parse(response, repeat: int) -> tuple[object, float]:
+    best = float("inf")
+    geom = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        geom = first_feature_polygon(response)
+        best = min(best, time.perf_counter() - t0)
+    return geom, best * 1000.0
+
+
+def bench_address(address: str, repeat: int) -> list[ProfileResult]:
+    loc = get_location_from_ocgis(address)
+    if not loc:
+        raise SystemExit(f"Address not found: {address}")
+    lat, lon, _ = loc
+
+    results: list[ProfileResult] = []
+    baseline_area: float | None = None
+    original = settings.OCGIS_RESPONSE_PROFILE
+    try:
+        for profile in PROFILES:
+            settings.OCGIS_RESPONSE_PROFILE = profile
+            res = ProfileResult(profile=profile)
+
+            parcel_resp = call_ocgis(
+                OC_PARCELS_LAYER, params=_parcel_params(lat, lon), timeout=30
+            )
+            parcel_resp.raise_for_status()
+            parcel, parcel_ms = _timed_parse(parcel_resp, repeat)
+            if parcel is None:
+                raise SystemExit(f"No parcel for {address} ({profile})")
+
+            building_resp = call_ocgis(
+                OC_BUILDINGS_LAYER, params=_building_params(parcel), timeout=30
+            )
+            building_resp.raise_for_status()
+            _building, building_ms = _timed_parse(building_resp, repeat)
+
+            res.payload_bytes = len(parcel_resp.content) + len(building_resp.content)
+            res.parse_ms = parcel_ms + building_ms
+            res.vertices = int(shapely.get_num_coordinates(parcel))
+            if baseline_area is None:
+                baseline_area = parcel.area
+            res.area_delta_pct = 100.0 * (parcel.area - baseline_area) / baseline_area
+            results.append(res)
+    finally:
+        settings.OCGIS_RESPONSE_PROFILE = original
+    return results
+
+
+# ---------- CLI ----------
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark OC GIS response profiles.")
+    p.add_argument("addresses", nargs="+", help="Orange County addresses.")
+    p.add_argument(
+        "--repeat", type=int, default=20, help="Parse repetitions (best is kept)."
+    )
+    ns = p.parse_args()
+
+    print(f"{'profile':<8} {'bytes':>10} {'parse ms':>9} {'verts':>6} {'area Δ%':>8}")
+    for address in ns.addresses:
+        print(f"# {address}")
+        for r in bench_address(address, ns.repeat):
+            print(
+                f"{r.profile:<8} {r.payload_bytes:>10,} {r.parse_ms:>9.3f} "
+                f"{r.vertices:>6} {r.area_delta_pct:>8.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
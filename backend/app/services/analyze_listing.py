@@ -35,7 +35,7 @@ SCHEMA = {
 }
 
 # Initialize the OpenAI client once
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
 
 
 def analyze_listing(listing: dict) -> dict:
@@ -6,11 +6,13 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import Iterable, Optional
 
+from app.core.config import settings
+
 
 class GmailSMTPProvider:
     def __init__(self):
-        self.host = "smtp.gmail.com"
-        self.port = 587
+        self.host = settings.SMTP_HOST
+        self.port = settings.SMTP_PORT
         self.username = os.environ["GMAIL_USER"]
         self.password = os.environ["GMAIL_PASS"]
         self.from_email = os.environ["EMAIL_FROM"]
@@ -34,7 +36,7 @@ class GmailSMTPProvider:
             msg,
             hostname=self.host,
             port=self.port,
-            start_tls=True,
+            start_tls=settings.SMTP_START_TLS,
             username=self.username,
             password=self.password,
         )
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import os
 import asyncio
+from datetime import datetime, timezone
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import Iterable
@@ -16,6 +17,7 @@ from twilio.rest import Client as TwilioClient
 
 import app.models as m
 from app.core.config import settings
+from app.core.metrics import LISTING_TO_NOTIFY_SECONDS, external_call
 
 
 # =========================
@@ -25,6 +27,8 @@ from app.core.config import settings
 _twilio_client: TwilioClient | None = None
 if settings.TWILIO_SID and settings.TWILIO_TOKEN:
     _twilio_client = TwilioClient(settings.TWILIO_SID, settings.TWILIO_TOKEN)
+    if settings.TWILIO_BASE_URL:
+        _twilio_client.api.base_url = settings.TWILIO_BASE_URL
 
 
 def send_sms_sync(to: str, body: str) -> str:
@@ -33,7 +37,10 @@ def send_sms_sync(to: str, body: str) -> str:
     """
     if not (_twilio_client and settings.TWILIO_FROM):
         return "skipped"
-    msg = _twilio_client.messages.create(to=to, from_=settings.TWILIO_FROM, body=body)
+    with external_call("twilio"):
+        msg = _twilio_client.messages.create(
+            to=to, from_=settings.TWILIO_FROM, body=body
+        )
     return msg.sid
 
 
@@ -51,8 +58,8 @@ async def send_sms(to: str, body: str) -> str:
 
 class GmailSMTPProvider:
     def __init__(self):
-        self.host = "smtp.gmail.com"
-        self.port = 587
+        self.host = settings.SMTP_HOST
+        self.port = settings.SMTP_PORT
         self.username = os.environ.get("GMAIL_USER")
         self.password = os.environ.get("GMAIL_PASS")
         self.from_email = os.environ.get("EMAIL_FROM")
@@ -74,14 +81,15 @@ class GmailSMTPProvider:
             msg.attach(MIMEText(text, "plain"))
         msg.attach(MIMEText(html, "html"))
 
-        await aiosmtplib.send(
-            msg,
-            hostname=self.host,
-            port=self.port,
-            start_tls=True,
-            username=self.username,
-            password=self.password,
-        )
+        with external_call("smtp"):
+            await aiosmtplib.send(
+                msg,
+                hostname=self.host,
+                port=self.port,
+                start_tls=settings.SMTP_START_TLS,
+                username=self.username,
+                password=self.password,
+            )
         return "sent"
 
     async def send_bulk(
@@ -204,6 +212,7 @@ async def notify_client_for_good_listing(
     subject = "New promising listing"
 
     # Dispatch by channel, only if enabled and contact info exists
+    sent = False
     for p in prefs:
         if not p.enabled:
             continue
@@ -222,6 +231,7 @@ async def notify_client_for_good_listing(
                     body=text,
                 )
             )
+            sent = True
 
         if p.channel == "sms" and getattr(client, "phone", None):
             await send_sms(to=client.phone, body=text)
@@ -236,5 +246,10 @@ async def notify_client_for_good_listing(
                     body=text,
                 )
             )
+            sent = True
 
     await session.commit()
+    if sent and listing.last_seen_at is not None:
+        LISTING_TO_NOTIFY_SECONDS.observe(
+            (datetime.now(timezone.utc) - listing.last_seen_at).total_seconds()
+        )
@@ -3,6 +3,8 @@ import requests
 from app.core import settings
 
 twilio = TwilioClient(settings.TWILIO_SID, settings.TWILIO_TOKEN)
+if settings.TWILIO_BASE_URL:
+    twilio.api.base_url = settings.TWILIO_BASE_URL
 
 
 def send_sms(to: str, body: str) -> str:
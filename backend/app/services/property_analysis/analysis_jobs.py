@@ -0,0 +1,137 @@
+from __future__ import annotations
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.models import AnalysisJob
+from app.models.enums import AnalysisJobStatus
+from app.schemas.analysis_job import AnalysisJobOut
+from .property_analysis_service import analyze_property_from_address
+
+log = logging.getLogger("sb9.analysis_jobs")
+
+_TERMINAL = {AnalysisJobStatus.SUCCEEDED, AnalysisJobStatus.FAILED}
+
+# Keep strong refs so running jobs aren't garbage-collected mid-flight.
+_running: set[asyncio.Task] = set()
+
+
+async def create_job(session: AsyncSession, address_in: str) -> AnalysisJob:
+    job = AnalysisJob(
+        address_in=address_in, status=AnalysisJobStatus.QUEUED, progress=0.0
+    )
+    session.add(job)
+    await session.commit()
+    return job
+
+
+def start_job(job: AnalysisJob) -> None:
+    task = asyncio.create_task(run_job(job.id, job.address_in))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+
+
+async def run_job(job_id: UUID, address_in: str) -> None:
+    """
+    Run one analysis in this worker, writing stage/progress to the job row
+    (its own session, committed per update) as the pipeline reports them.
+    """
+    async with AsyncSessionLocal() as jobs:
+        job = await jobs.get(AnalysisJob, job_id)
+        if job is None:
+            return
+        job.status = AnalysisJobStatus.RUNNING
+        await jobs.commit()
+
+        async def progress(stage: str, pct: float) -> None:
+            job.stage = stage
+            job.progress = round(pct, 1)
+            await jobs.commit()
+
+        try:
+            async with AsyncSessionLocal() as session:
+                out = await analyze_property_from_address(
+                    session, address_in, progress=progress
+                )
+        except Exception as e:
+            log.exception("[analysis-job] %s failed", job_id)
+            await jobs.rollback()
+            job.status = AnalysisJobStatus.FAILED
+            job.error = str(e) or type(e).__name__
+            job.finished_at = datetime.now(timezone.utc)
+            await jobs.commit()
+            return
+
+        job.status = AnalysisJobStatus.SUCCEEDED
+        job.stage = "done"
+        job.progress = 100.0
+        job.property_analysis_id = out.id
+        job.finished_at = datetime.now(timezone.utc)
+        await jobs.commit()
+
+
+async def get_job(session: AsyncSession, job_id: UUID) -> AnalysisJob | None:
+    job = (
+        await session.execute(
+            select(AnalysisJob)
+            .options(selectinload(AnalysisJob.analysis))
+            .where(AnalysisJob.id == job_id)
+        )
+    ).scalar_one_or_none()
+    if job is None or job.status in _TERMINAL:
+        return job
+
+    # The worker running it died (deploy, OOM): nobody will ever finish it.
+    last_seen = job.updated_at or job.created_at
+    stale_before = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.ANALYSIS_JOB_STALE_S
+    )
+    if last_seen < stale_before:
+        job.status = AnalysisJobStatus.FAILED
+        job.error = "Job stalled (worker went away); please resubmit"
+        job.finished_at = datetime.now(timezone.utc)
+        await session.commit()
+    return job
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def job_events(job_id: UUID) -> AsyncIterator[str]:
+    """
+    Server-sent events for one job: a "progress" event whenever status,
+    stage or percent changes, ending with "done". Polls the jobs table, so
+    it works from any worker, not just the one running the job.
+    """
+    last = None
+    idle_s = 0.0
+    while True:
+        async with AsyncSessionLocal() as session:
+            job = await get_job(session, job_id)
+            if job is None:
+                yield _sse("error", '{"detail": "Job not found"}')
+                return
+            out = AnalysisJobOut.model_validate(job)
+
+        snapshot = (out.status, out.stage, out.progress)
+        if snapshot != last:
+            last = snapshot
+            idle_s = 0.0
+            yield _sse("progress", out.model_dump_json())
+        elif idle_s >= 15.0:
+            idle_s = 0.0
+            yield ": keep-alive\n\n"
+
+        if out.status in _TERMINAL:
+            yield _sse("done", out.model_dump_json())
+            return
+
+        await asyncio.sleep(settings.ANALYSIS_JOB_POLL_S)
+        idle_s += settings.ANALYSIS_JOB_POLL_S
@@ -1,8 +1,10 @@
 from __future__ import annotations
-from .geometry_ops import search_bands
-from typing import NamedTuple
+from .geometry_ops import ADU_BANDS, SB9_BANDS, search_bands
+from typing import Awaitable, Callable, NamedTuple
 from shapely.geometry import LineString, Polygon
 
+from app.core.compute import compute
+
 import matplotlib
 
 matplotlib.use("Agg")
@@ -24,23 +26,46 @@ class Eligibility(NamedTuple):
     image_url: str | None
 
 
+def _eligibility(label: str, hit) -> Eligibility:
+    band_low, band_high, ang, line, url = hit
+    return Eligibility(
+        label=label,
+        band_low=band_low,
+        band_high=band_high,
+        angle_deg=ang,
+        line=line,
+        image_url=url,
+    )
+
+
 def define_eligibility(
     parcel: Polygon,
     house: Polygon,
 ) -> Eligibility:
-    sb9_bands = [(lo / 100.0, 1.0 - lo / 100.0) for lo in range(50, 39, -1)]
-    adu_bands = [(lo / 100.0, 1.0 - lo / 100.0) for lo in range(39, 29, -1)]
-
-    for label, bands in (("SB9", sb9_bands), ("ADU", adu_bands)):
+    for label, bands in (("SB9", SB9_BANDS), ("ADU", ADU_BANDS)):
         hit = search_bands(bands, parcel, house)
         if hit:
-            band_low, band_high, ang, line, url = hit
-            return Eligibility(
-                label=label,
-                band_low=band_low,
-                band_high=band_high,
-                angle_deg=ang,
-                line=line,
-                image_url=url,
-            )
+            return _eligibility(label, hit)
+    return Eligibility(None, None, None, None, None, None)
+
+
+async def sweep_eligibility(
+    parcel: Polygon,
+    house: Polygon,
+    on_progress: Callable[[int, int], Awaitable[None]] | None = None,
+) -> Eligibility:
+    """
+    define_eligibility on the compute pool. With ``on_progress`` the sweep is
+    submitted one band at a time so the caller hears (bands_done, bands_total)
+    between bands; same bands, same order, same answer.
+    """
+    if on_progress is None:
+        return await compute.run(define_eligibility, parcel, house)
+
+    plan = [("SB9", b) for b in SB9_BANDS] + [("ADU", b) for b in ADU_BANDS]
+    for i, (label, band) in enumerate(plan, start=1):
+        hit = await compute.run(search_bands, [band], parcel, house)
+        await on_progress(i, len(plan))
+        if hit:
+            return _eligibility(label, hit)
     return Eligibility(None, None, None, None, None, None)
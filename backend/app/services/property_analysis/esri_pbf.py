@@ -0,0 +1,185 @@
+"""
+Minimal decoder for ArcGIS ``f=pbf`` query responses (FeatureCollectionPBuffer).
+
+Only the pieces needed to rebuild polygon geometry are read (transform +
+feature geometries); attributes and everything else are skipped on the wire.
+Field numbers follow Esri's FeatureCollection.proto.
+"""
+
+from __future__ import annotations
+
+import struct
+
+import numpy as np
+import shapely
+from shapely.geometry import MultiPolygon, Polygon
+
+# wire types
+_VARINT = 0
+_FIXED64 = 1
+_BYTES = 2
+_FIXED32 = 5
+
+# FeatureCollectionPBuffer.QueryResult.FeatureResult field numbers
+_FC_QUERY_RESULT = 2
+_QR_FEATURE_RESULT = 1
+_FR_GEOMETRY_TYPE = 7
+_FR_TRANSFORM = 12
+_FR_FEATURES = 15
+_FEATURE_GEOMETRY = 2
+_GEOMETRY_LENGTHS = 2
+_GEOMETRY_COORDS = 3
+
+_GEOMETRY_TYPE_POLYGON = 3
+_ORIGIN_UPPER_LEFT = 0
+
+
+def _read_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_fields(buf: bytes):
+    """Yield (field_number, wire_type, value) for one message."""
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        key, pos = _read_varint(buf, pos)
+        field, wire = key >> 3, key & 0x07
+        if wire == _VARINT:
+            value, pos = _read_varint(buf, pos)
+        elif wire == _FIXED64:
+            value = buf[pos : pos + 8]
+            pos += 8
+        elif wire == _BYTES:
+            size, pos = _read_varint(buf, pos)
+            value = buf[pos : pos + size]
+            pos += size
+        elif wire == _FIXED32:
+            value = buf[pos : pos + 4]
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire}")
+        yield field, wire, value
+
+
+def _packed_varints(buf: bytes) -> list[int]:
+    out = []
+    pos = 0
+    while pos < len(buf):
+        v, pos = _read_varint(buf, pos)
+        out.append(v)
+    return out
+
+
+def _zigzag(values: list[int]) -> np.ndarray:
+    arr = np.asarray(values, dtype=np.uint64)
+    return (arr >> np.uint64(1)).astype(np.int64) ^ -(arr & np.uint64(1)).astype(
+        np.int64
+    )
+
+
+def _read_transform(buf: bytes) -> tuple[int, float, float, float, float]:
+    origin = _ORIGIN_UPPER_LEFT
+    sx = sy = 1.0
+    tx = ty = 0.0
+    for field, _wire, value in _iter_fields(buf):
+        if field == 1:
+            origin = value
+        elif field == 2:
+            for f, _w, v in _iter_fields(value):
+                if f == 1:
+                    sx = struct.unpack("<d", v)[0]
+                elif f == 2:
+                    sy = struct.unpack("<d", v)[0]
+        elif field == 3:
+            for f, _w, v in _iter_fields(value):
+                if f == 1:
+                    tx = struct.unpack("<d", v)[0]
+                elif f == 2:
+                    ty = struct.unpack("<d", v)[0]
+    return origin, sx, sy, tx, ty
+
+
+def _rings_to_polygon(rings: list[np.ndarray]) -> Polygon | MultiPolygon | None:
+    """Group Esri rings (outer CW, holes CCW) into a Polygon/MultiPolygon."""
+    polys: list[tuple[np.ndarray, list[np.ndarray]]] = []
+    for ring in rings:
+        if len(ring) < 4:
+            continue
+        if shapely.is_ccw(shapely.linearrings(ring)) and polys:
+            polys[-1][1].append(ring)
+        else:
+            polys.append((ring, []))
+    if not polys:
+        return None
+    parts = [
+        shapely.polygons(shell, holes=[shapely.linearrings(h) for h in holes] or None)
+        for shell, holes in polys
+    ]
+    return parts[0] if len(parts) == 1 else MultiPolygon(parts)
+
+
+def decode_polygons(payload: bytes) -> np.ndarray:
+    """
+    Decode an ArcGIS PBF FeatureCollection into an array of Shapely polygons
+    (one entry per feature, in server order).
+    Coordinates are zigzag/delta encoded and de-quantized with the result's transform.
+    """
+    feature_result = None
+    for field, _wire, value in _iter_fields(payload):
+        if field == _FC_QUERY_RESULT:
+            for f, _w, v in _iter_fields(value):
+                if f == _QR_FEATURE_RESULT:
+                    feature_result = v
+    if feature_result is None:
+        return np.empty(0, dtype=object)
+
+    transform = (_ORIGIN_UPPER_LEFT, 1.0, 1.0, 0.0, 0.0)
+    features: list[bytes] = []
+    for field, _wire, value in _iter_fields(feature_result):
+        if field == _FR_GEOMETRY_TYPE and value != _GEOMETRY_TYPE_POLYGON:
+            raise ValueError(f"Expected polygon features, got geometry type {value}")
+        if field == _FR_TRANSFORM:
+            transform = _read_transform(value)
+        elif field == _FR_FEATURES:
+            features.append(value)
+
+    origin, sx, sy, tx, ty = transform
+    out = []
+    for feature in features:
+        lengths: list[int] = []
+        coords: list[int] = []
+        for field, _wire, value in _iter_fields(feature):
+            if field != _FEATURE_GEOMETRY:
+                continue
+            for f, w, v in _iter_fields(value):
+                if f == _GEOMETRY_LENGTHS:
+                    lengths.extend(_packed_varints(v) if w == _BYTES else [v])
+                elif f == _GEOMETRY_COORDS:
+                    coords.extend(_packed_varints(v) if w == _BYTES else [v])
+        if not lengths:
+            out.append(None)
+            continue
+
+        # Deltas run continuously across all rings of a geometry.
+        xy = np.cumsum(_zigzag(coords).reshape(-1, 2), axis=0).astype(np.float64)
+        xy[:, 0] = xy[:, 0] * sx + tx
+        if origin == _ORIGIN_UPPER_LEFT:
+            xy[:, 1] = ty - xy[:, 1] * sy
+        else:
+            xy[:, 1] = xy[:, 1] * sy + ty
+
+        rings = np.split(xy, np.cumsum(lengths)[:-1])
+        out.append(_rings_to_polygon(rings))
+
+    geoms = np.empty(len(out), dtype=object)
+    geoms[:] = out
+    return geoms
@@ -95,6 +95,11 @@ def make_infinite_cut(bounds, centroid, angle_deg: float, s: float) -> LineStrin
     return LineString([p1, p2])
 
 
+# (smaller piece's min, max) share of the parcel area, tried in order
+SB9_BANDS = [(lo / 100.0, 1.0 - lo / 100.0) for lo in range(50, 39, -1)]
+ADU_BANDS = [(lo / 100.0, 1.0 - lo / 100.0) for lo in range(39, 29, -1)]
+
+
 def search_bands(
     bands,
     parcel: Polygon,
@@ -4,6 +4,10 @@ import requests
 import json
 
 from shapely.geometry import shape, Polygon
+from app.core.config import settings
+from app.core.metrics import external_call
+from app.core.outbound import governor
+from .esri_pbf import decode_polygons
 from .geometry_ops import ewkb_or_shapely_to_esri
 
 import matplotlib
@@ -19,17 +23,59 @@ except Exception:  # pragma: no cover
         pass
 
 
-OC_BUILDINGS_LAYER = "https://www.ocgis.com/arcpub/rest/services/Map_Layers/Building_Footprints/FeatureServer/0/query"
-OC_PARCELS_LAYER = "https://www.ocgis.com/arcpub/rest/services/Map_Layers/Parcels/FeatureServer/0/query"
-OC_LOCATIONS_LAYER = "https://www.ocgis.com/arcpub/rest/services/Geocode/OC_Locator/GeocodeServer/findAddressCandidates"
+_OCGIS = settings.OCGIS_BASE_URL.rstrip("/")
+OC_BUILDINGS_LAYER = f"{_OCGIS}/Map_Layers/Building_Footprints/FeatureServer/0/query"
+OC_PARCELS_LAYER = f"{_OCGIS}/Map_Layers/Parcels/FeatureServer/0/query"
+OC_LOCATIONS_LAYER = f"{_OCGIS}/Geocode/OC_Locator/GeocodeServer/findAddressCandidates"
 
 
 def call_ocgis(url: str, **kwargs) -> requests.Response:
-    return requests.get(url, **kwargs)
+    """GET against OC GIS through the shared outbound governor (blocking)."""
+    with external_call("ocgis"):
+        return governor.request("GET", url, **kwargs)
+
+
+def locator_query_params() -> dict:
+    """Output params for the OC Locator; compact profiles return one candidate."""
+    if settings.OCGIS_RESPONSE_PROFILE == "full":
+        return {"f": "pjson"}
+    return {"f": "json", "maxLocations": 1}
+
+
+def feature_query_params() -> dict:
+    """
+    Output params for the parcel/building FeatureServer queries.
+    Compact profiles drop attributes (only the object id comes back) and
+    generalize vertices by OCGIS_MAX_ALLOWABLE_OFFSET_FT, which has to stay well
+    under the 5 ft house/cut-line clearance used by search_bands. Precision
+    and offset are in output units, so they pin outSR to 2230 (feet); left to
+    the default, f=geojson comes back in WGS84 degrees.
+    """
+    profile = settings.OCGIS_RESPONSE_PROFILE
+    if profile == "full":
+        return {"f": "geojson", "outFields": "*"}
+    return {
+        "f": "pbf" if profile == "pbf" else "geojson",
+        "outSR": 2230,
+        "geometryPrecision": settings.OCGIS_GEOMETRY_PRECISION,
+        "maxAllowableOffset": settings.OCGIS_MAX_ALLOWABLE_OFFSET_FT,
+    }
+
+
+def first_feature_polygon(response: requests.Response) -> Polygon | None:
+    """Parse the first feature geometry from a FeatureServer query response."""
+    if settings.OCGIS_RESPONSE_PROFILE == "pbf":
+        geoms = decode_polygons(response.content)
+        return geoms[0] if len(geoms) else None
+
+    features = response.json().get("features") or []
+    if not features:
+        return None
+    return shape(features[0].get("geometry"))
 
 
 def get_location_from_ocgis(address_in: str) -> dict | None:
-    params = {"SingleLine": address_in, "outSR": 2230, "f": "pjson"}
+    params = {"SingleLine": address_in, "outSR": 2230, **locator_query_params()}
 
     try:
         response = call_ocgis(OC_LOCATIONS_LAYER, params=params)
@@ -56,7 +102,6 @@ def get_location_from_ocgis(address_in: str) -> dict | None:
 
 def get_parcel_polygon_from_ocgis(lat: float, lon: float) -> Polygon | None:
     params = {
-        "f": "geojson",
         "geometry": json.dumps(
             {
                 "x": lon,
@@ -70,19 +115,13 @@ def get_parcel_polygon_from_ocgis(lat: float, lon: float) -> Polygon | None:
         "units": "esriSRUnit_Foot",
         "returnGeometry": "true",
         "outSR": 2230,
-        "outFields": "*",
+        **feature_query_params(),
     }
 
     try:
         response = call_ocgis(OC_PARCELS_LAYER, params=params, timeout=30)
         response.raise_for_status()
-        data = response.json()
-        features = data.get("features") or []
-
-        if not features:
-            return None
-
-        return shape(features[0].get("geometry"))
+        return first_feature_polygon(response)
 
     except requests.RequestException as e:
         print(f"Error fetching parcel geom from OC GIS: {e}")
@@ -94,26 +133,19 @@ def get_building_polygon_from_ocgis(
 ) -> Polygon | None:
     esri_geom = ewkb_or_shapely_to_esri(parcel)
     params = {
-        "f": "geojson",
         "geometry": json.dumps(esri_geom),
         "geometryType": "esriGeometryPolygon",
         "spatialRel": "esriSpatialRelContains",
         "units": "esriSRUnit_Foot",
         "returnGeometry": "true",
         "outSR": 2230,
-        "outFields": "*",
+        **feature_query_params(),
     }
 
     try:
         response = call_ocgis(OC_BUILDINGS_LAYER, params=params, timeout=30)
         response.raise_for_status()
-        data = response.json()
-        features = data.get("features") or []
-
-        if not features:
-            return None
-
-        return shape(features[0].get("geometry"))
+        return first_feature_polygon(response)
 
     except requests.RequestException as e:
         print(f"Error fetching building geom from OC GIS: {e}")
@@ -1,12 +1,23 @@
 from __future__ import annotations
+import asyncio
+import contextlib
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+import usaddress
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 from geoalchemy2.shape import from_shape
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.scheduler import BATCH, set_lane
+from app.core.singleflight import SingleFlight, advisory_xact_lock
 from app.models import Property
 from app.schemas.property_analysis import PropertyAnalysisOut, PropertyAnalysisCreate
-from app.utils.format_verified_address import format_verified_address
-from .eligibility import define_eligibility
+from app.utils.format_verified_address import (
+    format_verified_address,
+    format_verified_addresses,
+)
+from .eligibility import sweep_eligibility
 from .ocgis import (
     get_location_from_ocgis,
     get_parcel_polygon_from_ocgis,
@@ -14,66 +25,153 @@ from .ocgis import (
 )
 from .property_analysis_crud import upsert
 
+_inflight = SingleFlight()
 
-async def analyze_property_from_address(
-    session: AsyncSession, address_in: str
-) -> PropertyAnalysisOut:
-    lat, lon, address = get_location_from_ocgis(address_in)
+# (stage, percent) callback; see analysis_jobs.py for the stages.
+ProgressFn = Callable[[str, float], Awaitable[None]]
 
-    if lat is None or lon is None:
-        raise RuntimeError("Cannot find lat & lon for this property from OC GIS")
 
-    formatted_address = format_verified_address(address)
-    base_filters = [
-        Property.address_line1 == formatted_address.get("address_line1"),
-        Property.city == formatted_address.get("city"),
-        Property.state == formatted_address.get("state"),
-        Property.zip == formatted_address.get("zip"),
-    ]
-    addr2_filter = (
-        Property.address_line2.is_(None)
-        if formatted_address.get("address_line2") is None
-        else (Property.address_line2 == formatted_address.get("address_line2"))
-    )
+async def _report(progress: ProgressFn | None, stage: str, pct: float) -> None:
+    if progress is not None:
+        await progress(stage, pct)
+
+
+class StageLimits:
+    """Per-stage concurrency caps for batch analysis (geocode -> geometry -> split)."""
+
+    def __init__(self, *, geocode: int, geometry: int, split: int):
+        self.geocode = asyncio.Semaphore(geocode)
+        self.geometry = asyncio.Semaphore(geometry)
+        self.split = asyncio.Semaphore(split)
+
+
+def _stage(limits: StageLimits | None, name: str):
+    if limits is None:
+        return contextlib.nullcontext()
+    return getattr(limits, name)
+
 
-    existing_property = (
+def _local_address_key(address_in: str) -> str | None:
+    """
+    Canonical key parsed straight from user input, or None when the input is
+    missing a part (then only the geocoder can tell us which property it is).
+    """
+    try:
+        parts = format_verified_address(address_in)
+    except usaddress.RepeatedLabelError:
+        return None
+    return parts.key if parts.is_complete else None
+
+
+def _address_flight_key(address_in: str) -> str:
+    key = _local_address_key(address_in)
+    if key is not None:
+        return "address:" + key
+    return "address:" + " ".join(address_in.upper().replace(",", " ").split())
+
+
+async def _get_property_by_key(session: AsyncSession, key: str) -> Property | None:
+    return (
         await session.execute(
             select(Property)
             .options(joinedload(Property.analysis))
-            .where(*base_filters, addr2_filter)
-            .limit(1)
+            .where(Property.address_key == key)
         )
     ).scalar_one_or_none()
 
+
+async def analyze_property_from_address(
+    session: AsyncSession,
+    address_in: str,
+    limits: StageLimits | None = None,
+    progress: ProgressFn | None = None,
+) -> PropertyAnalysisOut:
+    """
+    Already-analyzed addresses are answered from the DB without touching OC GIS.
+    Concurrent requests for the same address share one analysis in this
+    worker; other workers queue on an advisory lock and then hit the stored row.
+    """
+    return await _inflight.do(
+        _address_flight_key(address_in),
+        lambda: _analyze_property_from_address(session, address_in, limits, progress),
+    )
+
+
+async def _analyze_property_from_address(
+    session: AsyncSession,
+    address_in: str,
+    limits: StageLimits | None = None,
+    progress: ProgressFn | None = None,
+) -> PropertyAnalysisOut:
+    local_key = _local_address_key(address_in)
+    if local_key is not None:
+        known = await _get_property_by_key(session, local_key)
+        if known is not None and known.analysis is not None:
+            return PropertyAnalysisOut.model_validate(known.analysis)
+
+    async with _stage(limits, "geocode"):
+        located = await asyncio.to_thread(get_location_from_ocgis, address_in)
+
+    lat, lon, address = located or (None, None, None)
+    if lat is None or lon is None:
+        raise RuntimeError("Cannot find lat & lon for this property from OC GIS")
+
+    await _report(progress, "geocoded", 10.0)
+
+    formatted_address = format_verified_address(address)
+    key = formatted_address.key
+    await advisory_xact_lock(session, "property-address:" + key)
+
+    existing_property = await _get_property_by_key(session, key)
+
     if existing_property is not None and existing_property.analysis is not None:
         return PropertyAnalysisOut.model_validate(existing_property.analysis)
 
     if existing_property is None:
         existing_property = Property(
-            address_line1=formatted_address.get("address_line1"),
-            address_line2=formatted_address.get("address_line2"),
-            city=formatted_address.get("city"),
-            state=formatted_address.get("state"),
-            zip=formatted_address.get("zip"),
+            address_line1=formatted_address.address_line1,
+            address_line2=formatted_address.address_line2,
+            city=formatted_address.city,
+            state=formatted_address.state,
+            zip=formatted_address.zip,
+            address_key=key,
         )
         session.add(existing_property)
         await session.flush()
 
-    parcel_polygon = get_parcel_polygon_from_ocgis(lat, lon)
+    async with _stage(limits, "geometry"):
+        parcel_polygon = await asyncio.to_thread(
+            get_parcel_polygon_from_ocgis, lat, lon
+        )
 
-    if not parcel_polygon:
-        raise RuntimeError("Cannot find parcel geometry from OC GIS")
+        if not parcel_polygon:
+            raise RuntimeError("Cannot find parcel geometry from OC GIS")
 
-    existing_property.lot_geometry = from_shape(parcel_polygon, srid=2230)
+        house_polygon = await asyncio.to_thread(
+            get_building_polygon_from_ocgis, parcel_polygon
+        )
+
+    await _report(progress, "parcel_fetched", 25.0)
 
-    house_polygon = get_building_polygon_from_ocgis(parcel_polygon)
+    existing_property.lot_geometry = from_shape(parcel_polygon, srid=2230)
 
     if not house_polygon:
         raise RuntimeError("Cannot find building geometry from OC GIS")
 
     existing_property.house_geometry = from_shape(house_polygon, srid=2230)
 
-    analysis = define_eligibility(parcel_polygon, house_polygon)
+    async def on_sweep(done: int, total: int) -> None:
+        await _report(progress, "sweep", 25.0 + 65.0 * done / total)
+
+    async with _stage(limits, "split"):
+        analysis = await sweep_eligibility(
+            parcel_polygon,
+            house_polygon,
+            on_progress=on_sweep if progress is not None else None,
+        )
+    if analysis.image_url:
+        await _report(progress, "rendered", 95.0)
+
     sb9 = analysis.label == "SB9"
     adu = analysis.label in ("SB9", "ADU")
     property_analysis_item = PropertyAnalysisCreate(
@@ -90,3 +188,61 @@ async def analyze_property_from_address(
     property_analysis_row = await upsert(session, property_analysis_item)
     await session.commit()
     return PropertyAnalysisOut.model_validate(property_analysis_row)
+
+
+def _dedupe_key(address_in: str, parsed) -> str:
+    if parsed is not None and parsed.is_complete:
+        return parsed.key
+    return " ".join(address_in.upper().replace(",", " ").split())
+
+
+async def analyze_properties_from_addresses(
+    addresses: Iterable[str],
+) -> AsyncIterator[dict]:
+    """
+    Analyze many addresses, yielding one result dict per distinct address as
+    soon as it finishes (not in input order); "rows" lists the input positions
+    it covers. Each address gets its own DB
+    session; a failure is reported on its own line and doesn't stop the rest.
+    """
+    addresses = list(addresses)
+    groups: dict[str, dict] = {}
+    for i, (address_in, parsed) in enumerate(
+        zip(addresses, format_verified_addresses(addresses))
+    ):
+        if not address_in.strip():
+            continue
+        group = groups.setdefault(
+            _dedupe_key(address_in, parsed), {"address_in": address_in, "rows": []}
+        )
+        group["rows"].append(i)
+
+    limits = StageLimits(
+        geocode=settings.ANALYZE_BATCH_GEOCODE_CONCURRENCY,
+        geometry=settings.ANALYZE_BATCH_GEOMETRY_CONCURRENCY,
+        split=settings.ANALYZE_BATCH_SPLIT_CONCURRENCY,
+    )
+    # Each in-flight item holds a DB connection (advisory lock), so this is
+    # also what keeps the batch inside the connection pool.
+    in_flight = asyncio.Semaphore(settings.ANALYZE_BATCH_MAX_IN_FLIGHT)
+
+    async def run(group: dict) -> dict:
+        set_lane(BATCH)  # a spreadsheet shouldn't crowd out one-off lookups
+        out = {"address_in": group["address_in"], "rows": group["rows"]}
+        async with in_flight:
+            try:
+                async with AsyncSessionLocal() as session:
+                    analysis = await analyze_property_from_address(
+                        session, group["address_in"], limits
+                    )
+            except Exception as e:
+                return {**out, "ok": False, "error": str(e) or type(e).__name__}
+        return {**out, "ok": True, "analysis": analysis.model_dump(mode="json")}
+
+    tasks = [asyncio.create_task(run(g)) for g in groups.values()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for t in tasks:
+            t.cancel()
@@ -1,3 +1,4 @@
+import asyncio
 from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
@@ -6,8 +7,17 @@ from app.models import Property
 from app.schemas.tasks import PropertyGeoms
 from uuid import UUID
 from shapely import wkb as shapely_wkb
-from shapely.geometry import Polygon, MultiPolygon
+from shapely.geometry import Polygon, MultiPolygon, mapping
 from shapely.geometry.polygon import orient
+from app.services.property_analysis.ocgis import (
+    OC_BUILDINGS_LAYER,
+    OC_LOCATIONS_LAYER,
+    OC_PARCELS_LAYER,
+    call_ocgis,
+    feature_query_params,
+    first_feature_polygon,
+    locator_query_params,
+)
 import requests
 import json
 
@@ -20,11 +30,6 @@ except Exception:  # pragma: no cover
         pass
 
 
-OC_BUILDINGS_LAYER = "https://www.ocgis.com/arcpub/rest/services/Map_Layers/Building_Footprints/FeatureServer/0/query"
-OC_PARCELS_LAYER = "https://www.ocgis.com/arcpub/rest/services/Map_Layers/Parcels/FeatureServer/0/query"
-OC_LOCATIONS_LAYER = "https://www.ocgis.com/arcpub/rest/services/Geocode/OC_Locator/GeocodeServer/findAddressCandidates"
-
-
 def geojson_polygon_to_esri(geom_geojson: dict) -> dict:
     """
     Convert GeoJSON Polygon/MultiPolygon to Esri JSON polygon (rings).
@@ -94,10 +99,6 @@ def ewkb_to_esri_polygon(ewkb):
     return {"rings": rings, "spatialReference": {"wkid": 2230}}
 
 
-def call_ocgis(url: str, **kwargs) -> requests.Response:
-    return requests.get(url, **kwargs)
-
-
 def _get_location_from_ocgis(
     address_line1: str, address_line2: str | None, city: str, state: str, zip: str
 ) -> tuple[float, float, str] | None:
@@ -108,7 +109,7 @@ def _get_location_from_ocgis(
         "Region": state,
         "Postal": zip,
         "outSR": 2230,
-        "f": "pjson",
+        **locator_query_params(),
     }
 
     try:
@@ -136,7 +137,6 @@ def _get_location_from_ocgis(
 
 def _get_parcel_geom_from_ocgis(lat: float, lon: float) -> dict | None:
     params = {
-        "f": "geojson",
         "geometry": json.dumps(
             {
                 "x": lon,
@@ -150,19 +150,14 @@ def _get_parcel_geom_from_ocgis(lat: float, lon: float) -> dict | None:
         "units": "esriSRUnit_Foot",
         "returnGeometry": "true",
         "outSR": 2230,
-        "outFields": "*",
+        **feature_query_params(),
     }
 
     try:
         response = call_ocgis(OC_PARCELS_LAYER, params=params, timeout=30)
         response.raise_for_status()
-        data = response.json()
-        features = data.get("features") or []
-
-        if not features:
-            return None
-
-        return features[0].get("geometry")
+        polygon = first_feature_polygon(response)
+        return mapping(polygon) if polygon is not None else None
 
     except requests.RequestException as e:
         print(f"Error fetching parcel geom from OC GIS: {e}")
@@ -174,24 +169,18 @@ def _get_building_geom_from_ocgis(
 ) -> dict | None:
     esri_geom = geojson_polygon_to_esri(parcel)
     params = {
-        "f": "geojson",
         "geometry": json.dumps(esri_geom),
         "geometryType": "esriGeometryPolygon",
         "spatialRel": "esriSpatialRelContains",
         "returnGeometry": "true",
-        "outFields": "*",
+        **feature_query_params(),
     }
 
     try:
         response = call_ocgis(OC_BUILDINGS_LAYER, params=params, timeout=30)
         response.raise_for_status()
-        data = response.json()
-        features = data.get("features") or []
-
-        if not features:
-            return None
-
-        return features[0].get("geometry")
+        polygon = first_feature_polygon(response)
+        return mapping(polygon) if polygon is not None else None
 
     except requests.RequestException as e:
         print(f"Error fetching building geom from OC GIS: {e}")
@@ -211,7 +200,8 @@ async def get_property_geoms(
             property_id=property_id, house=prop.house_geometry, parcel=prop.lot_geometry
         )
 
-    lat, lon, address = _get_location_from_ocgis(
+    lat, lon, address = await asyncio.to_thread(
+        _get_location_from_ocgis,
         prop.address_line1,
         prop.address_line2,
         prop.city,
@@ -222,8 +212,8 @@ async def get_property_geoms(
     if lat is None or lon is None:
         raise RuntimeError("Cannot find lat & lon for this property from OC GIS")
 
-    parcel = _get_parcel_geom_from_ocgis(lat, lon)
-    building = _get_building_geom_from_ocgis(parcel)
+    parcel = await asyncio.to_thread(_get_parcel_geom_from_ocgis, lat, lon)
+    building = await asyncio.to_thread(_get_building_geom_from_ocgis, parcel)
 
     if not parcel or not building:
         raise RuntimeError("Cannot find parcel or building geometry from OC GIS")
@@ -234,5 +224,5 @@ async def get_property_geoms(
     prop.lot_geometry = func.ST_SetSRID(
         func.ST_GeomFromGeoJSON(json.dumps(parcel)), 2230
     )
-    await session.commit()
+    await session.flush()  # callers commit; keeps their advisory lock held
     return PropertyGeoms(property_id=property_id, house=building, parcel=parcel)
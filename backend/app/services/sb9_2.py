@@ -10,6 +10,8 @@ from shapely.geometry import shape, Polygon, LineString
 from shapely.ops import split as shp_split
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.compute import compute
+from app.services.property_analysis.geometry_ops import ADU_BANDS, SB9_BANDS
 from app.storage.r2 import upload_bytes_and_get_url
 from app.models import PropertyAnalysis
 
@@ -92,6 +94,81 @@ def _render_svg(
     return buf.getvalue()
 
 
+# ---------- search (runs in the compute pool) ----------
+
+
+def _search_bands(
+    bands,
+    parcel: Polygon,
+    house: Polygon,
+    *,
+    angle_step_deg: float,
+    offset_samples: int,
+    strict_contains: bool,
+    min_clearance_ft: float,
+    key_prefix: str,
+) -> tuple[tuple[float, float], float, LineString, str] | None:
+    """Return (band, angle_deg, cut_line, image_url) on success, else None."""
+    A_parcel = parcel.area
+
+    contains_fn = (
+        (lambda p: p.contains(house))
+        if strict_contains
+        else (lambda p: p.covers(house))
+    )
+
+    for lo, hi in bands:
+        ang = 0.0
+        while ang < 180.0:
+            lo_p, hi_p = _projection_interval(parcel, ang)
+            for i in range(offset_samples + 1):
+                s = lo_p + (hi_p - lo_p) * (i / offset_samples)
+                line = _make_infinite_cut(parcel.bounds, parcel.centroid, ang, s)
+
+                # Minimum clearance (house must not touch line)
+                if house.exterior.distance(line) < min_clearance_ft:
+                    continue
+
+                pieces = shp_split(parcel, line)
+                if len(pieces.geoms) < 2:
+                    continue
+
+                piece = next((p for p in pieces.geoms if contains_fn(p)), None)
+                if piece is None:
+                    continue
+
+                frac = piece.area / A_parcel
+                if lo <= frac <= hi:
+                    # Render & upload
+                    meta = {"fraction": float(frac), "angle_deg": round(ang, 3)}
+                    svg = _render_svg(parcel, house, line, meta)
+                    ts = datetime.now().strftime("%Y%m%dT%H%M%SZ")
+                    key = f"{key_prefix}/{ts}-{uuid4().hex}.svg"
+                    url = upload_bytes_and_get_url(
+                        key, svg, content_type="image/svg+xml"
+                    )
+                    return (lo, hi), float(ang), line, url
+            ang += angle_step_deg
+    return None
+
+
+def search_split(
+    parcel_xy: dict, house_xy: dict, **params
+) -> tuple[str | None, tuple[tuple[float, float], float, LineString, str] | None]:
+    """
+    SB9 bands first, then ADU-only bands. Returns (label, hit) where label is
+    "SB9", "ADU" or None. Pure CPU + R2 upload, no DB: safe to run in a
+    worker process.
+    """
+    parcel = _to_polygon_xy(parcel_xy)
+    house = _to_polygon_xy(house_xy)
+    for label, bands in (("SB9", SB9_BANDS), ("ADU", ADU_BANDS)):
+        hit = _search_bands(bands, parcel, house, **params)
+        if hit is not None:
+            return label, hit
+    return None, None
+
+
 # ---------- main ----------
 
 
@@ -116,98 +193,40 @@ async def find_house_containment_split_feet(
         if existing:
             return existing
 
-    sb9_bands = [(lo / 100.0, 1.0 - lo / 100.0) for lo in range(50, 39, -1)]
-    adu_bands = [(lo / 100.0, 1.0 - lo / 100.0) for lo in range(39, 29, -1)]
-
-    parcel = _to_polygon_xy(parcel_xy)
-    house = _to_polygon_xy(house_xy)
-
-    A_parcel = parcel.area
-
-    contains_fn = (
-        (lambda p: p.contains(house))
-        if strict_contains
-        else (lambda p: p.covers(house))
+    label, hit = await compute.run(
+        search_split,
+        parcel_xy,
+        house_xy,
+        angle_step_deg=angle_step_deg,
+        offset_samples=offset_samples,
+        strict_contains=strict_contains,
+        min_clearance_ft=min_clearance_ft,
+        key_prefix=key_prefix,
     )
 
-    def _search_bands(
-        bands,
-    ) -> tuple[tuple[float, float], float, LineString, str] | None:
-        """Return (band, angle_deg, cut_line, image_url) on success, else None."""
-        for lo, hi in bands:
-            ang = 0.0
-            while ang < 180.0:
-                lo_p, hi_p = _projection_interval(parcel, ang)
-                for i in range(offset_samples + 1):
-                    s = lo_p + (hi_p - lo_p) * (i / offset_samples)
-                    line = _make_infinite_cut(parcel.bounds, parcel.centroid, ang, s)
-
-                    # Minimum clearance (house must not touch line)
-                    if house.exterior.distance(line) < min_clearance_ft:
-                        continue
-
-                    pieces = shp_split(parcel, line)
-                    if len(pieces.geoms) < 2:
-                        continue
-
-                    piece = next((p for p in pieces.geoms if contains_fn(p)), None)
-                    if piece is None:
-                        continue
-
-                    frac = piece.area / A_parcel
-                    if lo <= frac <= hi:
-                        # Render & upload
-                        meta = {"fraction": float(frac), "angle_deg": round(ang, 3)}
-                        svg = _render_svg(parcel, house, line, meta)
-                        ts = datetime.now().strftime("%Y%m%dT%H%M%SZ")
-                        key = f"{key_prefix}/{ts}-{uuid4().hex}.svg"
-                        url = upload_bytes_and_get_url(
-                            key, svg, content_type="image/svg+xml"
-                        )
-                        return (lo, hi), float(ang), line, url
-                ang += angle_step_deg
-        return None
-
-    # --- Phase 1: SB9 ---
-    sb9_hit = _search_bands(sb9_bands)
-    if sb9_hit is not None:
-        band, ang, line, url = sb9_hit
-        return await _persist_property_analysis(
-            session=session,
-            property_id=property_id,
-            sb9=True,
-            adu=True,
-            band=band,
-            angle_deg=ang,
-            cut_line=line,
-            image_url=url,
-        )
-
-    # --- Phase 2: ADU-only ---
-    adu_hit = _search_bands(adu_bands)
-    if adu_hit is not None:
-        band, ang, line, url = adu_hit
+    if hit is None:
+        # --- Neither SB9 nor ADU bands worked ---
         return await _persist_property_analysis(
             session=session,
             property_id=property_id,
             sb9=False,
-            adu=True,
-            band=band,
-            angle_deg=ang,
-            cut_line=line,
-            image_url=url,
+            adu=False,
+            band=None,
+            angle_deg=None,
+            cut_line=None,
+            image_url=None,
         )
 
-    # --- Neither SB9 nor ADU bands worked ---
+    band, ang, line, url = hit
     return await _persist_property_analysis(
         session=session,
         property_id=property_id,
-        sb9=False,
-        adu=False,
-        band=None,
-        angle_deg=None,
-        cut_line=None,
-        image_url=None,
+        sb9=label == "SB9",
+        adu=True,
+        band=band,
+        angle_deg=ang,
+        cut_line=line,
+        image_url=url,
     )
 
 
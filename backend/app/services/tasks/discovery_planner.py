@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from app.models import SavedSearch
+from app.schemas.openai import FoundListing
+
+
+def _num(value: str | int | float | None) -> float | None:
+    if value is None or value == "":
+        return None
+    try:
+        return float(str(value).replace(",", "").replace("$", "").strip())
+    except ValueError:
+        return None
+
+
+def _norm(value: str | None) -> str:
+    return " ".join((value or "").split()).lower()
+
+
+@dataclass
+class SearchCriteria:
+    """
+    What a saved search asks discovery for. ``matches`` enforces every
+    bound (beds, baths, price, subtype, city, zip, garage/lot/living area
+    minimums) that the listing reports a value for.
+    """
+
+    saved_search_ids: list[UUID]
+    beds_min: float | None = None
+    baths_min: float | None = None
+    max_price: float | None = None
+    property_sub_type: str | None = None
+    cities: frozenset[str] = field(default_factory=frozenset)
+    zips: frozenset[str] = field(default_factory=frozenset)
+    garage_spaces: float | None = None
+    lot_size: float | None = None
+    living_area: float | None = None
+
+    def matches(self, item: FoundListing) -> bool:
+        # Unknown listing attributes pass: the LLM already filtered on them
+        # and a single-search discovery would have kept the listing too.
+        if self.beds_min is not None and item.bedrooms is not None:
+            if item.bedrooms < self.beds_min:
+                return False
+        if self.baths_min is not None and item.bathrooms is not None:
+            if item.bathrooms < self.baths_min:
+                return False
+        if self.max_price is not None and item.listing_price is not None:
+            if item.listing_price > self.max_price:
+                return False
+        for minimum, value in (
+            (self.garage_spaces, item.garage_spaces),
+            (self.lot_size, item.lot_size),
+            (self.living_area, item.living_area),
+        ):
+            if minimum is not None and value is not None and value < minimum:
+                return False
+        if self.property_sub_type and item.property_sub_type:
+            if _norm(item.property_sub_type) != _norm(self.property_sub_type):
+                return False
+        if self.cities and _norm(item.city) not in self.cities:
+            return False
+        if self.zips and (item.zip or "")[:5] not in self.zips:
+            return False
+        return True
+
+
+def search_criteria(saved_search: SavedSearch) -> SearchCriteria:
+    values: dict[str, list[str]] = {}
+    for f in saved_search.fields:
+        if f.search_field and f.value is not None:
+            values.setdefault(f.search_field, []).append(f.value)
+
+    def first(key: str) -> str | None:
+        return values.get(key, [None])[0]
+
+    return SearchCriteria(
+        saved_search_ids=[saved_search.id],
+        beds_min=_num(saved_search.beds_min),
+        baths_min=_num(saved_search.baths_min),
+        max_price=_num(saved_search.max_price),
+        property_sub_type=first("property_sub_type"),
+        cities=frozenset(_norm(c) for c in values.get("city", []) if c.strip()),
+        zips=frozenset(z.strip()[:5] for z in values.get("zip", []) if z.strip()),
+        garage_spaces=_num(first("garage_spaces")),
+        lot_size=_num(first("lot_size")),
+        living_area=_num(first("living_area")),
+    )
+
+
+def _loosest_min(values: list[float | None]) -> float | None:
+    return None if any(v is None for v in values) else min(values)
+
+
+def _loosest_max(values: list[float | None]) -> float | None:
+    return None if any(v is None for v in values) else max(values)
+
+
+def merge_criteria(group: list[SearchCriteria]) -> SearchCriteria:
+    """One discovery query covering every search in ``group`` (loosest bounds)."""
+    unrestricted_city = any(not c.cities for c in group)
+    unrestricted_zip = any(not c.zips for c in group)
+    return SearchCriteria(
+        saved_search_ids=[sid for c in group for sid in c.saved_search_ids],
+        beds_min=_loosest_min([c.beds_min for c in group]),
+        baths_min=_loosest_min([c.baths_min for c in group]),
+        max_price=_loosest_max([c.max_price for c in group]),
+        property_sub_type=group[0].property_sub_type,
+        cities=(
+            frozenset()
+            if unrestricted_city
+            else frozenset().union(*(c.cities for c in group))
+        ),
+        zips=(
+            frozenset()
+            if unrestricted_zip
+            else frozenset().union(*(c.zips for c in group))
+        ),
+        garage_spaces=_loosest_min([c.garage_spaces for c in group]),
+        lot_size=_loosest_min([c.lot_size for c in group]),
+        living_area=_loosest_min([c.living_area for c in group]),
+    )
+
+
+def plan_discovery(
+    criteria: list[SearchCriteria], *, max_cluster_size: int, price_spread: float
+) -> list[list[SearchCriteria]]:
+    """
+    Group searches that one discovery query can serve: same property subtype,
+    same cities and ZIP codes (a city-bound search merged with a county-wide
+    one would get county-wide results, and the LLM returns only so many), and
+    max prices within ``price_spread`` of each other so the merged query
+    isn't dominated by the most expensive search. Searches without a price
+    cap only cluster with each other.
+    """
+    # (subtype, cities, zips)
+    by_key: dict[tuple, list[SearchCriteria]] = {}
+    for c in criteria:
+        key = (_norm(c.property_sub_type), c.cities, c.zips)
+        by_key.setdefault(key, []).append(c)
+
+    clusters: list[list[SearchCriteria]] = []
+    for group in by_key.values():
+        uncapped = [c for c in group if c.max_price is None]
+        capped = sorted(
+            (c for c in group if c.max_price is not None), key=lambda c: c.max_price
+        )
+        current: list[SearchCriteria] = []
+        for c in capped:
+            if current and (
+                len(current) >= max_cluster_size
+                or c.max_price > current[0].max_price * price_spread
+            ):
+                clusters.append(current)
+                current = []
+            current.append(c)
+        if current:
+            clusters.append(current)
+        for i in range(0, len(uncapped), max_cluster_size):
+            clusters.append(uncapped[i : i + max_cluster_size])
+    return clusters
@@ -1,35 +1,117 @@
 from __future__ import annotations
-from sqlalchemy import select
+import time
+from typing import AsyncIterator
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from google.cloud import tasks_v2
 
 from app.models import SavedSearch, Client
 from app.core.config import settings
-from app.core.cloud_tasks import TaskEnqueuer
+from app.core.cloud_tasks import (
+    HttpTask,
+    TaskEnqueuer,
+    batch_entity,
+    task_name,
+)
+from app.schemas.tasks import DiscoveryClusterPayload, SavedSearchBatchPayload
+from .discovery_planner import SearchCriteria, plan_discovery, search_criteria
+from .search_schedule import lease_due
+
+
+def _task_headers() -> dict[str, str] | None:
+    return (
+        {"x-tasks-secret": settings.TASKS_SHARED_SECRET}
+        if settings.TASKS_SHARED_SECRET
+        else None
+    )
+
+
+async def _due_search_pages(
+    session: AsyncSession, page_size: int
+) -> AsyncIterator[list[SearchCriteria]]:
+    """
+    Criteria of active saved searches whose next_run_at has passed,
+    keyset-paginated over SavedSearch.id.
+    """
+    last_id = None
+    while True:
+        stmt = (
+            select(SavedSearch)
+            .join(SavedSearch.client)
+            .options(selectinload(SavedSearch.fields))
+            .where(Client.is_active.is_(True), SavedSearch.next_run_at <= func.now())
+            .order_by(SavedSearch.id)
+            .limit(page_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(SavedSearch.id > last_id)
+        page = (await session.execute(stmt)).scalars().all()
+        if not page:
+            return
+        last_id = page[-1].id
+        yield [search_criteria(ss) for ss in page]
+        session.expunge_all()  # criteria are plain dataclasses; drop the rows
 
 
 async def dispatch_saved_searches(
     *, session: AsyncSession, enqueuer: TaskEnqueuer
 ) -> int:
-    stmt = (
-        select(SavedSearch.id)
-        .join(SavedSearch.client)
-        .where(Client.is_active.is_(True))
-    )
-    res = await session.execute(stmt)
-    ids: list[str] = [row[0] for row in res.all()]
+    """
+    Plan this cycle's discovery over the searches that are due (see
+    search_schedule): searches with compatible criteria share one LLM
+    discovery call (process-discovery-cluster); the rest go out in
+    process-saved-searches batches of DISPATCH_CHUNK_SIZE. Tasks are enqueued
+    concurrently. Returns the number of tasks enqueued.
+    """
+    chunk = max(1, settings.DISPATCH_CHUNK_SIZE)
+    criteria: list[SearchCriteria] = []
+    async for page in _due_search_pages(session, chunk):
+        criteria.extend(page)
+    if not criteria:
+        return 0
+    await lease_due(session, [sid for c in criteria for sid in c.saved_search_ids])
 
-    for sid in ids:
-        enqueuer.enqueue_http_task(
+    if settings.DISCOVERY_CLUSTERING:
+        clusters = plan_discovery(
+            criteria,
+            max_cluster_size=settings.DISCOVERY_MAX_CLUSTER_SIZE,
+            price_spread=settings.DISCOVERY_PRICE_SPREAD,
+        )
+        groups = [[sid for c in cl for sid in c.saved_search_ids] for cl in clusters]
+    else:
+        groups = [c.saved_search_ids for c in criteria]
+
+    clustered = [ids for ids in groups if len(ids) > 1]
+    singles = [ids[0] for ids in groups if len(ids) == 1]
+    batches = [singles[i : i + chunk] for i in range(0, len(singles), chunk)]
+
+    # Named per dispatch run rather than per TASK_CYCLE_S bucket: a search on
+    # a shorter interval is due again within the same bucket and must not be
+    # deduplicated against its previous run. The lease keeps a retried
+    # dispatch from sending the same searches twice.
+    cycle = f"d{int(time.time())}"
+    tasks = [
+        HttpTask(
+            queue=settings.CLOUD_TASKS_QUEUE_SEARCH,
+            url=f"{settings.BASE_URL}/tasks/process-discovery-cluster",
+            method=tasks_v2.HttpMethod.POST,
+            headers=_task_headers(),
+            body=DiscoveryClusterPayload(saved_search_ids=ids).model_dump(mode="json"),
+            oidc_audience=settings.BASE_URL,
+            name=task_name("discovery-cluster", batch_entity(ids), cycle),
+        )
+        for ids in clustered
+    ] + [
+        HttpTask(
             queue=settings.CLOUD_TASKS_QUEUE_SEARCH,
-            url=f"{settings.BASE_URL}/tasks/process-saved-search/{sid}",
+            url=f"{settings.BASE_URL}/tasks/process-saved-searches",
             method=tasks_v2.HttpMethod.POST,
-            headers=(
-                {"x-tasks-secret": settings.TASKS_SHARED_SECRET}
-                if settings.TASKS_SHARED_SECRET
-                else None
-            ),
-            body={},
+            headers=_task_headers(),
+            body=SavedSearchBatchPayload(saved_search_ids=ids).model_dump(mode="json"),
             oidc_audience=settings.BASE_URL,
+            name=task_name("saved-searches", batch_entity(ids), cycle),
         )
-    return len(ids)
+        for ids in batches
+    ]
+    return await enqueuer.enqueue_many(tasks)
@@ -0,0 +1,141 @@
+"""
+In-process handlers for the Postgres task queue (core/task_queue.py), one per
+/tasks route. They mirror the routers in app/api/tasks minus the HTTP layer.
+"""
+
+from __future__ import annotations
+
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cloud_tasks import TaskEnqueuer, batch_entity
+from app.core.task_queue import registry
+from app.schemas.tasks import (
+    DiscoveryClusterPayload,
+    ListingTaskPayload,
+    PropertyTaskPayload,
+    SavedSearchBatchPayload,
+)
+from .dispatcher_service import dispatch_saved_searches
+from .process_listing_service import process_listing
+from .process_property_service import process_property
+from .saved_search_service import (
+    process_discovery_cluster,
+    process_saved_search,
+    process_saved_searches,
+)
+from .task_runs import run_once
+
+
+@registry.register("/tasks/dispatch-saved-searches")
+async def _dispatch(
+    *,
+    session: AsyncSession,
+    enqueuer: TaskEnqueuer,
+    body: dict,
+    task_name: str | None = None,
+):
+    return await run_once(
+        stage="dispatch",
+        entity="all",
+        task_name=task_name,
+        fn=lambda: dispatch_saved_searches(session=session, enqueuer=enqueuer),
+    )
+
+
+@registry.register("/tasks/process-saved-search/{saved_search_id}")
+async def _saved_search(
+    *,
+    session: AsyncSession,
+    enqueuer: TaskEnqueuer,
+    body: dict,
+    saved_search_id: str,
+    task_name: str | None = None,
+):
+    return await run_once(
+        stage="saved-search",
+        entity=saved_search_id,
+        task_name=task_name,
+        fn=lambda: process_saved_search(
+            saved_search_id=UUID(saved_search_id), session=session, enqueuer=enqueuer
+        ),
+    )
+
+
+@registry.register("/tasks/process-saved-searches")
+async def _saved_searches(
+    *,
+    session: AsyncSession,
+    enqueuer: TaskEnqueuer,
+    body: dict,
+    task_name: str | None = None,
+):
+    payload = SavedSearchBatchPayload.model_validate(body)
+    return await run_once(
+        stage="saved-searches",
+        entity=batch_entity(payload.saved_search_ids),
+        task_name=task_name,
+        fn=lambda: process_saved_searches(
+            saved_search_ids=payload.saved_search_ids,
+            session=session,
+            enqueuer=enqueuer,
+        ),
+    )
+
+
+@registry.register("/tasks/process-discovery-cluster")
+async def _discovery_cluster(
+    *,
+    session: AsyncSession,
+    enqueuer: TaskEnqueuer,
+    body: dict,
+    task_name: str | None = None,
+):
+    payload = DiscoveryClusterPayload.model_validate(body)
+    return await run_once(
+        stage="discovery-cluster",
+        entity=batch_entity(payload.saved_search_ids),
+        task_name=task_name,
+        fn=lambda: process_discovery_cluster(
+            saved_search_ids=payload.saved_search_ids,
+            session=session,
+            enqueuer=enqueuer,
+        ),
+    )
+
+
+@registry.register("/tasks/process-property")
+async def _property(
+    *,
+    session: AsyncSession,
+    enqueuer: TaskEnqueuer,
+    body: dict,
+    task_name: str | None = None,
+):
+    payload = PropertyTaskPayload.model_validate(body)
+    return await run_once(
+        stage="property",
+        entity=str(payload.property_id),
+        task_name=task_name,
+        fn=lambda: process_property(
+            payload=payload, session=session, enqueuer=enqueuer
+        ),
+    )
+
+
+@registry.register("/tasks/process-listing")
+async def _listing(
+    *,
+    session: AsyncSession,
+    enqueuer: TaskEnqueuer,
+    body: dict,
+    task_name: str | None = None,
+):
+    payload = ListingTaskPayload.model_validate(body)
+    return await run_once(
+        stage="listing",
+        entity=f"{payload.listing_id}-{payload.saved_search_id}",
+        task_name=task_name,
+        fn=lambda: process_listing(payload=payload, session=session),
+    )
@@ -0,0 +1,102 @@
+"""
+Change detection for re-discovered listings.
+
+Ingest compares each found listing with the stored row and records typed
+changes (price, status, remarks/media). A saved search that already matched
+the listing only gets a new LLM analysis when one of its changes is
+material for that search (``needs_reanalysis``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+from app.models.enums import ListingChangeKind
+from app.schemas.openai import FoundListing
+from .discovery_planner import SearchCriteria
+
+if TYPE_CHECKING:
+    from .listing_ingest import KnownListing
+
+
+@dataclass(frozen=True)
+class ListingChange:
+    kind: ListingChangeKind
+    old_value: str | None
+    new_value: str | None
+
+
+def content_hash(item: FoundListing) -> str | None:
+    """Hash of remarks + media, or None when the source reported neither."""
+    remarks = " ".join((item.remarks or "").split())
+    if not remarks and not item.media:
+        return None
+    h = hashlib.sha256(remarks.encode())
+    for url in sorted(item.media):
+        h.update(b"\0" + url.encode())
+    return h.hexdigest()
+
+
+def _str(value: float | str | None) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def detect_changes(known: KnownListing, item: FoundListing) -> list[ListingChange]:
+    # values the source didn't report keep the stored ones (see the upsert),
+    # so they are not changes
+    changes: list[ListingChange] = []
+    if item.listing_price is not None and (
+        known.listing_price is None
+        or float(item.listing_price) != float(known.listing_price)
+    ):
+        changes.append(
+            ListingChange(
+                ListingChangeKind.PRICE,
+                _str(known.listing_price),
+                _str(item.listing_price),
+            )
+        )
+    if item.status is not None and item.status != known.status:
+        changes.append(
+            ListingChange(ListingChangeKind.STATUS, known.status, item.status)
+        )
+    digest = content_hash(item)
+    if digest is not None and digest != known.content_hash:
+        changes.append(
+            ListingChange(ListingChangeKind.CONTENT, known.content_hash, digest)
+        )
+    return changes
+
+
+def needs_reanalysis(
+    changes: list[ListingChange], criteria: SearchCriteria | None
+) -> bool:
+    """
+    Whether an existing (listing, saved search) analysis is stale: the
+    listing came (back) on the market, its remarks/media changed, or its
+    price moved by LISTING_REANALYZE_PRICE_PCT or across the search's cap.
+    """
+    for change in changes:
+        if change.kind is ListingChangeKind.CONTENT:
+            return True
+        if change.kind is ListingChangeKind.STATUS:
+            if change.new_value == "ACTIVE":
+                return True
+            continue
+        old = float(change.old_value) if change.old_value is not None else None
+        new = float(change.new_value) if change.new_value is not None else None
+        if old is None or new is None or old <= 0:
+            return True
+        if abs(new - old) / old >= settings.LISTING_REANALYZE_PRICE_PCT:
+            return True
+        cap = criteria.max_price if criteria else None
+        if cap is not None and (old > cap) != (new > cap):
+            return True
+    return False
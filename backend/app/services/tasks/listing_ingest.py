@@ -0,0 +1,304 @@
+"""
+Set-based ingestion of discovered listings.
+
+A discovery batch is written with a fixed number of statements regardless of
+its size: one INSERT ... ON CONFLICT ... RETURNING each for properties (by
+address_key), listings (by source + external_id), saved-search matches and
+listing change events. Conflicting rows are updated in place rather than
+failing the batch, so there is no IntegrityError/rollback path.
+
+Before that, ``load_known`` reads the stored state of the batch's listings in
+one query and ``drop_known`` removes (listing, saved search) pairs that were
+already routed -- analyzed, or parked on their property's task -- and haven't
+changed (listing_changes.detect_changes), so the steady state of a discovery
+cycle is one read and no writes. A saved-search match on its own doesn't
+count: matches are written before routing, and a batch whose routing failed
+must be routed again when its task is retried.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, text, tuple_, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    Listing,
+    ListingChangeEvent,
+    Property,
+    PropertyTaskWaiter,
+    SavedSearchMatch,
+    SearchListingAnalysis,
+)
+from app.schemas.openai import FoundListing
+from app.utils.format_verified_address import address_key
+from .listing_changes import ListingChange, content_hash, detect_changes
+
+
+@dataclass
+class IngestedListing:
+    property_id: UUID
+    listing_id: UUID
+    saved_search_ids: list[UUID]
+    # searches this listing row was already routed to before this batch
+    matched_before: set[UUID] = field(default_factory=set)
+    changes: list[ListingChange] = field(default_factory=list)
+    # one of the change events recorded for this batch; versions re-analysis
+    # task names
+    change_event_id: UUID | None = None
+
+
+@dataclass
+class KnownListing:
+    listing_price: float | None
+    status: str | None
+    content_hash: str | None
+    saved_search_ids: set[UUID]
+
+
+@dataclass
+class KnownListings:
+    by_listing: dict[tuple[str, str], KnownListing] = field(default_factory=dict)
+    by_address: dict[tuple[str, str], KnownListing] = field(default_factory=dict)
+
+    def get(
+        self, item: FoundListing, *, by_address: bool = True
+    ) -> KnownListing | None:
+        k = self.by_listing.get((item.source, _external_id(item)))
+        if k is None and by_address:
+            k = self.by_address.get((item.source, _address_key(item)))
+        return k
+
+
+def _external_id(item: FoundListing) -> str:
+    # listings without a source id are keyed by their URL so re-discovering
+    # them updates the same row instead of inserting a duplicate
+    return item.external_id or item.url
+
+
+def _address_key(item: FoundListing) -> str:
+    return address_key(
+        item.address_line1, item.address_line2, item.city, item.state, item.zip
+    )
+
+
+async def load_known(
+    session: AsyncSession, matched: list[tuple[FoundListing, list[UUID]]]
+) -> KnownListings:
+    """
+    Stored price, status, content hash and (among the batch's searches) the
+    saved searches the batch's listings were already routed to, looked up by
+    (source, external_id) or by address. One query.
+    """
+    known = KnownListings()
+    if not matched:
+        return known
+    lkeys = {(item.source, _external_id(item)) for item, _ in matched}
+    akeys = {_address_key(item) for item, _ in matched}
+    ssids = {sid for _, ids in matched for sid in ids}
+    routed = union(
+        select(
+            SearchListingAnalysis.listing_id, SearchListingAnalysis.saved_search_id
+        ).where(SearchListingAnalysis.saved_search_id.in_(ssids)),
+        select(PropertyTaskWaiter.listing_id, PropertyTaskWaiter.saved_search_id).where(
+            PropertyTaskWaiter.saved_search_id.in_(ssids)
+        ),
+    ).subquery()
+    rows = await session.execute(
+        select(
+            Listing.source,
+            Listing.external_id,
+            Listing.listing_price,
+            Listing.status,
+            Listing.content_hash,
+            Property.address_key,
+            routed.c.saved_search_id,
+        )
+        .join(Listing.property)
+        .outerjoin(routed, routed.c.listing_id == Listing.id)
+        .where(
+            or_(
+                tuple_(Listing.source, Listing.external_id).in_(lkeys),
+                Property.address_key.in_(akeys),
+            )
+        )
+    )
+    for r in rows:
+        status = getattr(r.status, "value", r.status)
+        for index, key in (
+            (known.by_listing, (r.source, r.external_id)),
+            (known.by_address, (r.source, r.address_key)),
+        ):
+            k = index.setdefault(
+                key, KnownListing(r.listing_price, status, r.content_hash, set())
+            )
+            if r.saved_search_id is not None:
+                k.saved_search_ids.add(r.saved_search_id)
+    return known
+
+
+def drop_known(
+    matched: list[tuple[FoundListing, list[UUID]]], known: KnownListings
+) -> tuple[list[tuple[FoundListing, list[UUID]]], int]:
+    """
+    Filter out pairs already routed for a listing that hasn't changed.
+    Returns what is left and how many pairs were dropped.
+    """
+    kept: list[tuple[FoundListing, list[UUID]]] = []
+    dropped = 0
+    for item, ids in matched:
+        k = known.get(item)
+        if k is not None and not detect_changes(k, item):
+            new = [sid for sid in ids if sid not in k.saved_search_ids]
+            dropped += len(ids) - len(new)
+            ids = new
+        if ids:
+            kept.append((item, ids))
+    return kept, dropped
+
+
+async def _upsert_properties(
+    session: AsyncSession, items: dict[str, FoundListing]
+) -> dict[str, UUID]:
+    rows = [
+        {
+            "address_line1": item.address_line1,
+            "address_line2": item.address_line2,
+            "city": item.city,
+            "state": item.state,
+            "zip": item.zip,
+            "address_key": key,
+            "bedrooms": item.bedrooms,
+            "bathrooms": item.bathrooms,
+            "year_built": item.year_built,
+        }
+        for key, item in items.items()
+    ]
+    stmt = pg_insert(Property).values(rows)
+    # no-op update so RETURNING yields existing rows too
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Property.address_key],
+        set_={"address_key": stmt.excluded.address_key},
+    ).returning(Property.address_key, Property.id)
+    return {r.address_key: r.id for r in await session.execute(stmt)}
+
+
+async def _upsert_listings(
+    session: AsyncSession, items: dict[tuple[str, str], tuple[FoundListing, UUID]]
+) -> dict[tuple[str, str], UUID]:
+    now = datetime.now()
+    rows = [
+        {
+            "property_id": property_id,
+            "source": source,
+            "external_id": external_id,
+            "status": item.status or "ACTIVE",
+            "is_active": (item.status or "ACTIVE") == "ACTIVE",
+            "last_seen_at": now,
+            "listing_price": item.listing_price,
+            "listing_date": item.listing_date,
+            "remarks": item.remarks,
+            "content_hash": content_hash(item),
+        }
+        for (source, external_id), (item, property_id) in items.items()
+    ]
+    stmt = pg_insert(Listing).values(rows)
+    ex = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Listing.source, Listing.external_id],
+        index_where=text("external_id IS NOT NULL"),
+        set_={
+            "listing_price": func.coalesce(ex.listing_price, Listing.listing_price),
+            "listing_date": func.coalesce(ex.listing_date, Listing.listing_date),
+            "status": func.coalesce(ex.status, Listing.status),
+            "remarks": func.coalesce(ex.remarks, Listing.remarks),
+            "content_hash": func.coalesce(ex.content_hash, Listing.content_hash),
+            "last_seen_at": ex.last_seen_at,
+            "updated_at": func.now(),
+        },
+    ).returning(Listing.source, Listing.external_id, Listing.id)
+    return {(r.source, r.external_id): r.id for r in await session.execute(stmt)}
+
+
+async def ingest_listings(
+    session: AsyncSession,
+    matched: list[tuple[FoundListing, list[UUID]]],
+    known: KnownListings,
+) -> list[IngestedListing]:
+    """
+    Upsert the properties, listings and saved-search matches for a batch of
+    (listing, matching saved search ids) and record what changed on listings
+    already stored. Listings found more than once in the batch are merged.
+    Commits.
+    """
+    if not matched:
+        return []
+
+    by_key: dict[tuple[str, str], tuple[FoundListing, str, set[UUID]]] = {}
+    for item, ssids in matched:
+        lkey = (item.source, _external_id(item))
+        if lkey in by_key:
+            by_key[lkey][2].update(ssids)
+            continue
+        k = known.get(item, by_address=False)
+        if item.status is None and k is not None:
+            # keep the stored status rather than defaulting it back to ACTIVE
+            item = item.model_copy(update={"status": k.status})
+        by_key[lkey] = (item, _address_key(item), set(ssids))
+
+    property_ids = await _upsert_properties(
+        session, {akey: item for item, akey, _ in by_key.values()}
+    )
+    listing_ids = await _upsert_listings(
+        session,
+        {lkey: (item, property_ids[akey]) for lkey, (item, akey, _) in by_key.items()},
+    )
+
+    ingested: list[IngestedListing] = []
+    for lkey, (item, akey, ssids) in by_key.items():
+        row = IngestedListing(
+            property_id=property_ids[akey],
+            listing_id=listing_ids[lkey],
+            saved_search_ids=sorted(ssids),
+        )
+        # only the same listing row counts; an address hit is a new listing
+        k = known.get(item, by_address=False)
+        if k is not None:
+            row.matched_before = k.saved_search_ids & ssids
+            row.changes = detect_changes(k, item)
+        ingested.append(row)
+
+    events = [
+        {
+            "listing_id": i.listing_id,
+            "kind": c.kind,
+            "old_value": c.old_value,
+            "new_value": c.new_value,
+        }
+        for i in ingested
+        for c in i.changes
+    ]
+    if events:
+        by_listing = {i.listing_id: i for i in ingested}
+        rows = await session.execute(
+            pg_insert(ListingChangeEvent)
+            .values(events)
+            .returning(ListingChangeEvent.listing_id, ListingChangeEvent.id)
+        )
+        for r in rows:
+            by_listing[r.listing_id].change_event_id = r.id
+    pairs = [
+        {"listing_id": i.listing_id, "saved_search_id": ssid}
+        for i in ingested
+        for ssid in i.saved_search_ids
+    ]
+    if pairs:
+        await session.execute(
+            pg_insert(SavedSearchMatch).values(pairs).on_conflict_do_nothing()
+        )
+    await session.commit()
+    return ingested
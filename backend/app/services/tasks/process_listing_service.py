@@ -1,10 +1,11 @@
 from __future__ import annotations
 from fastapi.encoders import jsonable_encoder
 import json
+from uuid import UUID
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
-from openai import AsyncOpenAI
 from pydantic import ValidationError
 from geoalchemy2.elements import WKBElement
 from geoalchemy2.shape import to_shape
@@ -17,12 +18,11 @@ from app.models import (
     SearchListingAnalysis,
     Property,
 )
-from app.core.config import settings
+from app.core.llm import llm
 from app.schemas.openai import ListingAnalysisJSON
 from app.schemas.tasks import ListingTaskPayload
 from app.services.notification import notify_client_for_good_listing
 
-_oai = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 encoders = {
     WKBElement: lambda g: mapping(to_shape(g)),
 }
@@ -46,6 +46,8 @@ def _make_listing_analyze_prompt(listing: Listing, saved_search: SavedSearch) ->
             "state": listing.property.state,
             "zip": listing.property.zip,
             "price": listing.listing_price,
+            "status": listing.status,
+            "remarks": listing.remarks,
             "beds": listing.property.bedrooms,
             "baths": listing.property.bathrooms,
             "sb9_possible": listing.property.analysis.sb9_possible,
@@ -73,8 +75,13 @@ def _make_listing_analyze_prompt(listing: Listing, saved_search: SavedSearch) ->
 
 # ---- OpenAI helpers ----
 async def _ask_openai_listing_analyze(prompt: str) -> ListingAnalysisJSON:
-    resp = await _oai.responses.create(
-        model="gpt-4o-mini", tools=[{"type": "web_search"}], input=prompt
+    # rate limits/outages raise LLMUnavailable (task is retried); only an
+    # unusable answer falls through to the default below
+    resp = await llm.responses(
+        caller="listing-analysis",
+        model="gpt-4o-mini",
+        tools=[{"type": "web_search"}],
+        input=prompt,
     )
 
     try:
@@ -88,6 +95,110 @@ async def _ask_openai_listing_analyze(prompt: str) -> ListingAnalysisJSON:
         )
 
 
+async def store_listing_analysis(
+    session: AsyncSession,
+    listing: Listing,
+    saved_search: SavedSearch,
+    response: ListingAnalysisJSON,
+) -> SearchListingAnalysis:
+    """Write the analysis for (saved search, listing) and flush; no commit."""
+    # Re-analysis after a material listing change (see listing_changes)
+    # replaces the previous result for this (saved search, listing).
+    sla_row = await session.scalar(
+        select(SearchListingAnalysis).where(
+            SearchListingAnalysis.saved_search_id == saved_search.id,
+            SearchListingAnalysis.listing_id == listing.id,
+        )
+    )
+    if sla_row is None:
+        sla_row = SearchListingAnalysis(
+            saved_search_id=saved_search.id, listing_id=listing.id
+        )
+        session.add(sla_row)
+    sla_row.property_analysis_id = listing.property.analysis.id
+    sla_row.criteria_snapshot = jsonable_encoder(saved_search.to_dict())
+    sla_row.listing_snapshot = jsonable_encoder(
+        listing.to_dict(), custom_encoder=encoders
+    )
+    sla_row.llm_analysis = response.llm_analysis
+    sla_row.llm_summary = response.llm_summary
+    sla_row.verdict = response.verdict
+    await session.flush()
+    return sla_row
+
+
+async def notify_listing_analysis(
+    session: AsyncSession, sla_row: SearchListingAnalysis
+) -> None:
+    """Notify the client of a committed "good" analysis."""
+    # immediate send w/ simple idempotency
+    if sla_row.verdict == "good":
+        await notify_client_for_good_listing(
+            session=session,
+            saved_search_id=sla_row.saved_search_id,
+            listing_id=sla_row.listing_id,
+            search_listing_analysis_id=sla_row.id,
+        )
+
+
+async def save_listing_analysis(
+    session: AsyncSession,
+    listing: Listing,
+    saved_search: SavedSearch,
+    response: ListingAnalysisJSON,
+) -> dict[str, str]:
+    """Store the analysis for (saved search, listing), commit and notify."""
+    sla_row = await store_listing_analysis(session, listing, saved_search, response)
+    await session.commit()
+    await notify_listing_analysis(session, sla_row)
+    return {"listing_processed": str(listing.id)}
+
+
+async def ask_listing_analysis(
+    listing: Listing, saved_search: SavedSearch
+) -> ListingAnalysisJSON:
+    """LLM analysis of already-loaded rows (listing.property.analysis loaded).
+    Does not touch the session."""
+    return await _ask_openai_listing_analyze(
+        _make_listing_analyze_prompt(listing, saved_search)
+    )
+
+
+async def load_listing_pairs(
+    session: AsyncSession, pairs: list[tuple[UUID, UUID]]
+) -> dict[tuple[UUID, UUID], tuple[Listing, SavedSearch]]:
+    """
+    Load the listings (with property + analysis) and saved searches of many
+    (listing_id, saved_search_id) pairs in two queries. Pairs whose rows no
+    longer exist are left out.
+    """
+    if not pairs:
+        return {}
+    listings = {
+        row.id: row
+        for row in (
+            await session.scalars(
+                select(Listing)
+                .options(joinedload(Listing.property).joinedload(Property.analysis))
+                .where(Listing.id.in_({lid for lid, _ in pairs}))
+            )
+        ).unique()
+    }
+    searches = {
+        row.id: row
+        for row in await session.scalars(
+            select(SavedSearch)
+            .options(selectinload(SavedSearch.fields))
+            .where(SavedSearch.id.in_({sid for _, sid in pairs}))
+        )
+    }
+    return {
+        (lid, sid): (listings[lid], searches[sid])
+        for lid, sid in pairs
+        if lid in listings and sid in searches
+    }
+
+
 # ---- Main Task C entry ----
 async def process_listing(
     *, payload: ListingTaskPayload, session: AsyncSession
@@ -103,29 +214,5 @@ async def process_listing(
     if not listing or not saved_search:
         return {"message": "Invalid listing or saved_search."}
 
-    prompt = _make_listing_analyze_prompt(listing, saved_search)
-    response = await _ask_openai_listing_analyze(prompt)
-
-    sla_row = SearchListingAnalysis(
-        saved_search_id=saved_search.id,
-        listing_id=listing.id,
-        property_analysis_id=listing.property.analysis.id,
-        criteria_snapshot=jsonable_encoder(saved_search.to_dict()),
-        listing_snapshot=jsonable_encoder(listing.to_dict(), custom_encoder=encoders),
-        llm_analysis=response.llm_analysis,
-        llm_summary=response.llm_summary,
-        verdict=response.verdict,
-    )
-    session.add(sla_row)
-    await session.commit()
-
-    # 3) notify if "good" (immediate send w/ simple idempotency)
-    if sla_row.verdict == "good":
-        await notify_client_for_good_listing(
-            session=session,
-            saved_search_id=payload.saved_search_id,
-            listing_id=payload.listing_id,
-            search_listing_analysis_id=sla_row.id,
-        )
-
-    return {"listing_processed": str(listing.id)}
+    response = await ask_listing_analysis(listing, saved_search)
+    return await save_listing_analysis(session, listing, saved_search, response)
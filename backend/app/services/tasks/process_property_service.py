@@ -1,42 +1,143 @@
+import asyncio
+import logging
+import time
+from uuid import UUID
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from google.cloud import tasks_v2
 
 from app.core.cloud_tasks import TaskEnqueuer
 from app.core.config import settings
-from app.schemas.tasks import ListingTaskPayload, PropertyTaskPayload
+from app.core.llm import llm
+from app.core.singleflight import SingleFlight, advisory_xact_lock
+from app.schemas.tasks import PropertyTaskPayload
 from app.services.sb9 import get_property_geoms
 from app.services.sb9_2 import find_house_containment_split_feet
+from .process_listing_service import (
+    ask_listing_analysis,
+    load_listing_pairs,
+    notify_listing_analysis,
+    store_listing_analysis,
+)
+from .property_fanin import (
+    claim_version,
+    listing_task,
+    release_waiters,
+    waiting_pairs,
+)
+
+log = logging.getLogger("sb9.tasks")
+
+_inflight = SingleFlight()
+
+
+async def _analyze_property(session: AsyncSession, property_id: UUID) -> None:
+    # Held until commit, so a second worker waits and then short-circuits on
+    # the stored geometry/analysis instead of recomputing it.
+    await advisory_xact_lock(session, f"property:{property_id}")
+    property_with_geoms = await get_property_geoms(property_id, session)
+    await find_house_containment_split_feet(
+        session,
+        property_id=property_id,
+        parcel_xy=property_with_geoms.parcel,
+        house_xy=property_with_geoms.house,
+    )
+    await session.commit()
+
+
+async def _fuse_listings(
+    session: AsyncSession, pairs: list[tuple[UUID, UUID]], deadline: float
+) -> list[tuple[UUID, UUID]]:
+    """
+    Run the listing stage for ``pairs`` in this request, reusing the session:
+    the rows are loaded in two queries, the LLM calls run
+    TASKS_FUSION_CONCURRENCY at a time and the results are saved one by one.
+    A pair is only started while the request is inside its budget and the
+    LLM gateway could take the call right away (free batch slot, not rate
+    limited). Returns the pairs that ran; the caller enqueues the rest.
+    """
+    rows = await load_listing_pairs(session, pairs)
+    sem = asyncio.Semaphore(max(1, settings.TASKS_FUSION_CONCURRENCY))
+
+    async def ask(pair: tuple[UUID, UUID]):
+        async with sem:
+            if time.monotonic() >= deadline or not llm.has_capacity():
+                return None
+            try:
+                return await ask_listing_analysis(*rows[pair])
+            except Exception:
+                log.exception("[fusion] listing %s analysis failed", pair[0])
+                return None
+
+    fused = [p for p in pairs if p in rows]
+    responses = await asyncio.gather(*(ask(p) for p in fused))
+    done: list[tuple[UUID, UUID]] = []
+    for pair, response in zip(fused, responses):
+        if response is None:
+            continue
+        # A savepoint per pair: a failed save rolls back only its own writes
+        # and leaves the other loaded rows usable (a full rollback would
+        # expire them). The pair is then left to its own listing task.
+        try:
+            async with session.begin_nested():
+                sla_row = await store_listing_analysis(session, *rows[pair], response)
+        except Exception:
+            log.exception("[fusion] listing %s save failed", pair[0])
+            continue
+        await session.commit()
+        try:
+            await notify_listing_analysis(session, sla_row)
+        except Exception:
+            # its listing task re-sends; notifications are idempotent
+            log.exception("[fusion] listing %s notify failed", pair[0])
+            continue
+        done.append(pair)
+    return done
 
 
 async def process_property(
     *, payload: PropertyTaskPayload, session: AsyncSession, enqueuer: TaskEnqueuer
-):
+) -> dict[str, int]:
+    """
+    Analyze the property once, then fan out process-listing to every
+    (listing, saved search) pair that was waiting on it. With TASKS_FUSION
+    some of those pairs are analyzed right here instead (_fuse_listings).
+    The waiters are only released once every pair has been handed off.
+    """
+    started = time.monotonic()
+    property_id = payload.property_id
     try:
-        property_id = payload.property_id
-        listing_id = payload.listing_id
-        saved_search_id = payload.saved_search_id
-        property_with_geoms = await get_property_geoms(property_id, session)
-        await find_house_containment_split_feet(
-            session,
-            property_id=property_id,
-            parcel_xy=property_with_geoms.parcel,
-            house_xy=property_with_geoms.house,
+        await _inflight.do(
+            f"property:{property_id}", lambda: _analyze_property(session, property_id)
         )
-        await session.commit()
+        waiting = await waiting_pairs(session, property_id)
     except Exception:
         await session.rollback()
         raise
-    enqueuer.enqueue_http_task(
-        queue=settings.CLOUD_TASKS_QUEUE_LISTING,
-        url=f"{settings.BASE_URL}/tasks/process-listing",
-        method=tasks_v2.HttpMethod.POST,
-        headers=(
-            {"x-tasks-secret": settings.TASKS_SHARED_SECRET}
-            if settings.TASKS_SHARED_SECRET
-            else None
-        ),
-        body=ListingTaskPayload(
-            listing_id=listing_id, saved_search_id=saved_search_id
-        ).model_dump(mode="json"),
-        oidc_audience=settings.BASE_URL,
+
+    pairs = list(waiting)
+    if payload.listing_id and payload.saved_search_id:
+        pairs.append((payload.listing_id, payload.saved_search_id))
+    pairs = list(dict.fromkeys(pairs))
+
+    fused: set[tuple[UUID, UUID]] = set()
+    deadline = started + settings.TASKS_FUSION_BUDGET_S
+    if settings.TASKS_FUSION and time.monotonic() < deadline:
+        fused = set(
+            await _fuse_listings(
+                session, pairs[: settings.TASKS_FUSION_MAX_LISTINGS], deadline
+            )
+        )
+    rest = [p for p in pairs if p not in fused]
+    version = claim_version(payload.claimed_at)
+    enqueued = await enqueuer.enqueue_many(
+        listing_task(
+            listing_id=listing_id, saved_search_id=saved_search_id, version=version
+        )
+        for listing_id, saved_search_id in rest
     )
+    try:
+        await release_waiters(session, property_id, waiting)
+    except Exception:
+        await session.rollback()
+        raise
+    return {"enqueued_listing_tasks": enqueued, "fused_listings": len(fused)}
@@ -0,0 +1,225 @@
+"""
+Fan-in/fan-out around process-property.
+
+Every (listing, saved search) pair that needs a property's analysis is parked
+in property_task_waiters, and pending_property_tasks makes sure only one
+process-property task per property is in flight. When that task finishes it
+enqueues one process-listing task per waiting pair and only then deletes the
+waiters and the claim, so a failed enqueue leaves them for the retry.
+
+Both sides take the same advisory lock, so a waiter is either seen by the
+drain or finds no pending row and enqueues a fresh property task itself.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from google.cloud import tasks_v2
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cloud_tasks import HttpTask, TaskEnqueuer, task_name
+from app.core.config import settings
+from app.core.singleflight import advisory_xact_lock, advisory_xact_locks
+from app.models import PendingPropertyTask, PropertyAnalysis, PropertyTaskWaiter
+from app.schemas.tasks import ListingTaskPayload, PropertyTaskPayload
+
+
+def _fanin_lock_key(property_id: UUID) -> str:
+    return f"property-fanin:{property_id}"
+
+
+def _task_headers() -> dict[str, str] | None:
+    return (
+        {"x-tasks-secret": settings.TASKS_SHARED_SECRET}
+        if settings.TASKS_SHARED_SECRET
+        else None
+    )
+
+
+def _versioned(entity: str, version: object | None) -> str:
+    return f"{entity}-{version}" if version is not None else entity
+
+
+def listing_task(
+    *, listing_id: UUID, saved_search_id: UUID, version: object | None = None
+) -> HttpTask:
+    """
+    ``version`` tells apart different work for the same pair within a task
+    cycle: the change event behind a re-analysis, or the property claim that
+    fanned the pair out.
+    """
+    return HttpTask(
+        queue=settings.CLOUD_TASKS_QUEUE_LISTING,
+        url=f"{settings.BASE_URL}/tasks/process-listing",
+        method=tasks_v2.HttpMethod.POST,
+        headers=_task_headers(),
+        body=ListingTaskPayload(
+            listing_id=listing_id, saved_search_id=saved_search_id
+        ).model_dump(mode="json"),
+        oidc_audience=settings.BASE_URL,
+        name=task_name(
+            "listing", _versioned(f"{listing_id}-{saved_search_id}", version)
+        ),
+    )
+
+
+def claim_version(claimed_at: datetime | None) -> str | None:
+    return None if claimed_at is None else str(int(claimed_at.timestamp() * 1e6))
+
+
+def property_task(*, property_id: UUID, claimed_at: datetime | None = None) -> HttpTask:
+    """One task per claim: a claim re-taken after its TTL gets a new name."""
+    return HttpTask(
+        queue=settings.CLOUD_TASKS_QUEUE_PROPERTY,
+        url=f"{settings.BASE_URL}/tasks/process-property",
+        method=tasks_v2.HttpMethod.POST,
+        headers=_task_headers(),
+        body=PropertyTaskPayload(
+            property_id=property_id, claimed_at=claimed_at
+        ).model_dump(mode="json"),
+        oidc_audience=settings.BASE_URL,
+        name=task_name(
+            "property", _versioned(str(property_id), claim_version(claimed_at))
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class ListingRequest:
+    """A matched (listing, saved search) pair to route towards process-listing."""
+
+    property_id: UUID
+    listing_id: UUID
+    saved_search_id: UUID
+    version: object | None = None  # see listing_task
+
+
+async def route_listings(
+    session: AsyncSession, enqueuer: TaskEnqueuer, requests: list[ListingRequest]
+) -> Counter[str]:
+    """
+    Route a batch of matched pairs towards process-listing, with a fixed
+    number of statements and one enqueue for the whole batch. Per pair:
+    "listing" (property already analyzed, listing task enqueued directly),
+    "property" (waiter parked, this batch claimed the property task) or
+    "waiting" (waiter parked, a property task already in flight will fan out
+    to it). Returns how many pairs went each way. Commits.
+    """
+    outcomes: Counter[str] = Counter()
+    if not requests:
+        return outcomes
+    property_ids = {r.property_id for r in requests}
+    await advisory_xact_locks(session, (_fanin_lock_key(p) for p in property_ids))
+
+    analyzed = set(
+        await session.scalars(
+            select(PropertyAnalysis.property_id).where(
+                PropertyAnalysis.property_id.in_(property_ids)
+            )
+        )
+    )
+    direct = [r for r in requests if r.property_id in analyzed]
+    waiting = [r for r in requests if r.property_id not in analyzed]
+    claimed: dict[UUID, datetime] = {}
+    if waiting:
+        await session.execute(
+            pg_insert(PropertyTaskWaiter)
+            .values(
+                [
+                    {
+                        "property_id": r.property_id,
+                        "listing_id": r.listing_id,
+                        "saved_search_id": r.saved_search_id,
+                    }
+                    for r in waiting
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+        # Claim the property task unless one is in flight. A claim older than
+        # the TTL is treated as lost (task exhausted its retries) and re-taken.
+        stale_before = func.now() - timedelta(
+            seconds=settings.PROPERTY_TASK_PENDING_TTL_S
+        )
+        rows = await session.execute(
+            pg_insert(PendingPropertyTask)
+            .values(
+                [{"property_id": p} for p in sorted({r.property_id for r in waiting})]
+            )
+            .on_conflict_do_update(
+                index_elements=[PendingPropertyTask.property_id],
+                set_={"enqueued_at": func.now()},
+                where=PendingPropertyTask.enqueued_at < stale_before,
+            )
+            .returning(PendingPropertyTask.property_id, PendingPropertyTask.enqueued_at)
+        )
+        claimed = {r.property_id: r.enqueued_at for r in rows}
+    await session.commit()
+
+    tasks = [
+        listing_task(
+            listing_id=r.listing_id,
+            saved_search_id=r.saved_search_id,
+            version=r.version,
+        )
+        for r in direct
+    ] + [
+        property_task(property_id=p, claimed_at=claimed_at)
+        for p, claimed_at in claimed.items()
+    ]
+    await enqueuer.enqueue_many(tasks)
+    outcomes["listing"] = len(direct)
+    for r in waiting:
+        outcomes["property" if r.property_id in claimed else "waiting"] += 1
+    return outcomes
+
+
+async def waiting_pairs(
+    session: AsyncSession, property_id: UUID
+) -> list[tuple[UUID, UUID]]:
+    """
+    Every (listing_id, saved_search_id) pair waiting on the property. Call
+    after its analysis is committed: the lock waits out requests that saw no
+    analysis yet, and later ones enqueue their listing task directly. Commits.
+    """
+    await advisory_xact_lock(session, _fanin_lock_key(property_id))
+    rows = await session.execute(
+        select(PropertyTaskWaiter.listing_id, PropertyTaskWaiter.saved_search_id)
+        .where(PropertyTaskWaiter.property_id == property_id)
+        .order_by(PropertyTaskWaiter.created_at)
+    )
+    pairs = [(r.listing_id, r.saved_search_id) for r in rows]
+    await session.commit()
+    return pairs
+
+
+async def release_waiters(
+    session: AsyncSession, property_id: UUID, pairs: list[tuple[UUID, UUID]]
+) -> None:
+    """
+    Drop ``pairs`` from the waiters and release the property's pending claim,
+    once their listing tasks are enqueued; if that fails the waiters stay and
+    the retried property task fans them out again. Commits.
+    """
+    await advisory_xact_lock(session, _fanin_lock_key(property_id))
+    await session.execute(
+        delete(PendingPropertyTask).where(
+            PendingPropertyTask.property_id == property_id
+        )
+    )
+    if pairs:
+        await session.execute(
+            delete(PropertyTaskWaiter).where(
+                PropertyTaskWaiter.property_id == property_id,
+                tuple_(
+                    PropertyTaskWaiter.listing_id, PropertyTaskWaiter.saved_search_id
+                ).in_(pairs),
+            )
+        )
+    await session.commit()
@@ -1,94 +1,59 @@
 from __future__ import annotations
 
+import asyncio
 import json
+from collections import Counter
 
 from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from google.cloud import tasks_v2
-from openai import AsyncOpenAI
 from pydantic import ValidationError
-from datetime import datetime
 from uuid import UUID
 
-from app.models import SavedSearch, SavedSearchMatch, Listing, Property
+from app.models import SavedSearch
 from app.core.config import settings
+from app.core.llm import llm
 from app.core.cloud_tasks import TaskEnqueuer
 from app.schemas.openai import FoundListing, FindListingsResult
-from app.schemas.tasks import PropertyTaskPayload
+from .discovery_planner import SearchCriteria, merge_criteria, search_criteria
+from .listing_changes import needs_reanalysis
+from .listing_ingest import drop_known, ingest_listings, load_known
+from .property_fanin import ListingRequest, route_listings
+from .search_index import search_index
+from .search_schedule import reschedule
 
-_oai = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
+def _fmt(value: float | None) -> str | None:
+    if value is None:
+        return None
+    return str(int(value)) if float(value).is_integer() else str(value)
 
-def _index_fields(
-    saved_search: SavedSearch,
-) -> tuple[
-    str | None,  # beds_min
-    str | None,  # baths_min
-    str | None,  # max_price
-    str | None,  # analysis_note
-    str | None,  # city
-    str | None,  # zip
-    str | None,  # property_sub_type
-    str | None,  # within_radius
-    str | None,  # garage_spaces
-    str | None,  # lot_size
-    str | None,  # living_area
-]:
-    beds_min = saved_search.beds_min
-    baths_min = saved_search.baths_min
-    max_price = saved_search.max_price
-    map: dict[str, str] = {}
-    for f in saved_search.fields:
-        key = f.search_field
-        val = f.value
-        if key and val is not None and key not in map:
-            map[key] = val
 
-    city = map.get("city")
-    zip_code = map.get("zip")
-    property_subtype = map.get("property_sub_type")
-    within_radius = map.get("within_radius")
-    garage_spaces = map.get("garage_spaces")
-    lot_size = map.get("lot_size")
-    living_area = map.get("living_area")
-
-    return (
-        beds_min,
-        baths_min,
-        max_price,
-        city,
-        zip_code,
-        property_subtype,
-        within_radius,
-        garage_spaces,
-        lot_size,
-        living_area,
-    )
-
-
-def _make_find_listings_prompt(saved_search: SavedSearch) -> str:
-    (
-        beds_min,
-        baths_min,
-        max_price,
-        city,
-        zip_code,
-        property_subtype,
-        within_radius,
-        garage_spaces,
-        lot_size,
-        living_area,
-    ) = _index_fields(saved_search)
+def _make_find_listings_prompt(criteria: SearchCriteria) -> str:
+    beds_min = _fmt(criteria.beds_min)
+    baths_min = _fmt(criteria.baths_min)
+    max_price = _fmt(criteria.max_price)
+    property_subtype = criteria.property_sub_type
+    garage_spaces = _fmt(criteria.garage_spaces)
+    lot_size = _fmt(criteria.lot_size)
+    living_area = _fmt(criteria.living_area)
 
     # Build the human-readable criteria (minimal guards; blanks are fine)
-    criteria = (
+    requirements = (
         "Find currently For Sale listings on Zillow that satisfy the requirements:\n"
         f"Must be {property_subtype} with minimum {beds_min} beds, and {baths_min} baths and maximum ${max_price}.\n"
-        f"Located within Orange County (Aliso Viejo,Anaheim,Brea,Buena Park,Costa Mesa,Cypress,Dana Point,Fountain Valley,Fullerton,Garden Grove,Huntington Beach,Irvine,La Habra,La Palma,Laguna Beach,Laguna Hills,Laguna Niguel,Laguna Woods,Lake Forest,Los Alamitos,Mission Viejo,Newport Beach,Orange,Placentia,Rancho Santa Margarita,San Clemente,San Juan Capistrano,Santa Ana,Seal Beach,Stanton,Tustin,Villa Park,Westminster,Yorba Linda).\n",
-        f"Preferably: {garage_spaces} garage spaces, minimum lot size {lot_size} sqft, and minimum living area {living_area} sqft.\n",
+        f"Located within Orange County (Aliso Viejo,Anaheim,Brea,Buena Park,Costa Mesa,Cypress,Dana Point,Fountain Valley,Fullerton,Garden Grove,Huntington Beach,Irvine,La Habra,La Palma,Laguna Beach,Laguna Hills,Laguna Niguel,Laguna Woods,Lake Forest,Los Alamitos,Mission Viejo,Newport Beach,Orange,Placentia,Rancho Santa Margarita,San Clemente,San Juan Capistrano,Santa Ana,Seal Beach,Stanton,Tustin,Villa Park,Westminster,Yorba Linda).\n"
+        f"Preferably: {garage_spaces} garage spaces, minimum lot size {lot_size} sqft, and minimum living area {living_area} sqft.\n"
     )
+    if criteria.cities:
+        requirements += (
+            "Only in these cities: "
+            + ", ".join(sorted(c.title() for c in criteria.cities))
+            + ".\n"
+        )
+    if criteria.zips:
+        requirements += "Only in these ZIP codes: " + ", ".join(sorted(criteria.zips))
+        requirements += ".\n"
 
     schema = (
         '{ "listings": ['
@@ -97,24 +62,33 @@ def _make_find_listings_prompt(saved_search: SavedSearch) -> str:
         '"city":str,"state":str,"zip":str,'
         '"listing_price":number,"listing_date":datetime ISO 8601,'
         '"status":"ACTIVE",'
-        '"bedrooms":int|None,"bathrooms":float|None,"year_built":int|None}'
+        '"property_sub_type":str|None,'
+        '"bedrooms":int|None,"bathrooms":float|None,"year_built":int|None,'
+        '"living_area":int|None,"lot_size":int|None,"garage_spaces":int|None,'
+        '"remarks":str|None,"media":[str]}'
         "]}"
     )
 
     return (
-        f"{criteria}\n"
+        f"{requirements}\n"
         "Return STRICTLY valid JSON ONLY in the exact schema below (no prose, no code fences):\n"
         f"{schema}\n\n"
         "DO NOT MAKE UP ANY FAKE LISTING. DO NOT GIVE ME SOLD OR OFF MARKET LISTINGS\n"
         "For listing_date use the Days on Zillow to estimate the date.\n"
+        "For remarks use the listing description; media is its photo URLs (may be empty).\n"
         "DO NOT put City, State, Zip in address line 1.\n"
         'If nothing found, return exactly {"listings":[]}.'
     )
 
 
 async def _ask_openai_for_listings(prompt: str) -> FindListingsResult:
-    resp = await _oai.responses.create(
-        model="gpt-4o-mini", tools=[{"type": "web_search"}], input=prompt
+    # rate limits/outages raise LLMUnavailable (task is retried); only an
+    # unusable answer falls through to the default below
+    resp = await llm.responses(
+        caller="listing-discovery",
+        model="gpt-4o-mini",
+        tools=[{"type": "web_search"}],
+        input=prompt,
     )
 
     try:
@@ -128,145 +102,126 @@ async def _ask_openai_for_listings(prompt: str) -> FindListingsResult:
         return FindListingsResult(listings=[])
 
 
-# TODO: Move to Listing service?
-async def _get_or_create_listing(
-    session: AsyncSession, item: FoundListing, property: Property
-) -> Listing:
-    q = select(Listing).where(
-        Listing.source == item.source,
-        Listing.external_id == item.external_id,
-    )
-    existing = (await session.execute(q)).scalar_one_or_none()
-    if existing:
-        existing.listing_price = item.listing_price or existing.listing_price
-        existing.listing_date = item.listing_date or existing.listing_date
-        existing.status = item.status or existing.status
-        return existing
-    row = Listing(
-        property_id=property.id,
-        source=item.source,
-        external_id=item.external_id,
-        status=item.status or "ACTIVE",
-        is_active=(item.status == "ACTIVE"),
-        last_seen_at=datetime.now(),
-        listing_price=item.listing_price,
-        listing_date=item.listing_date,
-    )
-    session.add(row)
+async def _ingest(
+    session: AsyncSession,
+    enqueuer: TaskEnqueuer,
+    found: list[FoundListing],
+) -> tuple[dict[str, int], Counter[UUID]]:
+    """
+    Match found listings against every active search, drop pairs seen
+    unchanged on an earlier run, store the rest in one batch
+    (listing_ingest) and route the new pairs on in one batch too
+    (route_listings). Pairs analyzed before are only re-analyzed when a
+    change is material for that search. Also returns the number of pairs
+    routed per saved search (its yield, see search_schedule).
+    """
+    matched = [(item, ssids) for item in found if (ssids := search_index.match(item))]
     try:
-        await session.flush()  # surfaces IntegrityError if unique constraint hits
-        return row
-    except IntegrityError:
-        await (
-            session.rollback()
-        )  # or use a savepoint with begin_nested() if you have other pending work
-        return (await session.execute(q)).scalar_one()
-
-
-# TODO: Move to property service?
-async def _get_or_create_property(
-    session: AsyncSession, item: FoundListing
-) -> Property:
-    address_line2 = (item.address_line2 or "").strip()
-    base_filters = [
-        Property.address_line1 == item.address_line1,
-        Property.city == item.city,
-        Property.state == item.state,
-        Property.zip == item.zip,
-    ]
-    addr2_filter = (
-        Property.address_line2.is_(None)
-        if not address_line2
-        else Property.address_line2 == address_line2
-    )
-
-    q = select(Property).where(*base_filters, addr2_filter)
-
-    existing = (await session.execute(q)).scalar_one_or_none()
-
-    if existing:
-        return existing
-
-    row = Property(
-        address_line1=item.address_line1,
-        address_line2=item.address_line2,
-        city=item.city,
-        state=item.state,
-        zip=item.zip,
-        bedrooms=item.bedrooms,
-        bathrooms=item.bathrooms,
-        year_built=item.year_built,
-    )
-    session.add(row)
+        known = await load_known(session, matched)
+        matched, skipped = drop_known(matched, known)
+        ingested = await ingest_listings(session, matched, known)
+    except Exception:
+        await session.rollback()
+        raise
+    reanalyzed = unchanged = 0
+    requests: list[ListingRequest] = []
+    for row in ingested:
+        for ssid in row.saved_search_ids:
+            if ssid in row.matched_before:
+                if not needs_reanalysis(row.changes, search_index.get(ssid)):
+                    unchanged += 1
+                    continue
+                reanalyzed += 1
+            requests.append(
+                ListingRequest(
+                    property_id=row.property_id,
+                    listing_id=row.listing_id,
+                    saved_search_id=ssid,
+                    version=row.change_event_id,
+                )
+            )
     try:
-        await session.flush()  # surfaces IntegrityError if unique constraint hits
-        return row
-    except IntegrityError:
-        await (
-            session.rollback()
-        )  # or use a savepoint with begin_nested() if you have other pending work
-        return (await session.execute(q)).scalar_one()
-
-
-async def _get_or_create_saved_search_match(
-    session: AsyncSession, ssid: UUID, lid: UUID
-) -> SavedSearchMatch:
-    q = select(SavedSearchMatch).where(
-        SavedSearchMatch.listing_id == lid,
-        SavedSearchMatch.saved_search_id == ssid,
+        await route_listings(session, enqueuer, requests)
+    except Exception:
+        await session.rollback()
+        raise
+    per_search: Counter[UUID] = Counter(r.saved_search_id for r in requests)
+    counts = {
+        "found": len(found),
+        "matches": len(requests),
+        "reanalyzed": reanalyzed,
+        "skipped_known": skipped,
+        "skipped_below_threshold": unchanged,
+    }
+    return counts, per_search
+
+
+async def _load_active_searches(
+    session: AsyncSession, saved_search_ids: list[UUID]
+) -> list[SavedSearch]:
+    rows = await session.execute(
+        select(SavedSearch)
+        .options(selectinload(SavedSearch.client), selectinload(SavedSearch.fields))
+        .where(SavedSearch.id.in_(saved_search_ids))
     )
-    existing = (await session.execute(q)).scalar_one_or_none()
-    if existing:
-        return existing
-    row = SavedSearchMatch(listing_id=lid, saved_search_id=ssid)
-    session.add(row)
+    return [ss for ss in rows.scalars() if ss.client and ss.client.is_active]
 
 
 async def process_saved_search(
     *, saved_search_id: UUID, session: AsyncSession, enqueuer: TaskEnqueuer
-) -> int:
-    ss: SavedSearch | None = await session.get(
-        SavedSearch,
-        saved_search_id,
-        options=[
-            selectinload(SavedSearch.client),
-            selectinload(SavedSearch.fields),
-            selectinload(SavedSearch.matches),
-        ],
+) -> dict[str, int]:
+    return await process_saved_searches(
+        saved_search_ids=[saved_search_id], session=session, enqueuer=enqueuer
     )
-    if not ss or not ss.client or not ss.client.is_active:
-        return 0
 
-    prompt = _make_find_listings_prompt(ss)
-    found = await _ask_openai_for_listings(prompt)
-    if not found.listings:
-        return 0
-    new_listing_ids = []
 
-    for item in found.listings:
-        try:
-            prop = await _get_or_create_property(session, item)
-            listing = await _get_or_create_listing(session, item, property=prop)
-            await _get_or_create_saved_search_match(session, ss.id, listing.id)
-            new_listing_ids.append(listing.id)
-            await session.flush()
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        enqueuer.enqueue_http_task(
-            queue=settings.CLOUD_TASKS_QUEUE_PROPERTY,
-            url=f"{settings.BASE_URL}/tasks/process-property",
-            method=tasks_v2.HttpMethod.POST,
-            headers=(
-                {"x-tasks-secret": settings.TASKS_SHARED_SECRET}
-                if settings.TASKS_SHARED_SECRET
-                else None
-            ),
-            body=PropertyTaskPayload(
-                saved_search_id=ss.id, listing_id=listing.id, property_id=prop.id
-            ).model_dump(mode="json"),
-            oidc_audience=settings.BASE_URL,
-        )
-
-    return len(new_listing_ids)
+async def process_saved_searches(
+    *, saved_search_ids: list[UUID], session: AsyncSession, enqueuer: TaskEnqueuer
+) -> dict[str, int]:
+    """
+    Discovery for a batch of saved searches on one session: searches,
+    clients and fields load in one selectinload round, the LLM calls run up
+    to SAVED_SEARCH_BATCH_CONCURRENCY at a time, and everything found is
+    ingested together.
+    """
+    searches = await _load_active_searches(session, saved_search_ids)
+    if not searches:
+        return {"searches": 0, "found": 0, "matches": 0}
+
+    intervals = {ss.id: ss.interval_s for ss in searches}
+    await search_index.ensure_loaded(session)
+    sem = asyncio.Semaphore(max(1, settings.SAVED_SEARCH_BATCH_CONCURRENCY))
+
+    async def discover(ss: SavedSearch) -> list[FoundListing]:
+        async with sem:
+            prompt = _make_find_listings_prompt(search_criteria(ss))
+            return (await _ask_openai_for_listings(prompt)).listings
+
+    results = await asyncio.gather(*(discover(ss) for ss in searches))
+    found = [item for listings in results for item in listings]
+    counts, per_search = await _ingest(session, enqueuer, found)
+    await reschedule(session, intervals, per_search)
+    return {"searches": len(searches), **counts}
+
+
+async def process_discovery_cluster(
+    *, saved_search_ids: list[UUID], session: AsyncSession, enqueuer: TaskEnqueuer
+) -> dict[str, int]:
+    """
+    One discovery call for a cluster of compatible saved searches (see
+    discovery_planner), then a local match of each found listing against
+    every active search (search_index), not just the cluster.
+    """
+    searches = await _load_active_searches(session, saved_search_ids)
+    if not searches:
+        return {"found": 0, "matches": 0}
+
+    intervals = {ss.id: ss.interval_s for ss in searches}
+    await search_index.ensure_loaded(session)
+    criteria = [search_criteria(ss) for ss in searches]
+    found = await _ask_openai_for_listings(
+        _make_find_listings_prompt(merge_criteria(criteria))
+    )
+    counts, per_search = await _ingest(session, enqueuer, found.listings)
+    await reschedule(session, intervals, per_search)
+    return counts
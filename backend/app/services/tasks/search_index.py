@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import threading
+import time
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.models import Client, SavedSearch
+from app.schemas.openai import FoundListing
+from .discovery_planner import SearchCriteria, _norm, search_criteria
+
+_MIN_UUID = UUID(int=0)
+_MAX_UUID = UUID(int=(1 << 128) - 1)
+
+# (criteria attribute, listing attribute, listing value must be >= or <=)
+_DIMENSIONS = (
+    ("beds_min", "bedrooms", ">="),
+    ("baths_min", "bathrooms", ">="),
+    ("max_price", "listing_price", "<="),
+    ("living_area", "living_area", ">="),
+    ("lot_size", "lot_size", ">="),
+    ("garage_spaces", "garage_spaces", ">="),
+)
+
+
+class _Thresholds:
+    """
+    Sorted (threshold, search_id) pairs for one numeric dimension, with the
+    ids mirrored in a flat list so a bisect yields a ready-made id slice.
+    """
+
+    def __init__(self, op: str):
+        self.op = op
+        self.items: list[tuple[float, UUID]] = []
+        self.ids: list[UUID] = []
+
+    def add(self, value: float, sid: UUID) -> None:
+        i = bisect.bisect_left(self.items, (value, sid))
+        self.items.insert(i, (value, sid))
+        self.ids.insert(i, sid)
+
+    def remove(self, value: float, sid: UUID) -> None:
+        i = bisect.bisect_left(self.items, (value, sid))
+        if i < len(self.items) and self.items[i] == (value, sid):
+            del self.items[i]
+            del self.ids[i]
+
+    def failing(self, value: float) -> list[UUID]:
+        """Searches whose threshold ``value`` does not meet."""
+        if self.op == ">=":
+            return self.ids[bisect.bisect_right(self.items, (value, _MAX_UUID)) :]
+        return self.ids[: bisect.bisect_left(self.items, (value, _MIN_UUID))]
+
+
+class SearchIndex:
+    """
+    In-memory matcher over every active saved search. Geography is an
+    inverted index (city -> searches, zip -> searches, plus searches that
+    don't restrict location); numeric criteria are sorted threshold lists per
+    dimension, and property subtype is one more inverted index. A listing is
+    matched by taking its geo candidates, keeping those that allow its
+    subtype and, per dimension, removing the slice of searches whose
+    threshold it misses. Missing listing values never exclude a search (same
+    rule as SearchCriteria.matches). Updated per search via upsert/remove.
+
+    The API updates it from sync endpoints running in the threadpool while
+    the event loop matches, so every read and write holds ``_mutex``.
+    """
+
+    def __init__(self) -> None:
+        self._mutex = threading.RLock()
+        self._clear()
+        self.loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def _clear(self) -> None:
+        self._criteria: dict[UUID, SearchCriteria] = {}
+        self._by_city: dict[str, set[UUID]] = {}
+        self._by_city_zip: dict[tuple[str, str], set[UUID]] = {}
+        self._by_zip: dict[str, set[UUID]] = {}
+        self._anywhere: set[UUID] = set()
+        self._by_subtype: dict[str, set[UUID]] = {}
+        self._any_subtype: set[UUID] = set()
+        self._thresholds = {
+            attr: _Thresholds(op) for attr, _listing_attr, op in _DIMENSIONS
+        }
+
+    def __len__(self) -> int:
+        with self._mutex:
+            return len(self._criteria)
+
+    def get(self, saved_search_id: UUID) -> SearchCriteria | None:
+        with self._mutex:
+            return self._criteria.get(saved_search_id)
+
+    def upsert(self, criteria: SearchCriteria) -> None:
+        with self._mutex:
+            self._upsert(criteria)
+
+    def _upsert(self, criteria: SearchCriteria) -> None:
+        sid = criteria.saved_search_ids[0]
+        self._remove(sid)
+        self._criteria[sid] = criteria
+        if criteria.property_sub_type:
+            subtype = _norm(criteria.property_sub_type)
+            self._by_subtype.setdefault(subtype, set()).add(sid)
+        else:
+            self._any_subtype.add(sid)
+        if criteria.cities and criteria.zips:
+            for key in self._city_zips(criteria):
+                self._by_city_zip.setdefault(key, set()).add(sid)
+        elif criteria.cities:
+            for city in criteria.cities:
+                self._by_city.setdefault(city, set()).add(sid)
+        elif criteria.zips:
+            for z in criteria.zips:
+                self._by_zip.setdefault(z, set()).add(sid)
+        else:
+            self._anywhere.add(sid)
+        for attr, th in self._thresholds.items():
+            value = getattr(criteria, attr)
+            if value is not None:
+                th.add(value, sid)
+
+    def remove(self, saved_search_id: UUID) -> None:
+        with self._mutex:
+            self._remove(saved_search_id)
+
+    def _remove(self, saved_search_id: UUID) -> None:
+        old = self._criteria.pop(saved_search_id, None)
+        if old is None:
+            return
+        if old.property_sub_type:
+            subtype = _norm(old.property_sub_type)
+            self._by_subtype.get(subtype, set()).discard(saved_search_id)
+        self._any_subtype.discard(saved_search_id)
+        for city in old.cities:
+            self._by_city.get(city, set()).discard(saved_search_id)
+        for key in self._city_zips(old):
+            self._by_city_zip.get(key, set()).discard(saved_search_id)
+        for z in old.zips:
+            self._by_zip.get(z, set()).discard(saved_search_id)
+        self._anywhere.discard(saved_search_id)
+        for attr, th in self._thresholds.items():
+            value = getattr(old, attr)
+            if value is not None:
+                th.remove(value, saved_search_id)
+
+    @staticmethod
+    def _city_zips(criteria: SearchCriteria) -> list[tuple[str, str]]:
+        return [(c, z) for c in criteria.cities for z in criteria.zips]
+
+    def _candidates(self, item: FoundListing) -> set[UUID]:
+        city, zip5 = _norm(item.city), (item.zip or "")[:5]
+        return self._anywhere.union(
+            self._by_city.get(city, ()),
+            self._by_zip.get(zip5, ()),
+            self._by_city_zip.get((city, zip5), ()),
+        )
+
+    def match(self, item: FoundListing) -> list[UUID]:
+        """Ids of every indexed search the listing satisfies."""
+        with self._mutex:
+            return self._match(item)
+
+    def _match(self, item: FoundListing) -> list[UUID]:
+        passing = self._candidates(item)
+        if item.property_sub_type and passing:
+            passing.intersection_update(
+                self._any_subtype.union(
+                    self._by_subtype.get(_norm(item.property_sub_type), ())
+                )
+            )
+        for attr, listing_attr, _op in _DIMENSIONS:
+            if not passing:
+                break
+            value = getattr(item, listing_attr, None)
+            if value is not None:
+                # searches without a threshold here aren't in the list at all
+                passing.difference_update(self._thresholds[attr].failing(value))
+        return list(passing)
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        """(Re)build from the DB when empty or older than SEARCH_INDEX_TTL_S."""
+        fresh = (
+            self.loaded_at is not None
+            and time.monotonic() - self.loaded_at < settings.SEARCH_INDEX_TTL_S
+        )
+        if fresh:
+            return
+        async with self._lock:
+            if self.loaded_at is not None and (
+                time.monotonic() - self.loaded_at < settings.SEARCH_INDEX_TTL_S
+            ):
+                return
+            rows = await session.execute(
+                select(SavedSearch)
+                .join(SavedSearch.client)
+                .options(selectinload(SavedSearch.fields))
+                .where(Client.is_active.is_(True))
+            )
+            self.rebuild(search_criteria(ss) for ss in rows.scalars())
+
+    def rebuild(self, criteria: Iterable[SearchCriteria]) -> None:
+        criteria = list(criteria)
+        with self._mutex:
+            self._clear()
+            for c in criteria:
+                self._upsert(c)
+            self.loaded_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        with self._mutex:
+            return {
+                "searches": len(self._criteria),
+                "cities": len(self._by_city),
+                "zips": len(self._by_zip),
+                "city_zips": len(self._by_city_zip),
+                "anywhere": len(self._anywhere),
+                "subtypes": len(self._by_subtype),
+            }
+
+
+search_index = SearchIndex()
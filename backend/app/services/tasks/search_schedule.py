@@ -0,0 +1,78 @@
+"""
+Adaptive per-search discovery schedule.
+
+Each saved search carries next_run_at and interval_s. The dispatcher enqueues
+only due searches and leases them (``lease_due``); after a discovery run
+``reschedule`` sets the next run from the search's yield: searches that keep
+producing new matches are polled more often, searches that find nothing back
+off towards SEARCH_INTERVAL_MAX_S.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import SavedSearch
+
+
+def next_interval(current: int | None, new_matches: int) -> int:
+    interval = current or settings.SEARCH_INTERVAL_DEFAULT_S
+    factor = (
+        settings.SEARCH_INTERVAL_SPEEDUP
+        if new_matches > 0
+        else settings.SEARCH_INTERVAL_BACKOFF
+    )
+    return int(
+        min(
+            settings.SEARCH_INTERVAL_MAX_S,
+            max(settings.SEARCH_INTERVAL_MIN_S, interval * factor),
+        )
+    )
+
+
+async def lease_due(session: AsyncSession, saved_search_ids: list[UUID]) -> None:
+    """Push the dispatched searches' next_run_at out by the lease. Commits."""
+    if not saved_search_ids:
+        return
+    await session.execute(
+        update(SavedSearch)
+        .where(SavedSearch.id.in_(saved_search_ids))
+        .values(
+            next_run_at=func.now() + timedelta(seconds=settings.SEARCH_DISPATCH_LEASE_S)
+        )
+    )
+    await session.commit()
+
+
+async def reschedule(
+    session: AsyncSession,
+    intervals: dict[UUID, int | None],
+    new_matches: dict[UUID, int],
+) -> None:
+    """
+    Set interval_s and next_run_at for the searches that just ran
+    (``intervals``: their interval before the run). Jittered by ±10% so
+    searches created together drift apart. Commits.
+    """
+    if not intervals:
+        return
+    now = datetime.now(timezone.utc)
+    rows = []
+    for sid, current in intervals.items():
+        interval = next_interval(current, new_matches.get(sid, 0))
+        delay = interval * random.uniform(0.9, 1.1)
+        rows.append(
+            {
+                "id": sid,
+                "interval_s": interval,
+                "next_run_at": now + timedelta(seconds=delay),
+            }
+        )
+    await session.execute(update(SavedSearch), rows)
+    await session.commit()
@@ -0,0 +1,105 @@
+"""
+Duplicate-execution guard for pipeline task handlers.
+
+Each handler runs under a session-level advisory lock for its task name:
+a concurrent duplicate (Cloud Tasks retry racing the original, overlapping
+cron cycles) returns immediately instead of redoing LLM/GIS work. Completed
+runs are recorded in task_runs under that name, so a redelivery of a
+finished task is a no-op too.
+
+A second lock on (stage, entity) keeps different work for the same entity
+(a re-analysis, a re-taken property claim: same entity, another name) from
+running at once. That task is not a duplicate and must not be dropped, so
+it raises TaskBusy and the queue retries it later.
+"""
+
+from __future__ import annotations
+
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.db import AsyncSessionLocal
+from app.core.metrics import STAGE_SKIPPED, stage_timer
+from app.core.tracing import span
+from app.core.singleflight import advisory_lock
+from app.models import TaskRun
+
+
+class TaskBusy(Exception):
+    """Another task for the same (stage, entity) is running; retry later."""
+
+    retry_after_s = 30
+
+
+@dataclass
+class TaskOutcome:
+    result: Any = None
+    skipped: str | None = None  # "running" | "done"
+
+    def response(self, key: str) -> dict:
+        """Router response body, with the result under ``key``."""
+        if self.skipped:
+            return {"ok": True, "skipped": self.skipped}
+        if isinstance(self.result, dict):
+            return {"ok": True, **self.result}
+        return {"ok": True, key: self.result}
+
+
+async def run_once(
+    *,
+    stage: str,
+    entity: str,
+    task_name: str | None,
+    fn: Callable[[], Awaitable[Any]],
+) -> TaskOutcome:
+    named = advisory_lock(f"task-name:{task_name}") if task_name else nullcontext(True)
+    async with named as got:
+        if not got:
+            STAGE_SKIPPED.inc(stage=stage, reason="running")
+            return TaskOutcome(skipped="running")
+        async with advisory_lock(f"task:{stage}:{entity}") as got:
+            if got:
+                return await _run(stage, entity, task_name, fn)
+        if not task_name:
+            # unnamed: can't tell a duplicate from new work
+            STAGE_SKIPPED.inc(stage=stage, reason="running")
+            return TaskOutcome(skipped="running")
+        raise TaskBusy(f"{stage} {entity} is running another task")
+
+
+async def _run(
+    stage: str,
+    entity: str,
+    task_name: str | None,
+    fn: Callable[[], Awaitable[Any]],
+) -> TaskOutcome:
+    if task_name:
+        async with AsyncSessionLocal() as session:
+            done = await session.scalar(
+                select(TaskRun.id).where(TaskRun.name == task_name)
+            )
+        if done is not None:
+            STAGE_SKIPPED.inc(stage=stage, reason="done")
+            return TaskOutcome(skipped="done")
+
+    with span(f"stage {stage}", entity=entity), stage_timer(stage, entity=entity):
+        result = await fn()
+
+    if task_name:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                pg_insert(TaskRun)
+                .values(
+                    name=task_name,
+                    stage=stage,
+                    result=jsonable_encoder({"result": result}),
+                )
+                .on_conflict_do_nothing()
+            )
+            await session.commit()
+    return TaskOutcome(result=result)
@@ -6,7 +6,7 @@ from app.core import settings
 
 log = logging.getLogger("sb9.zillow")
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
 
 
 def fetch_listings_via_gpt(saved_search) -> list[dict]:
@@ -0,0 +1,17 @@
+"""
+Offline stand-in for the external services the pipeline calls (OC GIS,
+OpenAI, RESO, Twilio, R2 and SMTP). Replays recorded fixtures with
+configurable latency and error injection; see ``python -m app.standin -h``.
+"""
+
+from .fixtures import Fixture, FixtureStore
+from .server import StandinConfig, create_standin_app
+from .smtp import SMTPSink
+
+__all__ = [
+    "Fixture",
+    "FixtureStore",
+    "StandinConfig",
+    "create_standin_app",
+    "SMTPSink",
+]
@@ -0,0 +1,94 @@
+"""
+Run the stand-in:
+
+    python -m app.standin --fixtures standin-fixtures --port 9100 --smtp-port 2525
+
+then point the app at it:
+
+    OCGIS_BASE_URL=http://localhost:9100/ocgis
+    OPENAI_BASE_URL=http://localhost:9100/openai/v1
+    RESO_BASE_URL=http://localhost:9100/reso/odata/Property
+    TWILIO_BASE_URL=http://localhost:9100/twilio
+    R2_S3_ENDPOINT=http://localhost:9100/r2
+    SMTP_HOST=localhost SMTP_PORT=2525 SMTP_START_TLS=false
+
+Use ``--mode record`` (with real credentials in the app's env) to capture
+fixtures from the real upstreams first.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+import uvicorn
+
+from .server import DEFAULT_UPSTREAMS, StandinConfig, create_standin_app
+from .smtp import SMTPSink
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Record/replay stand-in for externals.")
+    p.add_argument("--fixtures", type=Path, default=Path("standin-fixtures"))
+    p.add_argument("--mode", choices=("replay", "record"), default="replay")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=9100)
+    p.add_argument("--smtp-port", type=int, default=2525, help="0 disables SMTP.")
+    p.add_argument("--latency-ms", type=float, default=0.0)
+    p.add_argument("--jitter-ms", type=float, default=0.0)
+    p.add_argument("--error-rate", type=float, default=0.0, help="0.0 - 1.0")
+    p.add_argument("--error-status", type=int, default=503)
+    p.add_argument(
+        "--upstream",
+        action="append",
+        default=[],
+        metavar="SERVICE=URL",
+        help="Upstream base for record mode, e.g. reso=https://mls.example/odata",
+    )
+    return p.parse_args()
+
+
+async def _run(ns: argparse.Namespace) -> None:
+    upstreams = dict(DEFAULT_UPSTREAMS)
+    for item in ns.upstream:
+        service, _, url = item.partition("=")
+        upstreams[service.strip()] = url.strip()
+
+    config = StandinConfig(
+        fixtures_dir=ns.fixtures,
+        mode=ns.mode,
+        latency_ms=ns.latency_ms,
+        jitter_ms=ns.jitter_ms,
+        error_rate=ns.error_rate,
+        error_status=ns.error_status,
+        upstreams=upstreams,
+    )
+    server = uvicorn.Server(
+        uvicorn.Config(create_standin_app(config), host=ns.host, port=ns.port)
+    )
+
+    smtp_server = None
+    if ns.smtp_port:
+        sink = SMTPSink(
+            outbox=ns.fixtures / "outbox",
+            latency_ms=ns.latency_ms,
+            error_rate=ns.error_rate,
+        )
+        smtp_server = await sink.serve(ns.host, ns.smtp_port)
+    try:
+        await server.serve()
+    finally:
+        if smtp_server is not None:
+            smtp_server.close()
+            await smtp_server.wait_closed()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
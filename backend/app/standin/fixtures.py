@@ -0,0 +1,129 @@
+# app/standin/fixtures.py
+from __future__ import annotations
+
+import base64
+import hashlib
+import itertools
+import json
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Mapping
+
+# Query/body keys that change per call but don't change the answer.
+_VOLATILE_KEYS = {"token", "access_token", "api_key", "ts", "timestamp"}
+
+
+@dataclass
+class Fixture:
+    service: str
+    method: str
+    path: str
+    key: str
+    status: int = 200
+    headers: dict[str, str] = field(default_factory=dict)
+    body: str | None = None  # utf-8 payloads
+    body_b64: str | None = None  # binary payloads (e.g. f=pbf)
+
+    @property
+    def content(self) -> bytes:
+        if self.body_b64 is not None:
+            return base64.b64decode(self.body_b64)
+        return (self.body or "").encode("utf-8")
+
+
+def request_key(
+    service: str, method: str, path: str, query: Mapping[str, str], body: bytes
+) -> str:
+    """Stable key for one outbound call: method + path + sorted query + body."""
+    q = sorted((k, v) for k, v in query.items() if k.lower() not in _VOLATILE_KEYS)
+    h = hashlib.sha1()
+    h.update(f"{service}|{method.upper()}|{path}|".encode())
+    h.update(json.dumps(q).encode())
+    h.update(b"|")
+    h.update(body or b"")
+    return h.hexdigest()
+
+
+class FixtureStore:
+    """
+    Recorded responses, one ``<service>.jsonl`` file per upstream.
+    Lookup is exact-key first, then round-robin over everything recorded for
+    the same (service, method, path) so unseen inputs still get a realistic reply.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._exact: dict[str, Fixture] = {}
+        self._by_route: dict[tuple[str, str, str], list[Fixture]] = {}
+        self._cycles: dict[tuple[str, str, str], itertools.cycle] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.root.glob("*.jsonl")):
+            with path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if line:
+                        self._index(Fixture(**json.loads(line)))
+
+    def _index(self, fx: Fixture) -> None:
+        route = (fx.service, fx.method.upper(), fx.path)
+        self._exact[fx.key] = fx
+        self._by_route.setdefault(route, []).append(fx)
+        self._cycles.pop(route, None)
+
+    def lookup(self, service: str, method: str, path: str, key: str) -> Fixture | None:
+        with self._lock:
+            if key in self._exact:
+                return self._exact[key]
+            route = (service, method.upper(), path)
+            candidates = self._by_route.get(route)
+            if not candidates:
+                return None
+            cycle = self._cycles.setdefault(route, itertools.cycle(candidates))
+            return next(cycle)
+
+    def record(self, fx: Fixture) -> None:
+        with self._lock:
+            self._index(fx)
+            with (self.root / f"{fx.service}.jsonl").open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(asdict(fx)) + "\n")
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+
+def make_fixture(
+    *,
+    service: str,
+    method: str,
+    path: str,
+    key: str,
+    status: int,
+    content_type: str | None,
+    content: bytes,
+) -> Fixture:
+    headers = {"content-type": content_type} if content_type else {}
+    try:
+        return Fixture(
+            service=service,
+            method=method.upper(),
+            path=path,
+            key=key,
+            status=status,
+            headers=headers,
+            body=content.decode("utf-8"),
+        )
+    except UnicodeDecodeError:
+        return Fixture(
+            service=service,
+            method=method.upper(),
+            path=path,
+            key=key,
+            status=status,
+            headers=headers,
+            body_b64=base64.b64encode(content).decode("ascii"),
+        )
@@ -0,0 +1,188 @@
+# app/standin/server.py
+from __future__ import annotations
+
+import asyncio
+import random
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from .fixtures import FixtureStore, make_fixture, request_key
+
+SERVICES = ("ocgis", "openai", "reso", "twilio", "r2")
+
+DEFAULT_UPSTREAMS = {
+    "ocgis": "https://www.ocgis.com/arcpub/rest/services",
+    "openai": "https://api.openai.com",
+    "twilio": "https://api.twilio.com",
+}
+
+# Never forwarded to / stored from the upstream.
+_HOP_HEADERS = {"host", "content-length", "connection", "accept-encoding"}
+
+
+@dataclass
+class StandinConfig:
+    fixtures_dir: Path
+    mode: str = "replay"  # "replay" | "record"
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    upstreams: dict[str, str] = field(default_factory=lambda: dict(DEFAULT_UPSTREAMS))
+
+
+class ConfigPatch(BaseModel):
+    latency_ms: float | None = None
+    jitter_ms: float | None = None
+    error_rate: float | None = None
+    error_status: int | None = None
+
+
+def _default_body(service: str, method: str, path: str) -> tuple[int, dict | None]:
+    """Canned 'empty' answer for calls that were never recorded."""
+    if service == "ocgis":
+        if path.endswith("findAddressCandidates"):
+            return 200, {"candidates": []}
+        return 200, {"type": "FeatureCollection", "features": []}
+    if service == "openai":
+        text = '{"listings": []}'
+        if path.endswith("chat/completions"):
+            return 200, {
+                "id": "chatcmpl-standin",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o-mini",
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": text},
+                    }
+                ],
+            }
+        return 200, {
+            "id": "resp_standin",
+            "object": "response",
+            "created_at": 0,
+            "model": "gpt-4o-mini",
+            "status": "completed",
+            "output": [
+                {
+                    "type": "message",
+                    "id": "msg_standin",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [
+                        {"type": "output_text", "text": text, "annotations": []}
+                    ],
+                }
+            ],
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": [],
+        }
+    if service == "reso":
+        return 200, {"value": []}
+    if service == "twilio":
+        return 201, {"sid": f"SM{uuid.uuid4().hex}", "status": "queued"}
+    return 200, None  # r2 PUTs and anything else: empty 200
+
+
+def create_standin_app(config: StandinConfig) -> FastAPI:
+    store = FixtureStore(config.fixtures_dir)
+    stats: Counter[str] = Counter()
+    app = FastAPI(title="sb9-analyzer stand-in", version="0.1.0")
+
+    @app.get("/_standin/stats")
+    async def get_stats():
+        return {"fixtures": len(store), "counters": dict(stats)}
+
+    @app.get("/_standin/config")
+    async def get_config():
+        out = asdict(config)
+        out["fixtures_dir"] = str(config.fixtures_dir)
+        return out
+
+    @app.post("/_standin/config")
+    async def patch_config(body: ConfigPatch):
+        for k, v in body.model_dump(exclude_none=True).items():
+            setattr(config, k, v)
+        return await get_config()
+
+    async def _forward(service: str, path: str, request: Request, raw: bytes):
+        base = config.upstreams.get(service)
+        if not base:
+            raise HTTPException(502, detail=f"No upstream configured for {service}")
+        headers = {
+            k: v for k, v in request.headers.items() if k.lower() not in _HOP_HEADERS
+        }
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            return await client.request(
+                request.method,
+                f"{base.rstrip('/')}/{path}",
+                params=list(request.query_params.multi_items()),
+                headers=headers,
+                content=raw,
+            )
+
+    @app.api_route(
+        "/{service}/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"]
+    )
+    async def standin(service: str, path: str, request: Request):
+        if service not in SERVICES:
+            raise HTTPException(404, detail=f"Unknown service {service}")
+        stats[f"{service}.requests"] += 1
+
+        delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+
+        if config.error_rate and random.random() < config.error_rate:
+            stats[f"{service}.injected_errors"] += 1
+            return JSONResponse(
+                {"error": {"message": "stand-in injected failure"}},
+                status_code=config.error_status,
+                headers={"retry-after": "1"},
+            )
+
+        raw = await request.body()
+        key = request_key(service, request.method, path, request.query_params, raw)
+
+        if config.mode == "record":
+            upstream = await _forward(service, path, request, raw)
+            fx = make_fixture(
+                service=service,
+                method=request.method,
+                path=path,
+                key=key,
+                status=upstream.status_code,
+                content_type=upstream.headers.get("content-type"),
+                content=upstream.content,
+            )
+            store.record(fx)
+            stats[f"{service}.recorded"] += 1
+        else:
+            fx = store.lookup(service, request.method, path, key)
+
+        if fx is None:
+            stats[f"{service}.misses"] += 1
+            status, body = _default_body(service, request.method, path)
+            if body is None:
+                return Response(status_code=status, headers={"etag": '"standin"'})
+            return JSONResponse(body, status_code=status)
+
+        stats[f"{service}.hits"] += 1
+        return Response(
+            content=fx.content,
+            status_code=fx.status,
+            media_type=fx.headers.get("content-type"),
+        )
+
+    return app
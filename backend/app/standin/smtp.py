@@ -0,0 +1,106 @@
+# app/standin/smtp.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+log = logging.getLogger("sb9.standin.smtp")
+
+
+class SMTPSink:
+    """
+    Just enough SMTP for aiosmtplib: EHLO, AUTH PLAIN/LOGIN (any credentials),
+    MAIL/RCPT/DATA, RSET, NOOP, QUIT. No STARTTLS, so point the app at it with
+    SMTP_START_TLS=false. Accepted messages are written to ``outbox`` as .eml
+    when a directory is given.
+    """
+
+    def __init__(
+        self,
+        *,
+        outbox: Path | None = None,
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+    ):
+        self.outbox = outbox
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.accepted = 0
+        self.rejected = 0
+        if outbox is not None:
+            outbox.mkdir(parents=True, exist_ok=True)
+
+    async def serve(self, host: str, port: int) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self._handle, host, port)
+        log.info("SMTP stand-in listening on %s:%s", host, port)
+        return server
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        async def reply(line: str) -> None:
+            writer.write((line + "\r\n").encode())
+            await writer.drain()
+
+        await reply("220 sb9-standin ESMTP ready")
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                verb = line.split(" ", 1)[0].upper()
+
+                if verb == "EHLO":
+                    await reply("250-sb9-standin")
+                    await reply("250-AUTH PLAIN LOGIN")
+                    await reply("250 8BITMIME")
+                elif verb == "HELO":
+                    await reply("250 sb9-standin")
+                elif verb == "AUTH":
+                    parts = line.split()
+                    mech = parts[1].upper() if len(parts) > 1 else ""
+                    if mech == "PLAIN" and len(parts) < 3:
+                        await reply("334 ")
+                        await reader.readline()
+                    elif mech == "LOGIN":
+                        if len(parts) < 3:
+                            await reply("334 VXNlcm5hbWU6")
+                            await reader.readline()
+                        await reply("334 UGFzc3dvcmQ6")
+                        await reader.readline()
+                    await reply("235 2.7.0 Authentication successful")
+                elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    chunks: list[bytes] = []
+                    while True:
+                        data_line = await reader.readline()
+                        if not data_line or data_line in (b".\r\n", b".\n"):
+                            break
+                        chunks.append(data_line)
+                    await reply(await self._accept(b"".join(chunks)))
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 5.5.2 Command not implemented")
+        finally:
+            writer.close()
+
+    async def _accept(self, message: bytes) -> str:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000.0)
+        if self.error_rate and random.random() < self.error_rate:
+            self.rejected += 1
+            return "451 4.3.0 stand-in injected failure"
+        self.accepted += 1
+        if self.outbox is not None:
+            ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            (self.outbox / f"{ts}-{uuid4().hex}.eml").write_bytes(message)
+        return "250 2.0.0 Queued"
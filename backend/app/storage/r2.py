@@ -1,6 +1,7 @@
 # app/storage/r2.py
 import boto3
 from app.core.config import settings
+from app.core.metrics import external_call
 
 _s3 = boto3.client(
     "s3",
@@ -13,7 +14,8 @@ _s3 = boto3.client(
 def upload_bytes_and_get_url(
     key: str, data: bytes, content_type: str = "image/svg+xml"
 ) -> str:
-    _s3.put_object(
-        Bucket=settings.R2_BUCKET, Key=key, Body=data, ContentType=content_type
-    )
+    with external_call("r2"):
+        _s3.put_object(
+            Bucket=settings.R2_BUCKET, Key=key, Body=data, ContentType=content_type
+        )
     return f"{settings.R2_PUBLIC_BASE}/{key}"
@@ -1,16 +1,51 @@
+import re
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
 import usaddress
 
+from app.core.config import settings
+from app.utils.geo_norm import normalize_state
+
 
-class FormattedAddress:
+class FormattedAddress(NamedTuple):
     address_line1: str | None
     address_line2: str | None
     city: str | None
     state: str | None
     zip: str | None
 
+    @property
+    def key(self) -> str:
+        return address_key(*self)
+
+    @property
+    def is_complete(self) -> bool:
+        """Enough parts to identify a property without asking the geocoder."""
+        line1, _line2, city, state, zip5 = self.key.split("|")
+        return bool(line1 and city and state and len(zip5) == 5)
+
+
+# OC Locator's canonical single-line output, e.g. "123 N MAIN ST, IRVINE, CA, 92618".
+# Anything fancier (units, suffix-less streets, ZIP+4) goes through usaddress.
+_LOCATOR_RE = re.compile(
+    r"^(?P<line1>\d+[A-Z]? (?:[NSEW] )?[A-Z0-9' ]+? "
+    r"(?:AVE|BLVD|CIR|CT|DR|HWY|LN|LOOP|PKWY|PL|RD|ROW|ST|TER|TRL|WAY)"
+    r"(?: [NSEW])?)"
+    r", (?P<city>[A-Z][A-Z .'-]*), (?P<state>[A-Z]{2}),? (?P<zip>\d{5})$"
+)
+_UNIT_WORDS = {"APT", "UNIT", "STE", "SUITE", "BLDG", "SPC", "LOT", "#"}
 
-def format_verified_address(verified_address: str) -> FormattedAddress:
-    components, _key = usaddress.tag(verified_address)  # components is an OrderedDict
+
+def _fast_path(address: str) -> FormattedAddress | None:
+    m = _LOCATOR_RE.match(address)
+    if m is None or _UNIT_WORDS.intersection(m["line1"].split()):
+        return None
+    return FormattedAddress(m["line1"], None, m["city"], m["state"], m["zip"])
+
+
+def _tag(address: str) -> FormattedAddress:
+    components, _key = usaddress.tag(address)  # components is an OrderedDict
 
     line1_parts = [
         components.get("AddressNumber"),
@@ -32,10 +67,78 @@ def format_verified_address(verified_address: str) -> FormattedAddress:
     ]
     address_line2 = " ".join(p for p in line2_parts if p).strip() or None
 
-    return {
-        "address_line1": address_line1,
-        "address_line2": address_line2,
-        "city": components.get("PlaceName"),
-        "state": components.get("StateName"),
-        "zip": components.get("ZipCode"),
-    }
+    return FormattedAddress(
+        address_line1=address_line1,
+        address_line2=address_line2,
+        city=components.get("PlaceName"),
+        state=components.get("StateName"),
+        zip=components.get("ZipCode"),
+    )
+
+
+@lru_cache(maxsize=settings.ADDRESS_PARSE_CACHE_SIZE)
+def _parse(address: str) -> FormattedAddress:
+    return _fast_path(address) or _tag(address)
+
+
+def _clean(address: str) -> str:
+    return " ".join(address.split())
+
+
+def format_verified_address(verified_address: str) -> FormattedAddress:
+    """
+    Split a single-line address into its parts. Results are cached (the CRF
+    tagger is the slow bit) and locator-canonical input skips the tagger.
+    Raises usaddress.RepeatedLabelError on input it can't make sense of.
+    """
+    return _parse(_clean(verified_address))
+
+
+def format_verified_addresses(
+    addresses: Iterable[str],
+) -> list[FormattedAddress | None]:
+    """
+    Batch form of format_verified_address, in input order. Each distinct
+    string is parsed once; unparseable ones come back as None instead of
+    raising so one bad row doesn't sink the batch.
+    """
+    cleaned = [_clean(a) for a in addresses]
+    parsed: dict[str, FormattedAddress | None] = {}
+    for address in dict.fromkeys(cleaned):
+        try:
+            parsed[address] = _parse(address)
+        except usaddress.RepeatedLabelError:
+            parsed[address] = None
+    return [parsed[a] for a in cleaned]
+
+
+parse_cache_info = _parse.cache_info
+
+
+def _key_part(value: str | None) -> str:
+    value = (value or "").replace(".", "").replace(",", "")
+    return " ".join(value.split()).upper()
+
+
+def address_key(
+    address_line1: str | None,
+    address_line2: str | None,
+    city: str | None,
+    state: str | None,
+    zip: str | None,
+) -> str:
+    """
+    Canonical lookup key stored in properties.address_key:
+    upper-cased, punctuation-free, whitespace-collapsed parts joined by "|",
+    state as its USPS abbreviation and zip cut to 5 digits.
+    The add_address_key migration backfills existing rows with it.
+    """
+    return "|".join(
+        [
+            _key_part(address_line1),
+            _key_part(address_line2),
+            _key_part(city),
+            normalize_state(state or "") or _key_part(state),
+            _key_part(zip)[:5],
+        ]
+    )